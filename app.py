@@ -9,10 +9,14 @@ from config import Config
 from models import db
 from routes import initialize_routes
 from socket_instance import init_socketio
+from json_provider import init_json
+from compression import init_compression
 import os
 
 app = Flask(__name__)
 app.config.from_object(Config)
+init_json(app)
+init_compression(app)
 
 CORS(app, resources={
     r"/*": {
@@ -0,0 +1,127 @@
+import sys
+import time
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+from models import db, SuperTournament, Season, Tournament, Team, Player, Match, Score
+from routes import initialize_routes
+import json_provider
+from json_provider import FastJSONProvider, MSGPACK_MIMETYPE
+
+TEAMS = 64
+
+def build_app():
+    """App on an in-memory SQLite database, so the benchmark never touches real data"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    initialize_routes(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def seed(num_matches):
+    """One tournament of TEAMS doubles teams playing num_matches round robin matches"""
+    db.session.add(SuperTournament(id=1, name='Benchmark Open'))
+    db.session.add(Season(id=1, name='Season 1', super_tournament_id=1))
+    db.session.add(Tournament(id=1, tournament_name='Mixed Doubles', type='regular', season_id=1))
+    db.session.bulk_insert_mappings(Player, [
+        {
+            'id': index + 1,
+            'uuid': f'player-{index:05d}',
+            'first_name': f'First{index}',
+            'last_name': f'Last{index}',
+            'gender': 'M' if index % 2 else 'F',
+            'age': 20 + index % 40,
+            'phone_number': f'9{index:09d}',
+            'email': f'player{index}@example.com',
+            'skill_type': 'INTERMEDIATE',
+            'super_tournament_id': 1
+        }
+        for index in range(TEAMS * 2)
+    ])
+    db.session.bulk_insert_mappings(Team, [
+        {
+            'team_id': f'T{index:03d}',
+            'name': f'Team {index}',
+            'tournament_id': 1,
+            'pool': str(index % 8 + 1),
+            'player1_uuid': f'player-{2 * index:05d}',
+            'player2_uuid': f'player-{2 * index + 1:05d}'
+        }
+        for index in range(TEAMS)
+    ])
+    db.session.bulk_insert_mappings(Match, [
+        {
+            'id': index + 1,
+            'match_name': f'Match {index + 1}',
+            'team1_id': f'T{index % TEAMS:03d}',
+            'team2_id': f'T{(index * 7 + 1) % TEAMS:03d}',
+            'round_id': str(index // 250 + 1),
+            'pool': str(index % 8 + 1),
+            'court_number': index % 6 + 1,
+            'court_order': index // 6 + 1,
+            'tournament_id': 1,
+            'is_final': index % 3 == 0,
+            'status': 'completed' if index % 3 == 0 else 'pending'
+        }
+        for index in range(num_matches)
+    ])
+    db.session.bulk_insert_mappings(Score, [
+        {'match_id': index + 1, 'team_id': team_id, 'score': (index * 5 + offset) % 12, 'tournament_id': 1}
+        for index in range(num_matches)
+        for offset, team_id in enumerate((f'T{index % TEAMS:03d}', f'T{(index * 7 + 1) % TEAMS:03d}'))
+    ])
+    db.session.commit()
+
+def time_encode(encode, payload, repeat):
+    """Best of 3 runs of encoding payload repeat times, in milliseconds per encode"""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode(payload)
+        elapsed = (time.perf_counter() - start) * 1000 / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run(num_matches=1000, repeat=20):
+    app = build_app()
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+
+    with app.app_context():
+        seed(num_matches)
+
+    # Capture the real endpoint payloads once
+    client = app.test_client()
+    payloads = {
+        'get_match_fixtures': client.get('/get-match-fixtures?tournament_id=1').get_json(),
+        'get_tournament': client.get('/tournaments/1').get_json(),
+        'get_players': client.get('/player-ops/players?super_tournament_id=1').get_json()
+    }
+
+    encoders = [
+        ('json (default)', lambda payload: default.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    ]
+    if json_provider.orjson is not None:
+        encoders.append(('orjson', fast._dumps_bytes))
+    else:
+        print("orjson is not installed; FastJSONProvider falls back to json")
+    if json_provider.msgpack is not None:
+        encoders.append((MSGPACK_MIMETYPE, lambda payload: json_provider.msgpack.packb(payload, default=fast.default, use_bin_type=True)))
+    else:
+        print("msgpack is not installed; MessagePack responses are disabled")
+
+    print(f"{num_matches} matches, {TEAMS} teams, best of 3 x {repeat} encodes")
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        for encoder_name, encode in encoders:
+            size = len(encode(payload))
+            elapsed = time_encode(encode, payload, repeat)
+            print(f"  {encoder_name:<20} {elapsed:8.2f} ms {size / 1024:10.1f} KB")
+
+if __name__ == "__main__":
+    # Usage: python bench_json.py [num_matches] [repeat]
+    run(*[int(arg) for arg in sys.argv[1:3]])
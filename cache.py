@@ -0,0 +1,292 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Match, Score, Round, Team, Player, Tournament, Season, SuperTournament
+
+# Models whose rows carry a tournament_id and feed tournament read views
+TRACKED_MODELS = (Match, Score, Round, Team)
+# Models behind player lookups: players, their teams and where those teams play
+PLAYER_MODELS = (Player, Team, Tournament, Season, SuperTournament)
+
+_lock = threading.Lock()
+_versions = {}
+# Bumped when a change cannot be tied to a single tournament (bulk UPDATE/DELETE)
+_generation = 0
+# Bumped on every commit that touches PLAYER_MODELS
+_player_version = 0
+# Named caches reported by get_cache_stats
+_caches = {}
+
+def _normalize_tournament_id(tournament_id: Any) -> Any:
+    try:
+        return int(tournament_id)
+    except (TypeError, ValueError):
+        return tournament_id
+
+def get_tournament_version(tournament_id: Any) -> Tuple[int, int]:
+    """
+    Get the current data version of a tournament.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        Tuple[int, int]: (global generation, tournament version); it changes every
+        time a commit touches the tournament's matches, scores, rounds or teams
+    """
+    tournament_id = _normalize_tournament_id(tournament_id)
+    with _lock:
+        return (_generation, _versions.get(tournament_id, 0))
+
+def bump_tournament_version(tournament_id: Any) -> None:
+    """
+    Invalidate everything cached for a tournament.
+
+    Args:
+        tournament_id: ID of the tournament, or None to invalidate all tournaments
+    """
+    global _generation
+    with _lock:
+        if tournament_id is None:
+            _generation += 1
+        else:
+            tournament_id = _normalize_tournament_id(tournament_id)
+            _versions[tournament_id] = _versions.get(tournament_id, 0) + 1
+
+def mark_tournament_changed(tournament_id: Any, session: Optional[Session] = None) -> None:
+    """
+    Record a change made outside the ORM unit of work (bulk inserts/updates).
+
+    The tournament version is bumped when the session commits and the mark is
+    dropped if it rolls back.
+
+    Args:
+        tournament_id: ID of the tournament that changed
+        session: Session the change was made in (defaults to db.session)
+    """
+    if session is None:
+        from models import db
+        session = db.session
+    session.info.setdefault('changed_tournaments', set()).add(_normalize_tournament_id(tournament_id))
+
+def get_player_version() -> int:
+    """
+    Get the current version of player data.
+
+    Returns:
+        int: Changes every time a commit touches players, teams, tournaments,
+        seasons or super tournaments
+    """
+    with _lock:
+        return _player_version
+
+def bump_player_version() -> None:
+    """Invalidate everything cached from player data"""
+    global _player_version
+    with _lock:
+        _player_version += 1
+
+def mark_players_changed(session: Optional[Session] = None) -> None:
+    """
+    Record a player or team change made outside the ORM unit of work (bulk inserts).
+
+    The player version is bumped when the session commits.
+
+    Args:
+        session: Session the change was made in (defaults to db.session)
+    """
+    if session is None:
+        from models import db
+        session = db.session
+    session.info['changed_players'] = True
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_tournaments(session, flush_context):
+    changed = session.info.setdefault('changed_tournaments', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, TRACKED_MODELS) and obj.tournament_id is not None:
+            changed.add(_normalize_tournament_id(obj.tournament_id))
+        if isinstance(obj, PLAYER_MODELS):
+            session.info['changed_players'] = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_statements(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, TRACKED_MODELS):
+        orm_execute_state.session.info['changed_all'] = True
+    if mapper is not None and issubclass(mapper.class_, PLAYER_MODELS):
+        orm_execute_state.session.info['changed_players'] = True
+
+@event.listens_for(Session, 'after_commit')
+def _bump_changed_tournaments(session):
+    changed = session.info.pop('changed_tournaments', set())
+    if session.info.pop('changed_all', False):
+        bump_tournament_version(None)
+    for tournament_id in changed:
+        bump_tournament_version(tournament_id)
+    if session.info.pop('changed_players', False):
+        bump_player_version()
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_changed_tournaments(session):
+    session.info.pop('changed_tournaments', None)
+    session.info.pop('changed_all', None)
+    session.info.pop('changed_players', None)
+
+def register_cache(name: str, cache: Any) -> None:
+    """Report a cache's counters in get_cache_stats under the given name"""
+    with _lock:
+        _caches[name] = cache
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Counters of every named cache.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Cache name -> size, maxsize, hits, misses, hit_rate
+        and evictions (plus ttl and expirations for TTL caches)
+    """
+    with _lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in sorted(caches.items())}
+
+class VersionedCache:
+    """
+    Bounded LRU cache whose entries are only valid for the version they were built at.
+
+    Args:
+        maxsize: Maximum number of entries kept before the least recently used is dropped
+        name: Name to report the cache's counters under (see get_cache_stats)
+    """
+
+    def __init__(self, maxsize: int = 128, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name:
+            register_cache(name, self)
+
+    def get(self, key: Hashable, version: Any) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            version: Version the caller needs
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or built at another version
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, version: Any, value: Any) -> None:
+        """
+        Store a value built at the given version.
+
+        Args:
+            key: Cache key
+            version: Version the value was built at
+            value: Value to cache
+        """
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions
+            }
+
+class TTLCache(VersionedCache):
+    """
+    Bounded LRU cache whose entries expire ttl seconds after they are stored.
+
+    For data that changes rarely and is invalidated explicitly by the code that
+    changes it; the TTL bounds how stale an entry can get when a change is made
+    elsewhere (another worker process, a script).
+
+    Args:
+        maxsize: Maximum number of entries kept before the least recently used is dropped
+        ttl: Seconds an entry stays valid
+        name: Name to report the cache's counters under (see get_cache_stats)
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300, name: Optional[str] = None):
+        self.ttl = ttl
+        self.expirations = 0
+        super().__init__(maxsize, name)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value for ttl seconds.
+
+        Args:
+            key: Cache key
+            value: Value to cache (not None, which reads as a miss)
+        """
+        super().set(key, time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop one entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats.update({'ttl': self.ttl, 'expirations': self.expirations})
+        return stats
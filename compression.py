@@ -0,0 +1,196 @@
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+
+# brotli is optional; without it responses are only gzip compressed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Defaults for the COMPRESS_* config values (see config.py)
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+DEFAULT_BROTLI_LEVEL = 4
+# Content types worth compressing; images, archives etc. are already compressed
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/msgpack',
+    'application/xml',
+    'image/svg+xml'
+}
+# Requests under these paths are never compressed
+SKIPPED_PATHS = ('/socket.io',)
+
+_lock = threading.Lock()
+_compressed = {}  # encoding -> Counter of responses, bytes_in, bytes_out
+_skipped = Counter()  # reason -> responses
+
+def new_compressor(encoding: str, level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """
+    Start compressing a body.
+
+    Args:
+        encoding: "br" or "gzip"
+        level: Brotli quality (0-11) or gzip level (1-9)
+
+    Returns:
+        Tuple: compress(data) -> bytes for each piece and finish() -> bytes for the end
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return compressor.compress, compressor.flush
+
+def record_compressed(encoding: str, bytes_in: int, bytes_out: int) -> None:
+    with _lock:
+        counts = _compressed.setdefault(encoding, Counter())
+        counts['responses'] += 1
+        counts['bytes_in'] += bytes_in
+        counts['bytes_out'] += bytes_out
+
+def record_skipped(reason: str) -> None:
+    with _lock:
+        _skipped[reason] += 1
+
+def get_compression_stats() -> Dict[str, Any]:
+    """
+    Compression counters since the process started.
+
+    Returns:
+        Dict[str, Any]: Totals and per encoding responses, bytes_in, bytes_out and
+        bytes_saved, plus the number of responses left alone per reason
+    """
+    with _lock:
+        by_encoding = {encoding: dict(counts) for encoding, counts in _compressed.items()}
+        skipped = dict(_skipped)
+
+    for counts in by_encoding.values():
+        counts['bytes_saved'] = counts['bytes_in'] - counts['bytes_out']
+
+    bytes_in = sum(counts['bytes_in'] for counts in by_encoding.values())
+    bytes_out = sum(counts['bytes_out'] for counts in by_encoding.values())
+    return {
+        'responses': sum(counts['responses'] for counts in by_encoding.values()),
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'bytes_saved': bytes_in - bytes_out,
+        'ratio': round(bytes_out / bytes_in, 3) if bytes_in else None,
+        'by_encoding': by_encoding,
+        'skipped': skipped
+    }
+
+def disable_compression(response: Response) -> Response:
+    """Mark a response to be sent as is (e.g. the client asked for an uncompressed export)"""
+    response.compress = False
+    return response
+
+def is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+def skip_reason(response: Response) -> Optional[str]:
+    """Why a response should not be compressed, or None if it should"""
+    if not getattr(response, 'compress', True):
+        return 'disabled'
+    if request.method == 'HEAD' or request.path.startswith(SKIPPED_PATHS):
+        return 'request'
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return 'status'
+    if response.direct_passthrough:
+        return 'passthrough'  # Files sent as is (send_file)
+    if 'Content-Encoding' in response.headers:
+        return 'encoded'
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return 'no_transform'
+    if not is_compressible(response.mimetype or ''):
+        return 'mimetype'
+    return None
+
+def compression_config() -> Dict[str, int]:
+    return {
+        'min_size': current_app.config.get('COMPRESS_MIN_SIZE', DEFAULT_MIN_SIZE),
+        'level': current_app.config.get('COMPRESS_LEVEL', DEFAULT_LEVEL),
+        'brotli_level': current_app.config.get('COMPRESS_BROTLI_LEVEL', DEFAULT_BROTLI_LEVEL)
+    }
+
+def compress_stream(chunks: Iterable[bytes], close: Callable[[], None], encoding: str, level: int) -> Iterator[bytes]:
+    """Compress a streamed body piece by piece, recording its sizes once it is done"""
+    compress, finish = new_compressor(encoding, level)
+    bytes_in = bytes_out = 0
+    try:
+        for chunk in chunks:
+            bytes_in += len(chunk)
+            data = compress(chunk)
+            if data:
+                bytes_out += len(data)
+                yield data
+        data = finish()
+        bytes_out += len(data)
+        yield data
+    finally:
+        if close is not None:
+            close()
+        record_compressed(encoding, bytes_in, bytes_out)
+
+def compress_response(response: Response) -> Response:
+    """
+    after_request hook: gzip / brotli encode the response when the client accepts it.
+
+    Bodies of known size are compressed at once when they are at least COMPRESS_MIN_SIZE
+    bytes and shrink; streamed bodies (archive and CSV exports) are compressed as they
+    are sent. Responses that already have a Content-Encoding, are files or binary types,
+    or belong to Socket.IO are left alone.
+    """
+    reason = skip_reason(response)
+    if reason:
+        record_skipped(reason)
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    encoding = request.accept_encodings.best_match(encodings)
+    if encoding is None:
+        record_skipped('client')
+        return response
+
+    config = compression_config()
+    level = config['brotli_level'] if encoding == 'br' else config['level']
+
+    if response.is_streamed:
+        original = response.response
+        response.response = compress_stream(response.iter_encoded(), getattr(original, 'close', None), encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['min_size']:
+            record_skipped('small')
+            return response
+        compress, finish = new_compressor(encoding, level)
+        compressed = compress(data) + finish()
+        if len(compressed) >= len(data):
+            record_skipped('no_gain')
+            return response
+        response.set_data(compressed)
+        record_compressed(encoding, len(data), len(compressed))
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed body is no longer byte-identical to the one the tag was made for
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app: Flask) -> None:
+    """
+    Compress the app's responses (see compress_response).
+
+    Args:
+        app: Flask app; COMPRESS_MIN_SIZE, COMPRESS_LEVEL and COMPRESS_BROTLI_LEVEL
+            in its config override the defaults
+    """
+    app.after_request(compress_response)
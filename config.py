@@ -14,4 +14,13 @@ class Config:
         SQLALCHEMY_DATABASE_URI = f'mysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
     else:
         SQLALCHEMY_DATABASE_URI = 'sqlite:///v0_backend.db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Response compression (compression.py): bodies under COMPRESS_MIN_SIZE bytes are sent as is
+    COMPRESS_MIN_SIZE = int(environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(environ.get('COMPRESS_BROTLI_LEVEL', 4))
+
+    # Tournament / season / super tournament cache (hierarchy.py)
+    HIERARCHY_CACHE_SIZE = int(environ.get('HIERARCHY_CACHE_SIZE', 1024))
+    HIERARCHY_CACHE_TTL = int(environ.get('HIERARCHY_CACHE_TTL', 600))
\ No newline at end of file
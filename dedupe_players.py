@@ -0,0 +1,31 @@
+import sys
+import time
+from app import app, db
+from player_dedupe import find_duplicate_players, apply_proposals, DEFAULT_THRESHOLD
+
+def dedupe(super_tournament_id, threshold=DEFAULT_THRESHOLD, apply=False):
+    with app.app_context():
+        start = time.time()
+        proposals = find_duplicate_players(super_tournament_id, threshold)
+        print(f"Found {len(proposals)} duplicate groups in {time.time() - start:.2f}s")
+
+        for proposal in proposals:
+            keep = proposal['keep']
+            print(f"Keep {keep['uuid']} {keep['first_name']} {keep['last_name'] or ''} ({keep['teams']} teams)")
+            for player in proposal['merge']:
+                print(f"    <- {player['uuid']} {player['first_name']} {player['last_name'] or ''} "
+                      f"score {player['score']} ({', '.join(player['reasons'])})")
+
+        if apply and proposals:
+            start = time.time()
+            result = apply_proposals(super_tournament_id, proposals)
+            db.session.commit()
+            print(f"Merged {result['players']} players, rewrote {result['team_slots']} team slots in {time.time() - start:.2f}s")
+
+if __name__ == "__main__":
+    # Usage: python dedupe_players.py <super_tournament_id> [threshold] [--apply]
+    args = [arg for arg in sys.argv[1:] if arg != '--apply']
+    if not args:
+        print("Usage: python dedupe_players.py <super_tournament_id> [threshold] [--apply]")
+        sys.exit(1)
+    dedupe(int(args[0]), float(args[1]) if len(args) > 1 else DEFAULT_THRESHOLD, '--apply' in sys.argv)
@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from cache import TTLCache
+from config import Config
+from models import db, Tournament, Season, SuperTournament
+
+# Tournament -> season -> super tournament data (names, num_courts) and the hierarchy
+# list/detail responses. It changes about once a day, so entries live for
+# HIERARCHY_CACHE_TTL seconds and the endpoints that change it clear the cache.
+hierarchy_cache = TTLCache(
+    maxsize=Config.HIERARCHY_CACHE_SIZE,
+    ttl=Config.HIERARCHY_CACHE_TTL,
+    name='hierarchy'
+)
+
+def get_or_build(key: Hashable, build: Callable[[], Optional[Any]]) -> Optional[Any]:
+    """
+    Read-through lookup in the hierarchy cache.
+
+    Args:
+        key: Cache key
+        build: Builds the value on a miss; None (e.g. not found) is returned but not cached
+
+    Returns:
+        Optional[Any]: The cached or freshly built value. Shared between requests, so
+        callers must not modify it
+    """
+    value = hierarchy_cache.get(key)
+    if value is None:
+        value = build()
+        if value is not None:
+            hierarchy_cache.set(key, value)
+    return value
+
+def invalidate_hierarchy() -> None:
+    """Drop everything cached from tournaments, seasons and super tournaments (after a commit that changed them)"""
+    hierarchy_cache.clear()
+
+def _load_tournament_hierarchy(tournament_id):
+    row = db.session.query(
+        Tournament.id,
+        Tournament.tournament_name,
+        Tournament.type,
+        Tournament.num_courts,
+        Season.id.label('season_id'),
+        Season.name.label('season_name'),
+        SuperTournament.id.label('super_tournament_id'),
+        SuperTournament.name.label('super_tournament_name'),
+        SuperTournament.description
+    ).outerjoin(
+        Season, Tournament.season_id == Season.id
+    ).outerjoin(
+        SuperTournament, Season.super_tournament_id == SuperTournament.id
+    ).filter(Tournament.id == tournament_id).first()
+
+    if not row:
+        return None
+
+    return {
+        'tournament': {
+            'id': row.id,
+            'name': row.tournament_name,
+            'type': row.type,
+            'num_courts': row.num_courts
+        },
+        'season': {
+            'id': row.season_id,
+            'name': row.season_name
+        } if row.season_id is not None else None,
+        'super_tournament': {
+            'id': row.super_tournament_id,
+            'name': row.super_tournament_name,
+            'description': row.description
+        } if row.super_tournament_id is not None else None
+    }
+
+def get_tournament_hierarchy(tournament_id: Any) -> Optional[Dict[str, Any]]:
+    """
+    Get a tournament with its season and super tournament.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        Optional[Dict[str, Any]]: {"tournament": {id, name, type, num_courts},
+        "season": {id, name}, "super_tournament": {id, name, description}} (season /
+        super_tournament None when missing), or None if the tournament doesn't exist
+    """
+    try:
+        tournament_id = int(tournament_id)
+    except (TypeError, ValueError):
+        return None
+    return get_or_build(('tournament', tournament_id), lambda: _load_tournament_hierarchy(tournament_id))
+
+def get_super_tournament_id(tournament_id: Any) -> Optional[int]:
+    """
+    Get the super tournament a tournament belongs to (through its season).
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        Optional[int]: ID of the super tournament, or None if the tournament or its
+        season / super tournament doesn't exist
+    """
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    if not hierarchy or not hierarchy['super_tournament']:
+        return None
+    return hierarchy['super_tournament']['id']
+
+def get_num_courts(tournament_id: Any) -> Optional[int]:
+    """
+    Get the number of courts of a tournament.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        Optional[int]: Number of courts, or None if the tournament doesn't exist
+    """
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    return hierarchy['tournament']['num_courts'] if hierarchy else None
@@ -0,0 +1,403 @@
+import json
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ijson  # Optional: streams big archives instead of loading them whole
+except ImportError:
+    ijson = None
+
+from models import db, SuperTournament, Season, Tournament, Team, Player, Match, Score, Round
+from cache import mark_tournament_changed, mark_players_changed
+from hierarchy import invalidate_hierarchy
+from player_search import mark_search_index_stale
+from utils import normalize_name
+from routes.match.match_bulk import bulk_create_matches
+
+# Columns filled in when an archived player lacks a value for a required field
+PLAYER_DEFAULTS = {
+    'gender': 'Unknown',
+    'age': 0,
+    'phone_number': '0000000000',
+    'email': '',
+    'skill_type': 'intermediate'
+}
+# Team slots that do not hold a real team
+PLACEHOLDER_TEAM_IDS = (None, '', 'TBD')
+# Upper bound on the number of values in one IN clause
+IN_BATCH = 1000
+
+def _chunked(values: List[Any], size: int = IN_BATCH) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def read_archive(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+    """
+    Open an archive written by migrations/v1/gen.py or GET /export-archive.
+
+    Both layouts are accepted: a season ({"name", "categories", "players"}) and a
+    super tournament ({"name", "seasons", "players"}). With ijson installed the file
+    is streamed, one season at a time, and players are read in a separate pass;
+    otherwise it is loaded with json.load.
+
+    Args:
+        path: Path of the archive JSON file
+
+    Returns:
+        Tuple: archive info ({'name', 'layout'}), an iterator over seasons
+        ({'name', 'categories'}) and an iterator over players
+    """
+    if ijson is None:
+        with open(path, 'rb') as f:
+            archive = json.load(f)
+        if 'seasons' in archive:
+            info = {'name': archive['name'], 'layout': 'super_tournament'}
+            seasons = iter(archive['seasons'])
+        else:
+            info = {'name': archive['name'], 'layout': 'season'}
+            seasons = iter([archive])
+        return info, seasons, iter(archive.get('players') or [])
+
+    info = {'name': None, 'layout': 'season'}
+    with open(path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'name' and event == 'string':
+                info['name'] = value
+            elif prefix == 'seasons' and event == 'start_array':
+                info['layout'] = 'super_tournament'
+                break
+            elif prefix == 'categories' and event == 'start_array':
+                break
+
+    def stream(item_path):
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, item_path, use_float=True)
+
+    if info['layout'] == 'super_tournament':
+        seasons = stream('seasons.item')
+    else:
+        seasons = iter([{'name': info['name'], 'categories': stream('categories.item')}])
+    return info, seasons, stream('players.item')
+
+def split_season_name(name: str) -> Tuple[str, str]:
+    """Split an archived season name ("<super tournament> - <season>") into its parts"""
+    super_tournament_name, separator, season_name = (name or '').rpartition(' - ')
+    if not separator:
+        return name, name
+    return super_tournament_name, season_name
+
+def get_or_create(model: Any, defaults: Optional[Dict[str, Any]] = None, **keys: Any) -> Tuple[Any, bool]:
+    instance = model.query.filter_by(**keys).first()
+    if instance:
+        return instance, False
+    instance = model(**keys, **(defaults or {}))
+    db.session.add(instance)
+    db.session.flush()
+    return instance, True
+
+def import_players(players: Iterator[Dict[str, Any]], super_tournament_id: int) -> Dict[str, int]:
+    """
+    Insert archived players that are not in the database yet (natural key: UUID).
+
+    Args:
+        players: Archived player dicts
+        super_tournament_id: Super tournament new players belong to
+
+    Returns:
+        Dict[str, int]: Number of players created and already present
+    """
+    archived = {}
+    for player in players:
+        if player.get('uuid'):
+            archived[player['uuid']] = player
+
+    existing = set()
+    for uuids in _chunked(list(archived.keys())):
+        existing.update(uuid for uuid, in db.session.query(Player.uuid).filter(Player.uuid.in_(uuids)).all())
+
+    rows = []
+    for uuid, player in archived.items():
+        if uuid in existing:
+            continue
+        row = {
+            'uuid': uuid,
+            'first_name': player.get('firstName') or 'Unknown',
+            'last_name': player.get('lastName'),
+            'gender': player.get('gender'),
+            'age': player.get('age'),
+            'phone_number': player.get('phoneNo'),
+            'email': player.get('email'),
+            'skill_type': (player.get('skill') or '').lower() or None,
+            'dupr_id': player.get('duprId'),
+            'super_tournament_id': super_tournament_id,
+            # Bulk inserts skip the ORM event that normally sets it
+            'search_key': normalize_name(player.get('firstName') or 'Unknown', player.get('lastName'))
+        }
+        for column, default in PLAYER_DEFAULTS.items():
+            if row[column] is None:
+                row[column] = default
+        rows.append(row)
+
+    db.session.bulk_insert_mappings(Player, rows)
+    mark_players_changed()
+    mark_search_index_stale(super_tournament_id)
+    return {'created': len(rows), 'existing': len(existing)}
+
+def import_season(season_data: Dict[str, Any], super_tournament: SuperTournament,
+                  match_ids: Dict[int, int]) -> Dict[str, int]:
+    """
+    Import one archived season: its tournaments, teams, rounds, matches and scores.
+
+    Everything is resolved in memory first and written with bulk inserts in
+    dependency order (tournaments, teams, round entries, matches, scores, then the
+    bracket links). Rows that already exist under their natural key are reused, so
+    running the same import twice changes nothing:
+
+    * season: (super tournament, name); tournament: (season, name)
+    * team: team ID; round entry: (tournament, round, pool, team)
+    * match: (tournament, round, pool, name, team1, team2)
+
+    Archived predecessor/successor references are old match IDs. They are remapped
+    through match_ids (old ID -> new ID, shared across seasons) once the matches are
+    in; links to matches that are not in the archive are dropped. Nothing is
+    committed here.
+
+    Args:
+        season_data: Archived season ({'name', 'categories'})
+        super_tournament: Super tournament the season belongs to
+        match_ids: Old -> new match ID map, extended in place
+
+    Returns:
+        Dict[str, int]: Counts of created and reused rows
+    """
+    _, season_name = split_season_name(season_data.get('name'))
+    season, _ = get_or_create(Season, name=season_name, super_tournament_id=super_tournament.id)
+    categories = list(season_data.get('categories') or [])
+
+    counts = {
+        'tournaments': 0, 'teams': 0, 'rounds': 0, 'matches': 0, 'scores': 0,
+        'existing_matches': 0, 'links': 0, 'unresolved_links': 0
+    }
+
+    tournaments = []
+    for category in categories:
+        tournament, created = get_or_create(
+            Tournament,
+            defaults={'type': category.get('type') or 'regular'},
+            tournament_name=category['name'],
+            season_id=season.id
+        )
+        tournaments.append(tournament)
+        counts['tournaments'] += int(created)
+
+    # gen-2.py lists every team of the season under each category, so a team goes to
+    # the category whose matches it plays in, or else the first category listing it
+    team_tournament = {}
+    for category, tournament in zip(categories, tournaments):
+        for round_data in category.get('rounds') or []:
+            for pool in round_data.get('pools') or []:
+                for match in pool.get('matches') or []:
+                    for team_id in (match.get('teamId1'), match.get('teamId2')):
+                        if team_id not in PLACEHOLDER_TEAM_IDS:
+                            team_tournament.setdefault(team_id, tournament.id)
+    archived_teams = {}
+    for category, tournament in zip(categories, tournaments):
+        for team in category.get('teams') or []:
+            team_tournament.setdefault(team['id'], tournament.id)
+            archived_teams.setdefault(team['id'], team)
+
+    tournament_ids = {tournament.id for tournament in tournaments}
+    existing_teams = {}
+    for team_ids in _chunked(list(team_tournament.keys())):
+        existing_teams.update(db.session.query(Team.team_id, Team.tournament_id).filter(Team.team_id.in_(team_ids)).all())
+    conflicts = [team_id for team_id, tournament_id in existing_teams.items() if tournament_id not in tournament_ids]
+    if conflicts:
+        raise ValueError(f"Team IDs already used by other tournaments: {conflicts[:10]}")
+
+    team_rows = []
+    for team_id, tournament_id in team_tournament.items():
+        if team_id in existing_teams:
+            continue
+        team = archived_teams.get(team_id, {})
+        team_rows.append({
+            'team_id': team_id,
+            'name': team.get('name') or f"Team {team_id}",
+            'tournament_id': tournament_id,
+            'player1_uuid': team.get('player1uuid') or None,
+            'player2_uuid': team.get('player2uuid') or None
+        })
+    # Drop links to players that are neither in the archive nor in the database
+    player_uuids = list({row[column] for row in team_rows for column in ('player1_uuid', 'player2_uuid') if row[column]})
+    known_players = set()
+    for uuids in _chunked(player_uuids):
+        known_players.update(uuid for uuid, in db.session.query(Player.uuid).filter(Player.uuid.in_(uuids)).all())
+    for row in team_rows:
+        for column in ('player1_uuid', 'player2_uuid'):
+            if row[column] not in known_players:
+                row[column] = None
+
+    db.session.bulk_insert_mappings(Team, team_rows)
+    mark_players_changed()
+    counts['teams'] = len(team_rows)
+
+    existing_rounds = set(db.session.query(
+        Round.tournament_id, Round.round_id, Round.pool, Round.team_id
+    ).filter(Round.tournament_id.in_(tournament_ids)).all())
+
+    existing_matches = {}
+    for match in db.session.query(
+        Match.id, Match.tournament_id, Match.round_id, Match.pool, Match.match_name, Match.team1_id, Match.team2_id
+    ).filter(Match.tournament_id.in_(tournament_ids)).all():
+        existing_matches[tuple(match[1:])] = match.id
+
+    round_rows = []
+    links = []  # (old match ID, archived match)
+    for category, tournament in zip(categories, tournaments):
+        match_rows = []
+        archived_matches = []
+        scores = []
+        for round_data in category.get('rounds') or []:
+            round_id = str(round_data.get('id'))
+            for pool in round_data.get('pools') or []:
+                pool_name = pool.get('poolName')
+                for match in pool.get('matches') or []:
+                    team1_id, team2_id = match.get('teamId1'), match.get('teamId2')
+                    for team_id in (team1_id, team2_id):
+                        key = (tournament.id, int(round_id), pool_name, team_id)
+                        if team_id not in PLACEHOLDER_TEAM_IDS and key not in existing_rounds:
+                            existing_rounds.add(key)
+                            round_rows.append({
+                                'tournament_id': tournament.id,
+                                'round_id': int(round_id),
+                                'pool': pool_name,
+                                'team_id': team_id,
+                                'name': round_data.get('name')
+                            })
+
+                    key = (tournament.id, round_id, pool_name, match.get('name'), team1_id, team2_id)
+                    if key in existing_matches:
+                        counts['existing_matches'] += 1
+                        if match.get('id') is not None:
+                            match_ids[match['id']] = existing_matches[key]
+                        continue
+
+                    match_rows.append({
+                        'match_name': match.get('name'),
+                        'round_id': round_id,
+                        'pool': pool_name,
+                        'team1_id': team1_id,
+                        'team2_id': team2_id,
+                        'status': match.get('status') or 'pending',
+                        'is_final': bool(match.get('isFinal')),
+                        'winner_team_id': match.get('winnerTeamId'),
+                        'outcome': match.get('outcome') or 'normal',
+                        'round_number': match.get('roundNumber'),
+                        'bracket_position': match.get('bracketPosition')
+                    })
+                    archived_matches.append(match)
+
+        new_ids = bulk_create_matches(tournament.id, match_rows, with_scores=False)
+        counts['matches'] += len(new_ids)
+
+        for new_id, match in zip(new_ids, archived_matches):
+            if match.get('id') is not None:
+                match_ids[match['id']] = new_id
+            for team_key, score_key in (('teamId1', 'teamId1_score'), ('teamId2', 'teamId2_score')):
+                if match.get(score_key) is not None and match.get(team_key) not in PLACEHOLDER_TEAM_IDS:
+                    scores.append({
+                        'match_id': new_id,
+                        'team_id': match[team_key],
+                        'score': int(match[score_key]),
+                        'tournament_id': tournament.id
+                    })
+            links.append((new_id, match))
+
+        db.session.bulk_insert_mappings(Score, scores)
+        counts['scores'] += len(scores)
+
+    db.session.bulk_insert_mappings(Round, round_rows)
+    counts['rounds'] = len(round_rows)
+    for tournament in tournaments:
+        # Bulk inserts skip the unit of work, so flag the tournaments for cache invalidation
+        mark_tournament_changed(tournament.id)
+
+    # Bracket links point at old match IDs; remap them now that every match has its new ID
+    link_rows = []
+    for new_id, match in links:
+        row = {}
+        for archive_key, column in (('predecessor1', 'predecessor_1'), ('predecessor2', 'predecessor_2'),
+                                    ('successor', 'successor'), ('loserSuccessor', 'loser_successor')):
+            old_id = match.get(archive_key)
+            if old_id is None:
+                continue
+            if old_id in match_ids:
+                row[column] = match_ids[old_id]
+                counts['links'] += 1
+            else:
+                counts['unresolved_links'] += 1
+        if row:
+            link_rows.append({'id': new_id, **row})
+    db.session.bulk_update_mappings(Match, link_rows)
+
+    return counts
+
+def import_archive(path: str, super_tournament_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Import a season or super tournament archive, committing once per season.
+
+    Args:
+        path: Path of the archive JSON file
+        super_tournament_id: Import into this existing super tournament instead of
+            the one named in the archive (found or created by name)
+
+    Returns:
+        Dict[str, Any]: Super tournament ID and per-season counts
+    """
+    info, seasons, players = read_archive(path)
+
+    if super_tournament_id:
+        super_tournament = SuperTournament.query.filter_by(id=super_tournament_id).first()
+        if not super_tournament:
+            raise ValueError(f"Super tournament with ID {super_tournament_id} not found")
+    else:
+        name = info['name'] if info['layout'] == 'super_tournament' else split_season_name(info['name'])[0]
+        super_tournament, _ = get_or_create(SuperTournament, name=name)
+
+    # Teams reference players, so players go in first
+    summary = {
+        'super_tournament_id': super_tournament.id,
+        'players': import_players(players, super_tournament.id),
+        'seasons': []
+    }
+    db.session.commit()
+
+    match_ids = {}
+    for season_data in seasons:
+        try:
+            counts = import_season(season_data, super_tournament, match_ids)
+            db.session.commit()
+            invalidate_hierarchy()
+        except Exception:
+            db.session.rollback()
+            raise
+        summary['seasons'].append({'name': season_data.get('name'), **counts})
+
+    return summary
+
+if __name__ == "__main__":
+    # Usage: python import_archive.py <archive.json> [super_tournament_id]
+    from app import app
+
+    if len(sys.argv) < 2:
+        print("Usage: python import_archive.py <archive.json> [super_tournament_id]")
+        sys.exit(1)
+
+    with app.app_context():
+        db.create_all()
+        start = time.time()
+        summary = import_archive(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        print(f"Players: {summary['players']}")
+        for season in summary['seasons']:
+            print(f"Season {season['name']}: {season}")
+        print(f"Imported into super tournament {summary['super_tournament_id']} in {time.time() - start:.2f}s")
@@ -0,0 +1,97 @@
+from typing import Any, Union
+
+from flask import Flask, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+# orjson and msgpack are optional; without them responses go through the standard
+# json module and MessagePack is not offered
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Also accepted in Accept headers, as some clients still send the old name
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed.
+
+    Output matches the default provider (sorted keys, dates as HTTP dates, the same
+    default hook) except that non-ASCII text is written as UTF-8 instead of \\u
+    escapes. Values orjson can't encode (e.g. integers over 64 bits) and non-compact
+    debug output fall back to the standard json module.
+
+    When msgpack is installed, jsonify responses are sent as MessagePack to clients
+    whose Accept header prefers application/msgpack over application/json.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def _dumps_bytes(self, obj: Any) -> bytes:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=options)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # Let the json module decide: it accepts NaN / Infinity and raises its usual errors
+            return super().loads(s)
+
+    def wants_msgpack(self) -> bool:
+        """Whether the current request asks for MessagePack"""
+        if msgpack is None or not has_request_context():
+            return False
+        best = request.accept_mimetypes.best_match((self.mimetype,) + MSGPACK_MIMETYPES)
+        return best in MSGPACK_MIMETYPES
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        body = None
+        if self.wants_msgpack():
+            try:
+                body = msgpack.packb(obj, default=self.default, use_bin_type=True)
+            except (TypeError, OverflowError):
+                pass  # Not representable in MessagePack (e.g. integers over 64 bits); send JSON
+
+        if body is not None:
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+        elif orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            response = super().response(obj)
+        else:
+            response = self._app.response_class(self._dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+def init_json(app: Flask) -> FastJSONProvider:
+    """
+    Use FastJSONProvider for the app's jsonify, request.get_json and dict responses.
+
+    Args:
+        app: Flask app
+
+    Returns:
+        FastJSONProvider: The installed provider
+    """
+    app.json = FastJSONProvider(app)
+    return app.json
@@ -0,0 +1,458 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import aliased
+
+from models import (
+    db, Match, Team, Score, Player, Tournament, Season,
+    TournamentResult, LeaderboardEntry
+)
+from routes.round.round_bracket import BRACKET_POOLS
+
+# Ranking points by finishing position: every position from the listed one up to the next gets the points
+RANKING_POINTS = (
+    (1, 100),
+    (2, 75),
+    (3, 60),
+    (4, 50),
+    (5, 40),
+    (9, 25),
+    (17, 15),
+    (33, 10),
+    (65, 5)
+)
+
+def ranking_points_for(position: int) -> int:
+    """
+    Ranking points for a finishing position.
+
+    Args:
+        position: Finishing position (1 = winner)
+
+    Returns:
+        int: Points from RANKING_POINTS
+    """
+    points = 0
+    for from_position, position_points in RANKING_POINTS:
+        if position >= from_position:
+            points = position_points
+    return points
+
+def team_key(team_id: str, player1_uuid: Optional[str], player2_uuid: Optional[str]) -> str:
+    """
+    Key that identifies the same pair across tournaments.
+
+    Args:
+        team_id: Team ID (only used when the team has no players)
+        player1_uuid: First player's UUID
+        player2_uuid: Second player's UUID
+
+    Returns:
+        str: Sorted player UUIDs joined by '|', or the team ID
+    """
+    players = sorted(uuid for uuid in (player1_uuid, player2_uuid) if uuid)
+    return '|'.join(players) if players else team_id
+
+def find_final_matches(matches: List[Any]) -> Tuple[Optional[Any], Optional[Any]]:
+    """
+    The knockout final and 3rd place match among a tournament's matches.
+
+    Args:
+        matches: Rows with id, pool, round_number, successor and loser_successor
+
+    Returns:
+        Tuple[Optional[Any], Optional[Any]]: Final and 3rd place match (None when
+        the tournament has none)
+    """
+    loser_targets = {match.loser_successor for match in matches if match.loser_successor}
+    # The final has no successor and is nobody's loser route; a 3rd place match is one
+    knockout_ends = [
+        match for match in matches
+        if match.pool == 'knockout' and not match.successor
+    ]
+    finals = [match for match in knockout_ends if match.id not in loser_targets]
+    final = max(finals, key=lambda match: match.round_number or 0) if finals else None
+    third_place = next((match for match in knockout_ends if match.id in loser_targets), None)
+    return final, third_place
+
+def is_tournament_complete(matches: List[Any]) -> bool:
+    """
+    Whether a tournament is finished: it has matches, all of them are final and
+    its knockout final, if it has one, has a winner.
+
+    Args:
+        matches: Rows as expected by compute_positions
+
+    Returns:
+        bool: True once the finishing positions can no longer change
+    """
+    if not matches or not all(match.is_final for match in matches):
+        return False
+    final, _ = find_final_matches(matches)
+    return final is None or bool(final.winner_team_id)
+
+def compute_positions(matches: List[Any], team_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Finishing position of every team from a tournament's matches.
+
+    Bracket teams finish ahead of teams knocked out in the pools. Within the
+    bracket the champion comes first, then the beaten finalist, the 3rd place
+    match, and then how far each team got in the knockout, losers and plate
+    brackets; teams knocked out at the same stage share a position. Pool teams
+    are ordered like the standings, by wins and points difference. Until the
+    tournament is finished (see is_tournament_complete) the positions are provisional.
+
+    Args:
+        matches: Rows with id, pool, round_number, team1_id, team2_id, winner_team_id,
+            is_final, successor, loser_successor, team1_score, team2_score
+        team_ids: Every team of the tournament
+
+    Returns:
+        Dict[str, Dict[str, int]]: position, matches_played, matches_won and
+        points_difference per team ID
+    """
+    stats = {
+        team_id: {'matches_played': 0, 'matches_won': 0, 'points_difference': 0,
+                  'group_won': 0, 'group_difference': 0}
+        for team_id in team_ids
+    }
+    reached = {}  # (team_id, pool) -> furthest round_number
+
+    for match in matches:
+        teams = [team_id for team_id in (match.team1_id, match.team2_id) if team_id in stats]
+        in_bracket = match.pool in BRACKET_POOLS
+
+        if in_bracket:
+            for team_id in teams:
+                key = (team_id, match.pool)
+                reached[key] = max(reached.get(key, 0), match.round_number or 0)
+
+        if len(teams) < 2:
+            continue
+        team1_score = match.team1_score or 0
+        team2_score = match.team2_score or 0
+        if not match.is_final and team1_score == 0 and team2_score == 0:
+            continue  # Not played yet
+
+        winner = match.winner_team_id
+        if not winner and team1_score != team2_score:
+            winner = match.team1_id if team1_score > team2_score else match.team2_id
+
+        for team_id, difference in ((match.team1_id, team1_score - team2_score),
+                                    (match.team2_id, team2_score - team1_score)):
+            team_stats = stats[team_id]
+            team_stats['matches_played'] += 1
+            team_stats['points_difference'] += difference
+            if winner == team_id:
+                team_stats['matches_won'] += 1
+            if not in_bracket:
+                team_stats['group_difference'] += difference
+                if winner == team_id:
+                    team_stats['group_won'] += 1
+
+    final, third_place = find_final_matches(matches)
+
+    def placing(match, team_id):
+        """2 for the winner of a decided match, 1 for its loser, 0 otherwise"""
+        if match is None or not match.is_final or not match.winner_team_id:
+            return 0
+        if team_id == match.winner_team_id:
+            return 2
+        return 1 if team_id in (match.team1_id, match.team2_id) else 0
+
+    keys = {}
+    for team_id, team_stats in stats.items():
+        in_bracket = any((team_id, pool) in reached for pool in BRACKET_POOLS)
+        if in_bracket:
+            keys[team_id] = (
+                1,
+                placing(final, team_id),
+                placing(third_place, team_id),
+                reached.get((team_id, 'knockout'), 0),
+                reached.get((team_id, 'losers'), 0),
+                reached.get((team_id, 'plate'), 0),
+                0,
+                0
+            )
+        else:
+            keys[team_id] = (0, 0, 0, 0, 0, 0, team_stats['group_won'], team_stats['group_difference'])
+
+    # Position = 1 + number of teams strictly ahead, so equal keys share a position
+    ordered = sorted(keys.items(), key=lambda item: item[1], reverse=True)
+    positions = {}
+    for index, (team_id, key) in enumerate(ordered):
+        if index > 0 and key == ordered[index - 1][1]:
+            positions[team_id] = positions[ordered[index - 1][0]]
+        else:
+            positions[team_id] = index + 1
+
+    return {
+        team_id: {
+            'position': positions[team_id],
+            'matches_played': team_stats['matches_played'],
+            'matches_won': team_stats['matches_won'],
+            'points_difference': team_stats['points_difference']
+        }
+        for team_id, team_stats in stats.items()
+    }
+
+def load_tournament_matches(tournament_id: int) -> List[Any]:
+    """
+    Every match of a tournament with both scores, in one query.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        List[Any]: Rows as expected by compute_positions
+    """
+    Score1 = aliased(Score)
+    Score2 = aliased(Score)
+
+    return db.session.query(
+        Match.id,
+        Match.pool,
+        Match.round_number,
+        Match.team1_id,
+        Match.team2_id,
+        Match.winner_team_id,
+        Match.is_final,
+        Match.successor,
+        Match.loser_successor,
+        Score1.score.label('team1_score'),
+        Score2.score.label('team2_score')
+    ).outerjoin(
+        Score1, (Score1.match_id == Match.id) & (Score1.team_id == Match.team1_id)
+    ).outerjoin(
+        Score2, (Score2.match_id == Match.id) & (Score2.team_id == Match.team2_id)
+    ).filter(
+        Match.tournament_id == tournament_id
+    ).all()
+
+def refresh_tournament_results(tournament_id: int) -> int:
+    """
+    Recompute a tournament's results and update the leaderboards they feed.
+
+    The tournament's TournamentResult rows are replaced, then only the season and
+    super tournament leaderboard rows of the players and teams involved (before or
+    after the change) are rebuilt. Until the tournament is complete its rows are
+    provisional: they carry no ranking points and the leaderboards leave them out.
+    Nothing is committed here.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        int: Number of team results written
+    """
+    scope = db.session.query(Tournament.season_id, Season.super_tournament_id).join(
+        Season, Tournament.season_id == Season.id
+    ).filter(Tournament.id == tournament_id).first()
+    if scope is None:
+        return 0
+    season_id, super_tournament_id = scope
+
+    teams = Team.query.filter_by(tournament_id=tournament_id).all()
+    matches = load_tournament_matches(tournament_id)
+    complete = is_tournament_complete(matches)
+    positions = compute_positions(matches, [team.team_id for team in teams])
+
+    # Plain rows: loaded objects would linger in the session after the bulk delete below
+    previous = db.session.query(
+        TournamentResult.team_key,
+        TournamentResult.player1_uuid,
+        TournamentResult.player2_uuid
+    ).filter(TournamentResult.tournament_id == tournament_id).all()
+    team_keys = {result.team_key for result in previous}
+    player_uuids = {uuid for result in previous for uuid in (result.player1_uuid, result.player2_uuid) if uuid}
+
+    TournamentResult.query.filter_by(tournament_id=tournament_id).delete(synchronize_session=False)
+
+    rows = []
+    for team in teams:
+        result = positions[team.team_id]
+        key = team_key(team.team_id, team.player1_uuid, team.player2_uuid)
+        team_keys.add(key)
+        player_uuids.update(uuid for uuid in (team.player1_uuid, team.player2_uuid) if uuid)
+        rows.append({
+            'tournament_id': tournament_id,
+            'season_id': season_id,
+            'super_tournament_id': super_tournament_id,
+            'team_id': team.team_id,
+            'team_key': key,
+            'team_name': team.name,
+            'player1_uuid': team.player1_uuid,
+            'player2_uuid': team.player2_uuid,
+            'position': result['position'],
+            'provisional': not complete,
+            'ranking_points': ranking_points_for(result['position']) if complete else 0,
+            'matches_played': result['matches_played'],
+            'matches_won': result['matches_won'],
+            'points_difference': result['points_difference']
+        })
+    if rows:
+        db.session.bulk_insert_mappings(TournamentResult, rows)
+
+    refresh_leaderboards('season', season_id, team_keys, player_uuids)
+    refresh_leaderboards('super_tournament', super_tournament_id, team_keys, player_uuids)
+
+    return len(rows)
+
+def update_tournament_completion(tournament_id: int) -> bool:
+    """
+    Refresh a tournament's results when a match result changes whether (or how) it finished.
+
+    Runs for every finalized or re-opened match, so while the tournament is being
+    played it costs one or two indexed lookups: the results are only recomputed
+    once no match is pending (the tournament just finished, or a finished
+    tournament's result was corrected), or when a pending match re-opens a
+    tournament whose results already count in the leaderboards. Nothing is
+    committed here.
+
+    Args:
+        tournament_id: ID of the tournament
+
+    Returns:
+        bool: Whether the results were recomputed
+    """
+    pending = db.session.query(Match.id).filter(
+        Match.tournament_id == tournament_id,
+        or_(Match.is_final == False, Match.is_final.is_(None))
+    ).first() is not None
+
+    if pending:
+        counted = db.session.query(TournamentResult.id).filter(
+            TournamentResult.tournament_id == tournament_id,
+            TournamentResult.provisional == False
+        ).first() is not None
+        if not counted:
+            return False
+
+    refresh_tournament_results(tournament_id)
+    return True
+
+def refresh_leaderboards(scope: str, scope_id: int, team_keys: Set[str], player_uuids: Set[str]) -> None:
+    """
+    Rebuild the leaderboard rows of some teams and players from their final
+    (non-provisional) results.
+
+    Args:
+        scope: 'season' or 'super_tournament'
+        scope_id: ID of the season or super tournament
+        team_keys: Teams (team_key) whose rows to rebuild
+        player_uuids: Players whose rows to rebuild
+    """
+    scope_column = TournamentResult.season_id if scope == 'season' else TournamentResult.super_tournament_id
+
+    conditions = []
+    if team_keys:
+        conditions.append(TournamentResult.team_key.in_(team_keys))
+    if player_uuids:
+        conditions.append(TournamentResult.player1_uuid.in_(player_uuids))
+        conditions.append(TournamentResult.player2_uuid.in_(player_uuids))
+    if not conditions:
+        return
+
+    results = TournamentResult.query.filter(
+        scope_column == scope_id,
+        TournamentResult.provisional == False,
+        or_(*conditions)
+    ).all()
+
+    entries = {}
+
+    def add(entity_type, entity_id, name, result):
+        entry = entries.setdefault((entity_type, entity_id), {
+            'scope': scope,
+            'scope_id': scope_id,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'name': name,
+            'ranking_points': 0,
+            'tournaments_played': 0,
+            'best_position': None,
+            'titles': 0,
+            'matches_played': 0,
+            'matches_won': 0,
+            'points_difference': 0,
+            'last_tournament_id': 0
+        })
+        entry['ranking_points'] += result.ranking_points
+        entry['tournaments_played'] += 1
+        entry['best_position'] = min(entry['best_position'] or result.position, result.position)
+        entry['titles'] += 1 if result.position == 1 else 0
+        entry['matches_played'] += result.matches_played or 0
+        entry['matches_won'] += result.matches_won or 0
+        entry['points_difference'] += result.points_difference or 0
+        # Teams are shown under their most recent name
+        if result.tournament_id >= entry['last_tournament_id']:
+            entry['last_tournament_id'] = result.tournament_id
+            if entity_type == 'team':
+                entry['name'] = result.team_name
+
+    for result in sorted(results, key=lambda r: r.tournament_id):
+        if result.team_key in team_keys:
+            add('team', result.team_key, result.team_name, result)
+        for uuid in (result.player1_uuid, result.player2_uuid):
+            if uuid and uuid in player_uuids:
+                add('player', uuid, None, result)
+
+    player_names = {
+        player.uuid: f"{player.first_name} {player.last_name or ''}".strip()
+        for player in Player.query.filter(Player.uuid.in_(player_uuids)).all()
+    } if player_uuids else {}
+    for (entity_type, entity_id), entry in entries.items():
+        entry.pop('last_tournament_id')
+        if entity_type == 'player':
+            entry['name'] = player_names.get(entity_id)
+
+    for entity_type, entity_ids in (('team', team_keys), ('player', player_uuids)):
+        if entity_ids:
+            LeaderboardEntry.query.filter(
+                LeaderboardEntry.scope == scope,
+                LeaderboardEntry.scope_id == scope_id,
+                LeaderboardEntry.entity_type == entity_type,
+                LeaderboardEntry.entity_id.in_(entity_ids)
+            ).delete(synchronize_session=False)
+
+    if entries:
+        db.session.bulk_insert_mappings(LeaderboardEntry, list(entries.values()))
+
+def get_leaderboard(scope: str, scope_id: int, entity_type: str = 'player',
+                    limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Read a leaderboard page (one indexed query).
+
+    Args:
+        scope: 'season' or 'super_tournament'
+        scope_id: ID of the season or super tournament
+        entity_type: 'player' or 'team'
+        limit: Page size
+        offset: Rows to skip
+
+    Returns:
+        List[Dict[str, Any]]: Leaderboard rows, best first
+    """
+    entries = LeaderboardEntry.query.filter_by(
+        scope=scope,
+        scope_id=scope_id,
+        entity_type=entity_type
+    ).order_by(
+        LeaderboardEntry.ranking_points.desc(),
+        LeaderboardEntry.matches_won.desc(),
+        LeaderboardEntry.points_difference.desc(),
+        LeaderboardEntry.id
+    ).offset(offset).limit(limit).all()
+
+    return [{
+        'rank': offset + index + 1,
+        'entity_id': entry.entity_id,
+        'name': entry.name,
+        'ranking_points': entry.ranking_points,
+        'tournaments_played': entry.tournaments_played,
+        'best_position': entry.best_position,
+        'titles': entry.titles,
+        'matches_played': entry.matches_played,
+        'matches_won': entry.matches_won,
+        'points_difference': entry.points_difference
+    } for index, entry in enumerate(entries)]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the loser route column to the match table.
+Run this script to add: loser_successor
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from config import Config
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+def run_migration():
+    """Add loser_successor column to match table"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db = SQLAlchemy(app)
+    
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME 
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = :db_name 
+                AND TABLE_NAME = 'match' 
+                AND COLUMN_NAME = 'loser_successor'
+            """), {'db_name': Config.DB_NAME})
+            
+            if result.fetchone():
+                print("Column already exists. Migration not needed.")
+                return
+            
+            alter_sql = "ALTER TABLE `match` ADD COLUMN `loser_successor` INT NULL"
+            print(f"Executing: {alter_sql}")
+            db.session.execute(text(alter_sql))
+            db.session.commit()
+            
+            # Add foreign key constraint if it doesn't exist
+            result = db.session.execute(text("""
+                SELECT CONSTRAINT_NAME 
+                FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS 
+                WHERE TABLE_SCHEMA = :db_name 
+                AND TABLE_NAME = 'match' 
+                AND CONSTRAINT_NAME = 'match_loser_successor_fk'
+            """), {'db_name': Config.DB_NAME})
+            
+            if not result.fetchone():
+                print("Adding foreign key constraint: match_loser_successor_fk")
+                db.session.execute(text("""
+                    ALTER TABLE `match`
+                    ADD CONSTRAINT `match_loser_successor_fk` 
+                    FOREIGN KEY (`loser_successor`) REFERENCES `match`(`id`) ON DELETE SET NULL
+                """))
+                db.session.commit()
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Error running migration: {str(e)}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,8 @@
+-- Add the loser route column to match table
+-- Used by double elimination (losers bracket), 3rd place and plate matches
+
+ALTER TABLE `match`
+ADD COLUMN `loser_successor` INT NULL;
+
+ALTER TABLE `match`
+ADD CONSTRAINT `match_loser_successor_fk` FOREIGN KEY (`loser_successor`) REFERENCES `match`(`id`) ON DELETE SET NULL;
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the indexes used by the paged player listing.
+Run this script to add: ix_player_super_tournament_checked_in, ix_team_player1_uuid_tournament
+and ix_team_player2_uuid_tournament
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from config import Config
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+# (table, index name, columns)
+INDEXES = [
+    ('player', 'ix_player_super_tournament_checked_in', '`super_tournament_id`, `checked_in`, `id`'),
+    ('team', 'ix_team_player1_uuid_tournament', '`player1_uuid`, `tournament_id`'),
+    ('team', 'ix_team_player2_uuid_tournament', '`player2_uuid`, `tournament_id`'),
+]
+
+def run_migration():
+    """Add the player listing indexes that don't exist yet"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db = SQLAlchemy(app)
+    
+    with app.app_context():
+        try:
+            for table, index_name, columns in INDEXES:
+                result = db.session.execute(text("""
+                    SELECT INDEX_NAME 
+                    FROM INFORMATION_SCHEMA.STATISTICS 
+                    WHERE TABLE_SCHEMA = :db_name 
+                    AND TABLE_NAME = :table_name 
+                    AND INDEX_NAME = :index_name
+                """), {'db_name': Config.DB_NAME, 'table_name': table, 'index_name': index_name})
+                
+                if not result.fetchone():
+                    create_sql = f"CREATE INDEX `{index_name}` ON `{table}` ({columns})"
+                    print(f"Executing: {create_sql}")
+                    db.session.execute(text(create_sql))
+                    db.session.commit()
+                else:
+                    print(f"Index {index_name} already exists.")
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Error running migration: {str(e)}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,9 @@
+-- Indexes for the paged player listing (GET /player-ops/players)
+-- Keyset pages of a super tournament, optionally filtered by check-in
+-- and the player -> teams lookup, one index per team slot
+
+CREATE INDEX `ix_player_super_tournament_checked_in` ON `player` (`super_tournament_id`, `checked_in`, `id`);
+
+CREATE INDEX `ix_team_player1_uuid_tournament` ON `team` (`player1_uuid`, `tournament_id`);
+
+CREATE INDEX `ix_team_player2_uuid_tournament` ON `team` (`player2_uuid`, `tournament_id`);
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the normalized name search key to the player table.
+Run this script to add: search_key (+ index) and backfill it for existing players
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from config import Config
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+from utils import normalize_name
+
+# Players backfilled per UPDATE batch
+BATCH_SIZE = 1000
+
+def run_migration():
+    """Add search_key column and index to player table and backfill it"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db = SQLAlchemy(app)
+    
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME 
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = :db_name 
+                AND TABLE_NAME = 'player' 
+                AND COLUMN_NAME = 'search_key'
+            """), {'db_name': Config.DB_NAME})
+            
+            if not result.fetchone():
+                alter_sql = "ALTER TABLE `player` ADD COLUMN `search_key` VARCHAR(120) NULL"
+                print(f"Executing: {alter_sql}")
+                db.session.execute(text(alter_sql))
+                db.session.commit()
+            else:
+                print("Column already exists.")
+            
+            # Add index if it doesn't exist
+            result = db.session.execute(text("""
+                SELECT INDEX_NAME 
+                FROM INFORMATION_SCHEMA.STATISTICS 
+                WHERE TABLE_SCHEMA = :db_name 
+                AND TABLE_NAME = 'player' 
+                AND INDEX_NAME = 'ix_player_super_tournament_search_key'
+            """), {'db_name': Config.DB_NAME})
+            
+            if not result.fetchone():
+                print("Adding index: ix_player_super_tournament_search_key")
+                db.session.execute(text("""
+                    CREATE INDEX `ix_player_super_tournament_search_key`
+                    ON `player` (`super_tournament_id`, `search_key`)
+                """))
+                db.session.commit()
+            
+            # Backfill keys that are missing (re-running only touches new rows)
+            players = db.session.execute(text(
+                "SELECT id, first_name, last_name FROM player WHERE search_key IS NULL"
+            )).fetchall()
+            print(f"Backfilling search_key for {len(players)} players")
+            
+            for start in range(0, len(players), BATCH_SIZE):
+                db.session.execute(
+                    text("UPDATE player SET search_key = :search_key WHERE id = :id"),
+                    [
+                        {'id': player.id, 'search_key': normalize_name(player.first_name, player.last_name)}
+                        for player in players[start:start + BATCH_SIZE]
+                    ]
+                )
+                db.session.commit()
+            
+            print("Migration completed successfully!")
+            
+        except Exception as e:
+            print(f"Error running migration: {str(e)}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    run_migration()
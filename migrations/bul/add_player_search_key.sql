@@ -0,0 +1,8 @@
+-- Add the normalized name search key to the player table
+-- Used by name lookups, player search and duplicate detection
+-- Backfill existing rows with add_player_search_key.py (accent folding is done in Python)
+
+ALTER TABLE `player`
+ADD COLUMN `search_key` VARCHAR(120) NULL;
+
+CREATE INDEX `ix_player_super_tournament_search_key` ON `player` (`super_tournament_id`, `search_key`);
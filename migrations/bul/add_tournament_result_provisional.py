@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the provisional flag to the tournament_result table.
+Run this script to add: provisional
+Then run rebuild_leaderboards.py so existing results are flagged and the
+leaderboards only count finished tournaments.
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from config import Config
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+def run_migration():
+    """Add provisional column to tournament_result table"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db = SQLAlchemy(app)
+    
+    with app.app_context():
+        try:
+            # Check if column already exists
+            result = db.session.execute(text("""
+                SELECT COLUMN_NAME 
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = :db_name 
+                AND TABLE_NAME = 'tournament_result' 
+                AND COLUMN_NAME = 'provisional'
+            """), {'db_name': Config.DB_NAME})
+            
+            if result.fetchone():
+                print("Column already exists. Migration not needed.")
+                return
+            
+            alter_sql = "ALTER TABLE `tournament_result` ADD COLUMN `provisional` BOOLEAN NOT NULL DEFAULT TRUE"
+            print(f"Executing: {alter_sql}")
+            db.session.execute(text(alter_sql))
+            db.session.commit()
+            
+            print("Migration completed successfully! Run rebuild_leaderboards.py to recompute the results.")
+            
+        except Exception as e:
+            print(f"Error running migration: {str(e)}")
+            db.session.rollback()
+            raise
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,6 @@
+-- Add the provisional flag to tournament_result table
+-- Results of tournaments still being played carry no ranking points and are left out of the leaderboards.
+-- Run rebuild_leaderboards.py afterwards to recompute existing results.
+
+ALTER TABLE `tournament_result`
+ADD COLUMN `provisional` BOOLEAN NOT NULL DEFAULT TRUE;
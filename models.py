@@ -1,5 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from enum import Enum
+from utils import normalize_name
 
 db = SQLAlchemy()
 
@@ -61,6 +63,11 @@ class Team(db.Model):
     # Add relationships for players
     player1 = db.relationship('Player', foreign_keys=[player1_uuid])
     player2 = db.relationship('Player', foreign_keys=[player2_uuid])
+    # Player -> teams lookups go through one index per slot (see get_player_teams)
+    __table_args__ = (
+        db.Index('ix_team_player1_uuid_tournament', 'player1_uuid', 'tournament_id'),
+        db.Index('ix_team_player2_uuid_tournament', 'player2_uuid', 'tournament_id'),
+    )
 
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -75,6 +82,12 @@ class Player(db.Model):
     dupr_id = db.Column(db.String(50), nullable=True)
     super_tournament_id = db.Column(db.Integer, db.ForeignKey('super_tournament.id'), nullable=False)
     checked_in = db.Column(db.Boolean, default=False)
+    # Normalized "first last" name (utils.normalize_name) for indexed name lookups
+    search_key = db.Column(db.String(120), nullable=True)
+    __table_args__ = (
+        db.Index('ix_player_super_tournament_search_key', 'super_tournament_id', 'search_key'),
+        db.Index('ix_player_super_tournament_checked_in', 'super_tournament_id', 'checked_in', 'id'),
+    )
     # Add relationships for teams where player is player1 or player2
     teams_as_player1 = db.relationship('Team', 
                                      foreign_keys=[Team.player1_uuid],
@@ -85,6 +98,12 @@ class Player(db.Model):
     # Add relationship to super tournament
     super_tournament = db.relationship('SuperTournament', backref='players', lazy=True)
 
+@event.listens_for(Player, 'before_insert')
+@event.listens_for(Player, 'before_update')
+def set_player_search_key(mapper, connection, player):
+    """Keep search_key in sync with the name on every ORM insert and update"""
+    player.search_key = normalize_name(player.first_name, player.last_name)
+
 class Match(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     match_name = db.Column(db.String(50), nullable=False)
@@ -102,6 +121,8 @@ class Match(db.Model):
     predecessor_1 = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
     predecessor_2 = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
     successor = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
+    # Where the loser goes (double elimination losers bracket, 3rd place, plate)
+    loser_successor = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
     bracket_position = db.Column(db.Integer, nullable=True)
     round_number = db.Column(db.Integer, nullable=True)
 
@@ -119,4 +140,72 @@ class Round(db.Model):
     team_id = db.Column(db.String(50), db.ForeignKey('team.team_id'), nullable=True)
     pool = db.Column(db.String(20), nullable=False)
     name = db.Column(db.String(100), nullable=True)
-    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), nullable=False)
\ No newline at end of file
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), nullable=False)
+
+class PlayerRating(db.Model):
+    __tablename__ = 'player_rating'
+    __table_args__ = (db.UniqueConstraint('player_uuid', 'super_tournament_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    player_uuid = db.Column(db.String(36), db.ForeignKey('player.uuid'), nullable=False, index=True)
+    super_tournament_id = db.Column(db.Integer, db.ForeignKey('super_tournament.id'), nullable=False)
+    rating = db.Column(db.Float, nullable=False)
+    matches_played = db.Column(db.Integer, default=0)
+    last_match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
+
+class PlayerRatingHistory(db.Model):
+    __tablename__ = 'player_rating_history'
+    __table_args__ = (db.Index('ix_player_rating_history_player', 'player_uuid', 'super_tournament_id', 'match_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    player_uuid = db.Column(db.String(36), db.ForeignKey('player.uuid'), nullable=False)
+    super_tournament_id = db.Column(db.Integer, db.ForeignKey('super_tournament.id'), nullable=False)
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), nullable=False)
+    match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=False, index=True)
+    rating_before = db.Column(db.Float, nullable=False)
+    rating_after = db.Column(db.Float, nullable=False)
+
+# Final placing of a team in a tournament, with its ranking points
+class TournamentResult(db.Model):
+    __tablename__ = 'tournament_result'
+    __table_args__ = (db.UniqueConstraint('tournament_id', 'team_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), nullable=False, index=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False, index=True)
+    super_tournament_id = db.Column(db.Integer, db.ForeignKey('super_tournament.id'), nullable=False, index=True)
+    team_id = db.Column(db.String(50), db.ForeignKey('team.team_id'), nullable=False)
+    # Identifies the same pair across tournaments (team IDs are per tournament)
+    team_key = db.Column(db.String(80), nullable=False, index=True)
+    team_name = db.Column(db.String(100), nullable=True)
+    player1_uuid = db.Column(db.String(36), db.ForeignKey('player.uuid'), nullable=True, index=True)
+    player2_uuid = db.Column(db.String(36), db.ForeignKey('player.uuid'), nullable=True, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    # Tournament still being played: no ranking points and left out of the leaderboards
+    provisional = db.Column(db.Boolean, nullable=False, default=True)
+    ranking_points = db.Column(db.Integer, nullable=False, default=0)
+    matches_played = db.Column(db.Integer, default=0)
+    matches_won = db.Column(db.Integer, default=0)
+    points_difference = db.Column(db.Integer, default=0)
+
+# Season / super tournament rollup of TournamentResult rows per player or team
+class LeaderboardEntry(db.Model):
+    __tablename__ = 'leaderboard_entry'
+    __table_args__ = (
+        db.UniqueConstraint('scope', 'scope_id', 'entity_type', 'entity_id'),
+        db.Index('ix_leaderboard_entry_rank', 'scope', 'scope_id', 'entity_type', 'ranking_points'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(20), nullable=False)  # 'season' or 'super_tournament'
+    scope_id = db.Column(db.Integer, nullable=False)
+    entity_type = db.Column(db.String(10), nullable=False)  # 'player' or 'team'
+    entity_id = db.Column(db.String(80), nullable=False)  # Player UUID or team key
+    name = db.Column(db.String(120), nullable=True)
+    ranking_points = db.Column(db.Integer, nullable=False, default=0)
+    tournaments_played = db.Column(db.Integer, default=0)
+    best_position = db.Column(db.Integer, nullable=True)
+    titles = db.Column(db.Integer, default=0)
+    matches_played = db.Column(db.Integer, default=0)
+    matches_won = db.Column(db.Integer, default=0)
+    points_difference = db.Column(db.Integer, default=0)
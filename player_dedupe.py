@@ -0,0 +1,360 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import case
+
+from models import (
+    db, Player, Team, Tournament, Season,
+    PlayerRating, PlayerRatingHistory, TournamentResult, LeaderboardEntry
+)
+from cache import mark_players_changed
+from player_search import mark_search_index_stale
+from ratings import rebuild_ratings
+from leaderboards import refresh_tournament_results
+from utils import normalize_name, normalize_phone
+
+DEFAULT_THRESHOLD = 0.8
+# Blocks bigger than this are skipped: a key that common cannot tell players apart
+MAX_BLOCK_SIZE = 200
+# Name similarity needed before a shared phone or email counts
+MIN_NAME_SIMILARITY = 0.6
+# Score of a pair that only has the name to go on. Exact names reach 0.7, below
+# DEFAULT_THRESHOLD: namesakes are only proposed when a lower threshold is asked for
+NAME_ONLY_WEIGHT = 0.7
+# Email domain of the addresses generated for players registered without one
+PLACEHOLDER_EMAIL_DOMAIN = '@example.com'
+
+def load_players(super_tournament_id: int) -> List[Dict[str, Any]]:
+    """
+    Load a super tournament's players with their normalized keys and tournaments.
+
+    Two queries: the players, and every (player, team, tournament) slot of the
+    super tournament's teams.
+
+    Args:
+        super_tournament_id: ID of the super tournament
+
+    Returns:
+        List[Dict[str, Any]]: Player dicts (id, uuid, names, search_key, phone,
+        email, dupr_id, gender, tournaments, teams)
+    """
+    slots = defaultdict(lambda: {'tournaments': set(), 'teams': set()})
+    for team_id, tournament_id, player1_uuid, player2_uuid in db.session.query(
+        Team.team_id, Team.tournament_id, Team.player1_uuid, Team.player2_uuid
+    ).join(
+        Tournament, Team.tournament_id == Tournament.id
+    ).join(
+        Season, Tournament.season_id == Season.id
+    ).filter(Season.super_tournament_id == super_tournament_id).all():
+        for uuid in (player1_uuid, player2_uuid):
+            if uuid:
+                slots[uuid]['tournaments'].add(tournament_id)
+                slots[uuid]['teams'].add(team_id)
+
+    players = []
+    for player in Player.query.filter_by(super_tournament_id=super_tournament_id).order_by(Player.id).all():
+        if not player.uuid:
+            continue
+        email = (player.email or '').strip().lower()
+        players.append({
+            'id': player.id,
+            'uuid': player.uuid,
+            'first_name': player.first_name,
+            'last_name': player.last_name,
+            'search_key': player.search_key or normalize_name(player.first_name, player.last_name),
+            'phone': normalize_phone(player.phone_number),
+            'email': email if '@' in email and not email.endswith(PLACEHOLDER_EMAIL_DOMAIN) else None,
+            'dupr_id': (player.dupr_id or '').strip() or None,
+            'gender': (player.gender or '').strip().lower(),
+            'tournaments': slots[player.uuid]['tournaments'],
+            'teams': slots[player.uuid]['teams']
+        })
+    return players
+
+def blocking_keys(player: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """Keys that put possible duplicates of a player in the same block"""
+    keys = set()
+    if player['phone']:
+        keys.add(('phone', player['phone']))
+    if player['email']:
+        keys.add(('email', player['email']))
+    if player['dupr_id']:
+        keys.add(('dupr', player['dupr_id']))
+
+    words = player['search_key'].split()
+    if words:
+        keys.add(('name', player['search_key']))
+        # "smith j" and "john s": a typo in one of the names still shares a block
+        keys.add(('last', f"{words[-1]} {words[0][0]}"))
+        keys.add(('first', f"{words[0]} {words[-1][0]}"))
+    return keys
+
+def score_pair(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple[float, List[str]]:
+    """
+    How likely two players are the same person, from 0 to 1, with the reasons.
+
+    A shared DUPR ID decides it; a shared phone or email counts when the names are
+    similar too; otherwise the name similarity alone is scaled down (below
+    DEFAULT_THRESHOLD). Players that played together or in the same tournament
+    are never duplicates, and neither are players with different phone numbers or
+    emails unless they share the other one.
+    """
+    if a['teams'] & b['teams'] or a['tournaments'] & b['tournaments']:
+        return 0.0, []
+    if a['dupr_id'] and b['dupr_id'] and a['dupr_id'] != b['dupr_id']:
+        return 0.0, []
+    if a['gender'] and b['gender'] and a['gender'] != b['gender']:
+        return 0.0, []
+
+    similarity = SequenceMatcher(None, a['search_key'], b['search_key']).ratio()
+
+    if a['dupr_id'] and a['dupr_id'] == b['dupr_id']:
+        return 1.0, ['dupr_id', f'name {similarity:.2f}']
+
+    # Two real, different contact details: namesakes, unless the other detail is shared
+    shared_contact = any(a[field] and a[field] == b[field] for field in ('phone', 'email'))
+    conflicting_contact = any(a[field] and b[field] and a[field] != b[field] for field in ('phone', 'email'))
+    if conflicting_contact and not shared_contact:
+        return 0.0, []
+
+    reasons = [f'name {similarity:.2f}']
+    score = NAME_ONLY_WEIGHT * similarity
+    if similarity >= MIN_NAME_SIMILARITY:
+        if a['phone'] and a['phone'] == b['phone']:
+            reasons.append('phone')
+            score = max(score, 0.85 + 0.15 * similarity)
+        if a['email'] and a['email'] == b['email']:
+            reasons.append('email')
+            score = max(score, 0.8 + 0.15 * similarity)
+        if len(reasons) == 3:
+            score = max(score, 0.9 + 0.1 * similarity)
+    return round(min(score, 1.0), 3), reasons
+
+def find_duplicate_players(super_tournament_id: int, threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Propose merges for near-duplicate players of a super tournament.
+
+    Players are blocked by normalized phone, email, DUPR ID and name keys, and
+    only pairs within a block are scored (score_pair), so the work grows with the
+    block sizes rather than with the square of the player count. Pairs at or above
+    threshold are joined with union-find, strongest first; a join is skipped when
+    the two groups share a tournament, since one person cannot play a tournament
+    twice. Each group keeps the player with the most teams (then a DUPR ID, then
+    the oldest row).
+
+    Args:
+        super_tournament_id: ID of the super tournament
+        threshold: Minimum pair score for a merge
+
+    Returns:
+        List[Dict[str, Any]]: Proposals ({'keep': player, 'merge': [player + score/reasons]}),
+        biggest groups first
+    """
+    players = load_players(super_tournament_id)
+    by_uuid = {player['uuid']: player for player in players}
+
+    blocks = defaultdict(list)
+    for player in players:
+        for key in blocking_keys(player):
+            blocks[key].append(player['uuid'])
+
+    pairs = {}
+    for uuids in blocks.values():
+        if len(uuids) < 2 or len(uuids) > MAX_BLOCK_SIZE:
+            continue
+        for uuid_a, uuid_b in combinations(uuids, 2):
+            pair = (uuid_a, uuid_b) if uuid_a < uuid_b else (uuid_b, uuid_a)
+            if pair in pairs:
+                continue
+            score, reasons = score_pair(by_uuid[pair[0]], by_uuid[pair[1]])
+            pairs[pair] = (score, reasons)
+
+    parent = {}
+    tournaments = {}
+
+    def find(uuid):
+        parent.setdefault(uuid, uuid)
+        while parent[uuid] != uuid:
+            parent[uuid] = parent[parent[uuid]]
+            uuid = parent[uuid]
+        return uuid
+
+    matched = {}
+    for (uuid_a, uuid_b), (score, reasons) in sorted(pairs.items(), key=lambda item: -item[1][0]):
+        if score < threshold:
+            break
+        root_a, root_b = find(uuid_a), find(uuid_b)
+        if root_a == root_b:
+            continue
+        tournaments_a = tournaments.get(root_a, by_uuid[root_a]['tournaments'])
+        tournaments_b = tournaments.get(root_b, by_uuid[root_b]['tournaments'])
+        if tournaments_a & tournaments_b:
+            continue
+        parent[root_b] = root_a
+        tournaments[root_a] = tournaments_a | tournaments_b
+        for uuid in (uuid_a, uuid_b):
+            if score > matched.get(uuid, (0, []))[0]:
+                matched[uuid] = (score, reasons)
+
+    groups = defaultdict(list)
+    for uuid in parent:
+        groups[find(uuid)].append(by_uuid[uuid])
+
+    proposals = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda player: (-len(player['teams']), player['dupr_id'] is None, player['id']))
+        keep, duplicates = members[0], members[1:]
+        proposals.append({
+            'keep': _proposal_player(keep),
+            'merge': [
+                dict(_proposal_player(player), score=matched[player['uuid']][0], reasons=matched[player['uuid']][1])
+                for player in duplicates
+            ]
+        })
+
+    proposals.sort(key=lambda proposal: (-len(proposal['merge']), proposal['keep']['id']))
+    return proposals
+
+def _proposal_player(player: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': player['id'],
+        'uuid': player['uuid'],
+        'first_name': player['first_name'],
+        'last_name': player['last_name'],
+        'teams': len(player['teams'])
+    }
+
+def merge_players(super_tournament_id: int, merges: Dict[str, str], refresh: bool = True) -> Dict[str, int]:
+    """
+    Merge duplicate players into the players they duplicate.
+
+    A duplicate that plays in a tournament its target (or another duplicate of the
+    same target) also plays in is refused, like in find_duplicate_players.
+    Team.player1_uuid / player2_uuid are rewritten with one bulk UPDATE each
+    (a CASE over the whole mapping), as are the tournament results; the
+    duplicates' ratings, rating history and leaderboard rows are dropped and the
+    duplicate Player rows deleted. With
+    refresh, ratings and the affected tournaments' results are then rebuilt so the
+    kept players carry the merged history. Nothing is committed here.
+
+    Args:
+        super_tournament_id: ID of the super tournament
+        merges: Duplicate UUID -> UUID of the player to keep
+        refresh: Rebuild ratings and tournament results afterwards
+
+    Returns:
+        Dict[str, int]: Number of players merged and team slots rewritten
+
+    Raises:
+        ValueError: A player is not in the super tournament, or two merged players
+        play in the same tournament
+    """
+    # Follow chains (a -> b -> c) so every duplicate points at a kept player
+    resolved = {}
+    for duplicate in merges:
+        target, seen = merges[duplicate], {duplicate}
+        while target in merges and target not in seen:
+            seen.add(target)
+            target = merges[target]
+        if target != duplicate:
+            resolved[duplicate] = target
+    if not resolved:
+        return {'players': 0, 'team_slots': 0}
+
+    uuids = set(resolved) | set(resolved.values())
+    found = {
+        uuid for uuid, in db.session.query(Player.uuid).filter(
+            Player.uuid.in_(uuids),
+            Player.super_tournament_id == super_tournament_id
+        ).all()
+    }
+    missing = uuids - found
+    if missing:
+        raise ValueError(f"Players not found in super tournament {super_tournament_id}: {sorted(missing)[:10]}")
+
+    # Same veto as find_duplicate_players: two people in one tournament are not one player
+    player_tournaments = defaultdict(set)
+    for tournament_id, player1_uuid, player2_uuid in db.session.query(
+        Team.tournament_id, Team.player1_uuid, Team.player2_uuid
+    ).filter(
+        (Team.player1_uuid.in_(uuids)) | (Team.player2_uuid.in_(uuids))
+    ).all():
+        for uuid in (player1_uuid, player2_uuid):
+            if uuid in uuids:
+                player_tournaments[uuid].add(tournament_id)
+
+    groups = defaultdict(list)
+    for duplicate, target in resolved.items():
+        groups[target].append(duplicate)
+    for target, members in groups.items():
+        played = {tournament_id: target for tournament_id in player_tournaments[target]}
+        for duplicate in members:
+            for tournament_id in player_tournaments[duplicate]:
+                if tournament_id in played:
+                    raise ValueError(
+                        f"Players {played[tournament_id]} and {duplicate} both play in tournament "
+                        f"{tournament_id}, so they can't be merged"
+                    )
+                played[tournament_id] = duplicate
+
+    duplicates = list(resolved)
+    affected_tournaments = {
+        tournament_id for tournament_id, in db.session.query(Team.tournament_id).filter(
+            (Team.player1_uuid.in_(duplicates)) | (Team.player2_uuid.in_(duplicates))
+        ).distinct().all()
+    }
+
+    team_slots = 0
+    for column in (Team.player1_uuid, Team.player2_uuid):
+        team_slots += Team.query.filter(column.in_(duplicates)).update(
+            {column: case(resolved, value=column)},
+            synchronize_session=False
+        )
+
+    # Results reference players too; refresh_tournament_results rebuilds them properly
+    for column in (TournamentResult.player1_uuid, TournamentResult.player2_uuid):
+        TournamentResult.query.filter(column.in_(duplicates)).update(
+            {column: case(resolved, value=column)},
+            synchronize_session=False
+        )
+
+    PlayerRatingHistory.query.filter(PlayerRatingHistory.player_uuid.in_(duplicates)).delete(synchronize_session=False)
+    PlayerRating.query.filter(PlayerRating.player_uuid.in_(duplicates)).delete(synchronize_session=False)
+    LeaderboardEntry.query.filter(
+        LeaderboardEntry.entity_type == 'player',
+        LeaderboardEntry.entity_id.in_(duplicates)
+    ).delete(synchronize_session=False)
+    Player.query.filter(Player.uuid.in_(duplicates)).delete(synchronize_session=False)
+
+    # Bulk statements skip the unit of work, so flag the player data for invalidation
+    mark_players_changed()
+    mark_search_index_stale(super_tournament_id)
+
+    if refresh:
+        rebuild_ratings(super_tournament_id)
+        for tournament_id in sorted(affected_tournaments):
+            refresh_tournament_results(tournament_id)
+
+    return {'players': len(resolved), 'team_slots': team_slots}
+
+def apply_proposals(super_tournament_id: int, proposals: Iterable[Dict[str, Any]], refresh: bool = True) -> Dict[str, int]:
+    """
+    Apply merge proposals from find_duplicate_players (see merge_players).
+
+    Args:
+        super_tournament_id: ID of the super tournament
+        proposals: Proposals to apply
+        refresh: Rebuild ratings and tournament results afterwards
+
+    Returns:
+        Dict[str, int]: Number of players merged and team slots rewritten
+    """
+    merges = {}
+    for proposal in proposals:
+        for player in proposal['merge']:
+            merges[player['uuid']] = proposal['keep']['uuid']
+    return merge_players(super_tournament_id, merges, refresh)
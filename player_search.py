@@ -0,0 +1,317 @@
+import bisect
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from models import db, Player
+from utils import normalize_name
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Trigram (Dice) similarity a fuzzy match needs to be returned
+MIN_SIMILARITY = 0.3
+# Scores of prefix matches, above any fuzzy match that is not exact
+EXACT_SCORE = 1.0
+NAME_PREFIX_SCORE = 0.95
+TOKEN_PREFIX_SCORE = 0.9
+# Prefix matches looked at per search, so very short queries stay cheap
+MAX_PREFIX_SCAN = 500
+# Player columns that change what the index holds
+INDEXED_ATTRIBUTES = ('uuid', 'first_name', 'last_name', 'super_tournament_id')
+
+def trigrams(key: str) -> Set[str]:
+    """Trigrams of a normalized name, padded so word starts and ends count"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class PlayerSearchIndex:
+    """
+    In-memory name index of one super tournament's players.
+
+    Holds the sorted normalized names and name parts (for prefix / typeahead
+    matches) and a trigram posting list (for fuzzy matches). Players are added and
+    removed one at a time, so the index follows player writes without a rebuild.
+    """
+
+    def __init__(self):
+        self.players = {}  # uuid -> player dict
+        self.names = []  # sorted (search_key, uuid)
+        self.tokens = []  # sorted (name part, uuid)
+        self.postings = defaultdict(set)  # trigram -> uuids
+        self.lock = threading.Lock()
+
+    def add(self, player: Dict[str, Any]) -> None:
+        """
+        Add or replace a player.
+
+        Args:
+            player: Dict with id, uuid, first_name and last_name
+        """
+        with self.lock:
+            self._remove(player['uuid'])
+            self._add(player, bisect.insort)
+
+    def load(self, players: List[Dict[str, Any]]) -> None:
+        """Fill an empty index at once, sorting the name lists a single time"""
+        with self.lock:
+            for player in players:
+                self._add(player, list.append)
+            self.names.sort()
+            self.tokens.sort()
+
+    def _add(self, player, insert):
+        key = normalize_name(player['first_name'], player['last_name'])
+        grams = trigrams(key)
+        self.players[player['uuid']] = dict(player, search_key=key, trigram_count=len(grams))
+        insert(self.names, (key, player['uuid']))
+        for token in set(key.split()):
+            insert(self.tokens, (token, player['uuid']))
+        for gram in grams:
+            self.postings[gram].add(player['uuid'])
+
+    def remove(self, uuid: str) -> None:
+        with self.lock:
+            self._remove(uuid)
+
+    def _remove(self, uuid: str) -> None:
+        player = self.players.pop(uuid, None)
+        if player is None:
+            return
+        key = player['search_key']
+        self._discard(self.names, (key, uuid))
+        for token in set(key.split()):
+            self._discard(self.tokens, (token, uuid))
+        for gram in trigrams(key):
+            self.postings[gram].discard(uuid)
+            if not self.postings[gram]:
+                del self.postings[gram]
+
+    @staticmethod
+    def _discard(entries, entry):
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    @staticmethod
+    def _prefixed(entries, prefix):
+        position = bisect.bisect_left(entries, (prefix,))
+        for key, uuid in entries[position:position + MAX_PREFIX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            yield key, uuid
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """
+        Rank players by how well their name matches a query.
+
+        An exact name scores 1.0, a name starting with the query 0.95 and a name
+        whose parts start with every query word (e.g. "jo sm" for "John Smith")
+        0.9. Everything else is scored by trigram similarity, so typos and
+        swapped letters still match.
+
+        Args:
+            query: What was typed
+            limit: Maximum number of results
+
+        Returns:
+            List[Dict[str, Any]]: Best matches first, each with id, uuid, first_name,
+            last_name and score
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        with self.lock:
+            scores = {}
+
+            for name, uuid in self._prefixed(self.names, key):
+                scores[uuid] = EXACT_SCORE if name == key else NAME_PREFIX_SCORE
+
+            words = key.split()
+            for _, uuid in self._prefixed(self.tokens, words[0]):
+                if uuid in scores:
+                    continue
+                parts = self.players[uuid]['search_key'].split()
+                if all(any(part.startswith(word) for part in parts) for word in words[1:]):
+                    scores[uuid] = TOKEN_PREFIX_SCORE
+
+            query_grams = trigrams(key)
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self.postings.get(gram, ()))
+            for uuid, count in shared.items():
+                similarity = 2.0 * count / (len(query_grams) + self.players[uuid]['trigram_count'])
+                if similarity >= MIN_SIMILARITY and similarity > scores.get(uuid, 0):
+                    scores[uuid] = similarity
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self.players[item[0]]['search_key']))
+            return [
+                {
+                    'id': self.players[uuid]['id'],
+                    'uuid': uuid,
+                    'first_name': self.players[uuid]['first_name'],
+                    'last_name': self.players[uuid]['last_name'],
+                    'score': round(score, 3)
+                }
+                for uuid, score in ranked[:limit]
+            ]
+
+# Attempts at building an index before serving one that can't be published
+MAX_BUILD_ATTEMPTS = 3
+
+_lock = threading.Lock()
+_indexes = {}
+# Committed player changes per super tournament (None: changes to every one), so a
+# build can tell whether players changed while it was reading them
+_generations = Counter()
+
+def _generation(super_tournament_id):
+    return _generations[super_tournament_id], _generations[None]
+
+def _load_index(super_tournament_id):
+    # A connection of its own, so the read sees everything committed before it
+    # started (the request's session may hold an older snapshot)
+    with db.engine.connect() as connection:
+        rows = connection.execute(
+            select(Player.id, Player.uuid, Player.first_name, Player.last_name).where(
+                Player.super_tournament_id == super_tournament_id
+            )
+        ).all()
+    index = PlayerSearchIndex()
+    index.load([row._asdict() for row in rows if row.uuid])
+    return index
+
+def get_search_index(super_tournament_id: int) -> PlayerSearchIndex:
+    """
+    Get the name index of a super tournament, building it on first use.
+
+    Args:
+        super_tournament_id: ID of the super tournament
+
+    Returns:
+        PlayerSearchIndex: The index, kept up to date by player writes from then on
+    """
+    super_tournament_id = int(super_tournament_id)
+    for _ in range(MAX_BUILD_ATTEMPTS):
+        with _lock:
+            index = _indexes.get(super_tournament_id)
+            generation = _generation(super_tournament_id)
+        if index is not None:
+            return index
+
+        index = _load_index(super_tournament_id)
+
+        with _lock:
+            # A player committed during the read found no index to update; start over
+            if _generation(super_tournament_id) != generation:
+                continue
+            # Another request may have built it meanwhile; keep the first one
+            return _indexes.setdefault(super_tournament_id, index)
+
+    # Players keep changing: answer from the last build without publishing it
+    return index
+
+def search_players(super_tournament_id: int, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Typeahead / fuzzy player search within a super tournament.
+
+    Args:
+        super_tournament_id: ID of the super tournament
+        query: What was typed
+        limit: Maximum number of results
+
+    Returns:
+        List[Dict[str, Any]]: Ranked matches (see PlayerSearchIndex.search)
+    """
+    return get_search_index(super_tournament_id).search(query, limit)
+
+def invalidate_search_index(super_tournament_id: Optional[int] = None) -> None:
+    """
+    Drop a super tournament's index (or all of them) so the next search rebuilds it.
+
+    Args:
+        super_tournament_id: ID of the super tournament, or None for every index
+    """
+    with _lock:
+        if super_tournament_id is None:
+            _indexes.clear()
+            _generations[None] += 1
+        else:
+            _indexes.pop(int(super_tournament_id), None)
+            _generations[int(super_tournament_id)] += 1
+
+def mark_search_index_stale(super_tournament_id: Optional[int] = None, session: Optional[Session] = None) -> None:
+    """
+    Record a player change made outside the ORM unit of work (bulk inserts/updates).
+
+    The index is dropped when the session commits.
+
+    Args:
+        super_tournament_id: ID of the super tournament, or None for every index
+        session: Session the change was made in (defaults to db.session)
+    """
+    if session is None:
+        session = db.session
+    session.info.setdefault('stale_search_indexes', set()).add(super_tournament_id)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_player_changes(session, flush_context):
+    changes = session.info.setdefault('search_index_changes', [])
+    for player in session.new:
+        if isinstance(player, Player):
+            changes.append(('add', player.super_tournament_id, {
+                'id': player.id,
+                'uuid': player.uuid,
+                'first_name': player.first_name,
+                'last_name': player.last_name
+            }))
+    for player in session.dirty:
+        if not isinstance(player, Player):
+            continue
+        state = inspect(player)
+        changed = [name for name in INDEXED_ATTRIBUTES if state.attrs[name].history.has_changes()]
+        if not changed:
+            continue  # e.g. a check-in
+        # Drop the entry under its old UUID / super tournament, then add it back
+        old_uuid = (state.attrs.uuid.history.deleted or [player.uuid])[0]
+        old_super_tournament_id = (state.attrs.super_tournament_id.history.deleted or [player.super_tournament_id])[0]
+        changes.append(('remove', old_super_tournament_id, {'uuid': old_uuid}))
+        changes.append(('add', player.super_tournament_id, {
+            'id': player.id,
+            'uuid': player.uuid,
+            'first_name': player.first_name,
+            'last_name': player.last_name
+        }))
+    for player in session.deleted:
+        if isinstance(player, Player):
+            changes.append(('remove', player.super_tournament_id, {'uuid': player.uuid}))
+
+@event.listens_for(Session, 'after_commit')
+def _apply_player_changes(session):
+    changes = session.info.pop('search_index_changes', [])
+    stale = session.info.pop('stale_search_indexes', set())
+
+    for super_tournament_id in stale:
+        invalidate_search_index(super_tournament_id)
+
+    for action, super_tournament_id, player in changes:
+        if super_tournament_id is None or not player.get('uuid'):
+            continue
+        with _lock:
+            # Tells an index being built that it may have missed this change
+            _generations[int(super_tournament_id)] += 1
+            index = _indexes.get(int(super_tournament_id))
+        if index is None:
+            continue  # Not built yet; it will be loaded fresh
+        if action == 'add':
+            index.add(player)
+        else:
+            index.remove(player['uuid'])
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_player_changes(session):
+    session.info.pop('search_index_changes', None)
+    session.info.pop('stale_search_indexes', None)
@@ -0,0 +1,371 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import aliased
+
+from models import (
+    db, Match, Team, Score, Tournament, Season, MatchOutcome,
+    PlayerRating, PlayerRatingHistory
+)
+
+DEFAULT_RATING = 1500.0
+# Rating gap at which the stronger team is expected to win 10 to 1
+RATING_SCALE = 400.0
+# New players move faster until their rating has settled
+PROVISIONAL_MATCHES = 10
+K_PROVISIONAL = 40.0
+K_ESTABLISHED = 24.0
+# Winning margin that counts as a "normal" win; bigger wins move ratings more
+MARGIN_REFERENCE = 5
+
+def load_rated_matches(super_tournament_id: int, match_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Load finalized matches of a super tournament with their players and scores.
+
+    One query joins every match to its season, both teams and both scores. Only
+    normally played matches between two real teams count (no byes, walkovers or
+    forfeits).
+
+    Args:
+        super_tournament_id: ID of the super tournament
+        match_ids: Limit to these matches (incremental updates)
+
+    Returns:
+        List[Dict[str, Any]]: Matches in chronological (match ID) order with
+        match_id, tournament_id, team1/team2 player UUIDs, scores and the result
+        for team1 (1 win, 0.5 draw, 0 loss)
+    """
+    Team1 = aliased(Team)
+    Team2 = aliased(Team)
+    Score1 = aliased(Score)
+    Score2 = aliased(Score)
+
+    query = db.session.query(
+        Match.id,
+        Match.tournament_id,
+        Match.team1_id,
+        Match.team2_id,
+        Match.winner_team_id,
+        Team1.player1_uuid.label('team1_player1'),
+        Team1.player2_uuid.label('team1_player2'),
+        Team2.player1_uuid.label('team2_player1'),
+        Team2.player2_uuid.label('team2_player2'),
+        Score1.score.label('team1_score'),
+        Score2.score.label('team2_score')
+    ).join(
+        Tournament, Match.tournament_id == Tournament.id
+    ).join(
+        Season, Tournament.season_id == Season.id
+    ).join(
+        Team1, Match.team1_id == Team1.team_id
+    ).join(
+        Team2, Match.team2_id == Team2.team_id
+    ).outerjoin(
+        Score1, (Score1.match_id == Match.id) & (Score1.team_id == Match.team1_id)
+    ).outerjoin(
+        Score2, (Score2.match_id == Match.id) & (Score2.team_id == Match.team2_id)
+    ).filter(
+        Season.super_tournament_id == super_tournament_id,
+        Match.is_final == True,
+        Match.outcome == MatchOutcome.NORMAL.value
+    )
+    if match_ids is not None:
+        query = query.filter(Match.id.in_(list(match_ids)))
+
+    matches = []
+    for row in query.order_by(Match.id).all():
+        team1_score = row.team1_score or 0
+        team2_score = row.team2_score or 0
+        if row.winner_team_id == row.team1_id:
+            result = 1.0
+        elif row.winner_team_id == row.team2_id:
+            result = 0.0
+        elif team1_score == team2_score == 0:
+            continue  # Finalized without a result, nothing to rate
+        else:
+            result = 1.0 if team1_score > team2_score else 0.0 if team2_score > team1_score else 0.5
+
+        team1_players = [uuid for uuid in (row.team1_player1, row.team1_player2) if uuid]
+        team2_players = [uuid for uuid in (row.team2_player1, row.team2_player2) if uuid]
+        if not team1_players or not team2_players:
+            continue
+
+        matches.append({
+            'match_id': row.id,
+            'tournament_id': row.tournament_id,
+            'team1_players': team1_players,
+            'team2_players': team2_players,
+            'margin': abs(team1_score - team2_score),
+            'result': result
+        })
+
+    return matches
+
+def compute_ratings(matches: List[Dict[str, Any]],
+                    initial: Optional[Dict[str, Tuple[float, int]]] = None) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Replay matches and return the resulting ratings and per-match history.
+
+    Doubles Elo: a team's rating is the mean of its players' ratings and every
+    player of a team moves by the team's result against expectation, scaled by
+    their own K factor and the winning margin. Matches are grouped into waves in
+    which no player appears twice; a player's matches stay in chronological
+    order across waves, and each wave is updated as one vectorized NumPy batch.
+
+    Args:
+        matches: Output of load_rated_matches, in chronological order
+        initial: Starting (rating, matches_played) per player UUID; others start at DEFAULT_RATING
+
+    Returns:
+        Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]: Ratings per player
+        UUID (rating, matches_played, last_match_id) and history rows
+        (player_uuid, tournament_id, match_id, rating_before, rating_after)
+    """
+    initial = initial or {}
+    if not matches:
+        return {}, []
+
+    # Player slots per match: team1 players in columns 0-1, team2 players in 2-3 (-1 = nobody)
+    player_index = {}
+    slots = np.full((len(matches), 4), -1, dtype=np.int64)
+    for m, match in enumerate(matches):
+        for offset, players in ((0, match['team1_players']), (2, match['team2_players'])):
+            for k, uuid in enumerate(players[:2]):
+                if uuid not in player_index:
+                    player_index[uuid] = len(player_index)
+                slots[m, offset + k] = player_index[uuid]
+
+    uuids = list(player_index.keys())
+    ratings = np.array([initial.get(uuid, (DEFAULT_RATING, 0))[0] for uuid in uuids], dtype=np.float64)
+    played = np.array([initial.get(uuid, (DEFAULT_RATING, 0))[1] or 0 for uuid in uuids], dtype=np.int64)
+    last_match = np.full(len(uuids), -1, dtype=np.int64)
+
+    # Wave of a match: one after the latest wave any of its players is already in
+    player_wave = np.full(len(uuids), -1, dtype=np.int64)
+    waves = np.empty(len(matches), dtype=np.int64)
+    for m in range(len(matches)):
+        present = slots[m][slots[m] >= 0]
+        wave = player_wave[present].max() + 1
+        player_wave[present] = wave
+        waves[m] = wave
+
+    results = np.array([match['result'] for match in matches], dtype=np.float64)
+    margins = np.array([match['margin'] for match in matches], dtype=np.float64)
+    margin_factor = np.clip(np.log1p(margins) / np.log1p(MARGIN_REFERENCE), 0.5, 1.5)
+    match_ids = np.array([match['match_id'] for match in matches], dtype=np.int64)
+
+    before = np.zeros((len(matches), 4), dtype=np.float64)
+    after = np.zeros((len(matches), 4), dtype=np.float64)
+
+    order = np.argsort(waves, kind='stable')
+    boundaries = np.flatnonzero(np.diff(waves[order])) + 1
+    for batch in np.split(order, boundaries):
+        batch_slots = slots[batch]
+        present = batch_slots >= 0
+        safe_slots = np.where(present, batch_slots, 0)
+        slot_ratings = np.where(present, ratings[safe_slots], 0.0)
+
+        team1_rating = slot_ratings[:, :2].sum(axis=1) / present[:, :2].sum(axis=1)
+        team2_rating = slot_ratings[:, 2:].sum(axis=1) / present[:, 2:].sum(axis=1)
+        expected = 1.0 / (1.0 + 10.0 ** ((team2_rating - team1_rating) / RATING_SCALE))
+        swing = (results[batch] - expected) * margin_factor[batch]
+
+        k_factor = np.where(played[safe_slots] < PROVISIONAL_MATCHES, K_PROVISIONAL, K_ESTABLISHED)
+        direction = np.array([1.0, 1.0, -1.0, -1.0])
+        delta = np.where(present, k_factor * swing[:, None] * direction, 0.0)
+
+        before[batch] = slot_ratings
+        after[batch] = slot_ratings + delta
+
+        # No player appears twice in a wave, so plain fancy assignment is safe
+        ratings[batch_slots[present]] = after[batch][present]
+        played[batch_slots[present]] += 1
+        last_match[batch_slots[present]] = np.broadcast_to(match_ids[batch][:, None], batch_slots.shape)[present]
+
+    touched = np.flatnonzero(last_match >= 0)
+    final = {
+        uuids[i]: {
+            'rating': float(ratings[i]),
+            'matches_played': int(played[i]),
+            'last_match_id': int(last_match[i])
+        }
+        for i in touched
+    }
+
+    history = []
+    for m, match in enumerate(matches):
+        for column in range(4):
+            if slots[m, column] < 0:
+                continue
+            history.append({
+                'player_uuid': uuids[slots[m, column]],
+                'tournament_id': match['tournament_id'],
+                'match_id': match['match_id'],
+                'rating_before': float(before[m, column]),
+                'rating_after': float(after[m, column])
+            })
+
+    return final, history
+
+def rebuild_ratings(super_tournament_id: int) -> Dict[str, int]:
+    """
+    Recompute every rating of a super tournament from its full match history.
+
+    Existing ratings and history are replaced with bulk statements in the
+    current session; the caller commits.
+
+    Args:
+        super_tournament_id: ID of the super tournament
+
+    Returns:
+        Dict[str, int]: Number of matches replayed and players rated
+    """
+    matches = load_rated_matches(super_tournament_id)
+    ratings, history = compute_ratings(matches)
+
+    PlayerRatingHistory.query.filter_by(super_tournament_id=super_tournament_id).delete(synchronize_session=False)
+    PlayerRating.query.filter_by(super_tournament_id=super_tournament_id).delete(synchronize_session=False)
+
+    db.session.bulk_insert_mappings(PlayerRating, [
+        dict(player_uuid=uuid, super_tournament_id=super_tournament_id, **values)
+        for uuid, values in ratings.items()
+    ])
+    db.session.bulk_insert_mappings(PlayerRatingHistory, [
+        dict(super_tournament_id=super_tournament_id, **row) for row in history
+    ])
+
+    return {'matches': len(matches), 'players': len(ratings)}
+
+def undo_match_ratings(match_id: int, super_tournament_id: int) -> bool:
+    """
+    Take a match out of the stored ratings by restoring its players' pre-match ratings.
+
+    Only possible while the match is the last one rated for each of its players;
+    otherwise nothing is changed and the caller has to rebuild. Nothing is
+    committed here.
+
+    Args:
+        match_id: ID of the match
+        super_tournament_id: ID of the super tournament it was rated in
+
+    Returns:
+        bool: Whether the match is no longer in the ratings
+    """
+    rows = PlayerRatingHistory.query.filter_by(match_id=match_id).all()
+    if not rows:
+        return True
+
+    uuids = [row.player_uuid for row in rows]
+    stored = {
+        rating.player_uuid: rating for rating in PlayerRating.query.filter(
+            PlayerRating.super_tournament_id == super_tournament_id,
+            PlayerRating.player_uuid.in_(uuids)
+        ).all()
+    }
+    if any(uuid not in stored or stored[uuid].last_match_id != match_id for uuid in uuids):
+        return False
+
+    # Each player's previous rated match (history rows are added in rating order)
+    previous = dict(db.session.query(
+        PlayerRatingHistory.player_uuid, PlayerRatingHistory.match_id
+    ).filter(
+        PlayerRatingHistory.super_tournament_id == super_tournament_id,
+        PlayerRatingHistory.player_uuid.in_(uuids),
+        PlayerRatingHistory.match_id != match_id
+    ).order_by(PlayerRatingHistory.id).all())
+
+    for row in rows:
+        rating = stored[row.player_uuid]
+        rating.matches_played = (rating.matches_played or 1) - 1
+        if rating.matches_played <= 0:
+            db.session.delete(rating)  # Never rated without this match, like after a rebuild
+        else:
+            rating.rating = row.rating_before
+            rating.last_match_id = previous.get(row.player_uuid)
+        db.session.delete(row)
+
+    return True
+
+def revert_match_ratings(matches: Iterable[Match]) -> None:
+    """
+    Remove re-opened matches from the ratings.
+
+    A single match that is the latest for all its players is undone in place;
+    anything else rebuilds the affected super tournaments from their finalized
+    matches. Nothing is committed here.
+
+    Args:
+        matches: Matches that are no longer final (e.g. re-opened, or reset by a bracket correction)
+    """
+    match_ids = {match.id for match in matches}
+    if not match_ids:
+        return
+
+    rated = db.session.query(
+        PlayerRatingHistory.match_id, PlayerRatingHistory.super_tournament_id
+    ).filter(PlayerRatingHistory.match_id.in_(match_ids)).distinct().all()
+    if not rated:
+        return
+
+    if len(rated) == 1 and undo_match_ratings(*rated[0]):
+        return
+
+    for super_tournament_id in {super_tournament_id for _, super_tournament_id in rated}:
+        rebuild_ratings(super_tournament_id)
+
+def update_match_ratings(match: Match) -> List[Dict[str, Any]]:
+    """
+    Apply one finalized match to the stored ratings (incremental update).
+
+    A match that is already in the rating history (a corrected result) is undone
+    first, or the super tournament is rebuilt when later matches depend on it.
+    Nothing is committed here.
+
+    Args:
+        match: The match that was just finalized
+
+    Returns:
+        List[Dict[str, Any]]: History rows added for the match (empty if not rated,
+        or if the ratings were rebuilt instead)
+    """
+    super_tournament_id = db.session.query(Season.super_tournament_id).join(
+        Tournament, Tournament.season_id == Season.id
+    ).filter(Tournament.id == match.tournament_id).scalar()
+    if super_tournament_id is None:
+        return []
+
+    if not undo_match_ratings(match.id, super_tournament_id):
+        # Later matches were rated on top of the old result; replay everything
+        rebuild_ratings(super_tournament_id)
+        return []
+
+    matches = load_rated_matches(super_tournament_id, match_ids=[match.id])
+    if not matches:
+        return []
+
+    uuids = matches[0]['team1_players'] + matches[0]['team2_players']
+    stored = {
+        rating.player_uuid: rating for rating in PlayerRating.query.filter(
+            PlayerRating.super_tournament_id == super_tournament_id,
+            PlayerRating.player_uuid.in_(uuids)
+        ).all()
+    }
+
+    ratings, history = compute_ratings(matches, {
+        uuid: (rating.rating, rating.matches_played) for uuid, rating in stored.items()
+    })
+
+    for uuid, values in ratings.items():
+        rating = stored.get(uuid)
+        if rating is None:
+            db.session.add(PlayerRating(player_uuid=uuid, super_tournament_id=super_tournament_id, **values))
+        else:
+            rating.rating = values['rating']
+            rating.matches_played = values['matches_played']
+            rating.last_match_id = values['last_match_id']
+
+    db.session.add_all([
+        PlayerRatingHistory(super_tournament_id=super_tournament_id, **row) for row in history
+    ])
+
+    return history
@@ -0,0 +1,21 @@
+import sys
+import time
+from app import app, db
+from models import Tournament
+from leaderboards import refresh_tournament_results
+
+def rebuild(tournament_ids=None):
+    with app.app_context():
+        if not tournament_ids:
+            tournament_ids = [tournament.id for tournament in Tournament.query.order_by(Tournament.id).all()]
+
+        start = time.time()
+        for tournament_id in tournament_ids:
+            results = refresh_tournament_results(tournament_id)
+            db.session.commit()
+            print(f"Tournament {tournament_id}: {results} team results")
+        print(f"Rebuilt leaderboards for {len(tournament_ids)} tournaments in {time.time() - start:.2f}s")
+
+if __name__ == "__main__":
+    # Usage: python rebuild_leaderboards.py [tournament_id ...]
+    rebuild([int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,21 @@
+import sys
+import time
+from app import app, db
+from models import SuperTournament
+from ratings import rebuild_ratings
+
+def rebuild(super_tournament_ids=None):
+    with app.app_context():
+        if not super_tournament_ids:
+            super_tournament_ids = [st.id for st in SuperTournament.query.all()]
+
+        for super_tournament_id in super_tournament_ids:
+            start = time.time()
+            result = rebuild_ratings(super_tournament_id)
+            db.session.commit()
+            print(f"Super tournament {super_tournament_id}: replayed {result['matches']} matches, "
+                  f"rated {result['players']} players in {time.time() - start:.2f}s")
+
+if __name__ == "__main__":
+    # Usage: python rebuild_ratings.py [super_tournament_id ...]
+    rebuild([int(arg) for arg in sys.argv[1:]])
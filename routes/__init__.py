@@ -10,6 +10,7 @@ from .season import season_bp
 from .super_tournament import super_tournament_bp
 from .match_ops import match_ops_bp
 from .player_ops import player_ops_bp
+from .metrics import metrics_bp
 
 def initialize_routes(app):
     """Initialize all route blueprints with the app"""
@@ -22,4 +23,5 @@ def initialize_routes(app):
     app.register_blueprint(super_tournament_bp)
     app.register_blueprint(match_ops_bp, url_prefix='/match-ops')
     app.register_blueprint(player_ops_bp, url_prefix='/player-ops')
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
 
@@ -8,4 +8,5 @@ from .match_core import (
     assign_pool, assign_court_and_pool
 )
 from .match_fixtures import get_match_fixtures, get_match_fixtures_csv
-from .match_pools import get_pools, update_pools 
\ No newline at end of file
+from .match_pools import get_pools, update_pools
+from .match_bracket import get_bracket 
\ No newline at end of file
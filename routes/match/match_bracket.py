@@ -0,0 +1,172 @@
+from flask import request, jsonify
+from models import Match, Team, Score, db
+from sqlalchemy.orm import aliased
+from . import match_bp
+from cache import VersionedCache, get_tournament_version
+from routes.round.round_bracket import BRACKET_POOLS
+
+# Built bracket views, valid until the tournament's data version changes
+bracket_cache = VersionedCache(maxsize=256, name='bracket')
+
+def load_bracket_rows(tournament_id):
+    """Get every bracket match with team names and scores in a single query"""
+    Team1 = aliased(Team)
+    Team2 = aliased(Team)
+    Score1 = aliased(Score)
+    Score2 = aliased(Score)
+
+    return db.session.query(
+        Match,
+        Team1.name.label('team1_name'),
+        Team2.name.label('team2_name'),
+        Score1.score.label('team1_score'),
+        Score2.score.label('team2_score')
+    ).outerjoin(
+        Team1, Match.team1_id == Team1.team_id
+    ).outerjoin(
+        Team2, Match.team2_id == Team2.team_id
+    ).outerjoin(
+        Score1, (Score1.match_id == Match.id) & (Score1.team_id == Match.team1_id)
+    ).outerjoin(
+        Score2, (Score2.match_id == Match.id) & (Score2.team_id == Match.team2_id)
+    ).filter(
+        Match.tournament_id == tournament_id,
+        Match.pool.in_(BRACKET_POOLS)
+    ).order_by(
+        Match.pool, Match.round_number, Match.bracket_position, Match.id
+    ).all()
+
+def build_bracket_view(rows):
+    """
+    Turn bracket match rows into nested trees with layout slots.
+
+    Each pool becomes one bracket whose roots are the matches without a successor
+    in that pool (normally just the final), so a double-elimination draw comes back
+    as its winners and losers trees. Children are the predecessor matches that
+    advance into a node; loser_successor tells where a node's loser drops to.
+    x is the round column and y the vertical slot: leaves take consecutive slots in
+    bracket order and every parent sits halfway between its children.
+
+    Returns the brackets and, per team, the IDs of the matches it won in order.
+    """
+    nodes = {}
+    pools = {}
+    for row in rows:
+        match = row[0]
+        if match.id in nodes:
+            continue
+        # An empty slot is a bye, anything else without a team is still to be decided
+        empty_slot = "BYE" if match.outcome == 'bye' else "TBD"
+        nodes[match.id] = {
+            'match_id': match.id,
+            'match_name': match.match_name,
+            'round_id': match.round_id,
+            'round_number': match.round_number,
+            'bracket_position': match.bracket_position,
+            'status': match.status,
+            'outcome': match.outcome,
+            'is_final': match.is_final,
+            'winner_team_id': match.winner_team_id,
+            'team1': {
+                'team_id': match.team1_id or empty_slot,
+                'name': row.team1_name or match.team1_id or empty_slot,
+                'score': row.team1_score or 0
+            },
+            'team2': {
+                'team_id': match.team2_id or empty_slot,
+                'name': row.team2_name or match.team2_id or empty_slot,
+                'score': row.team2_score or 0
+            },
+            'predecessor_1': match.predecessor_1,
+            'predecessor_2': match.predecessor_2,
+            'successor': match.successor,
+            'loser_successor': match.loser_successor,
+            'children': []
+        }
+        pools.setdefault(match.pool, []).append(match.id)
+
+    brackets = []
+    for pool, match_ids in pools.items():
+        in_pool = set(match_ids)
+        roots = []
+        for match_id in match_ids:
+            node = nodes[match_id]
+            # Loser routes (3rd place, plate) are not tree edges
+            node['children'] = [
+                nodes[pred_id] for pred_id in (node['predecessor_1'], node['predecessor_2'])
+                if pred_id in in_pool and nodes[pred_id]['successor'] == match_id
+            ]
+            if node['successor'] not in in_pool:
+                roots.append(node)
+
+        # Assign layout slots bottom-up without recursion (brackets can be deep)
+        next_leaf = 0
+        max_round = 1
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if not expanded and node['children']:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in reversed(node['children']))
+                    continue
+                if node['children']:
+                    y = sum(child['layout']['y'] for child in node['children']) / len(node['children'])
+                    depth = max(child['layout']['depth'] for child in node['children']) + 1
+                else:
+                    y = next_leaf
+                    next_leaf += 1
+                    depth = 1
+                round_number = node['round_number'] or depth
+                max_round = max(max_round, round_number)
+                node['layout'] = {'x': round_number - 1, 'y': y, 'depth': depth}
+
+        brackets.append({
+            'pool': pool,
+            'total_rounds': max_round,
+            'total_slots': next_leaf,
+            'roots': roots
+        })
+
+    # Winner paths follow each team through the matches it won, round by round
+    winner_paths = {}
+    for node in sorted(nodes.values(), key=lambda n: (n['round_number'] or 0, n['match_id'])):
+        if node['winner_team_id']:
+            winner_paths.setdefault(node['winner_team_id'], []).append(node['match_id'])
+
+    for node in nodes.values():
+        for key in ('predecessor_1', 'predecessor_2', 'successor'):
+            node.pop(key)
+        node['layout'].pop('depth', None)
+
+    return {
+        'brackets': brackets,
+        'winner_paths': winner_paths
+    }
+
+@match_bp.route('/get-bracket', methods=['GET'])
+def get_bracket():
+    """Get the knockout bracket as a nested tree with layout, scores and winner paths"""
+    tournament_id = request.args.get('tournament_id', type=int)
+
+    if not tournament_id:
+        return jsonify({'error': 'tournament_id is required'}), 400
+
+    try:
+        version = get_tournament_version(tournament_id)
+        response = bracket_cache.get(tournament_id, version)
+
+        if response is None:
+            rows = load_bracket_rows(tournament_id)
+            if not rows:
+                return jsonify({'error': 'No bracket found for this tournament'}), 404
+
+            response = build_bracket_view(rows)
+            response['tournament_id'] = tournament_id
+            bracket_cache.set(tournament_id, version, response)
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        print(f"Error in get_bracket: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,103 @@
+from models import Match, Score, db
+from cache import mark_tournament_changed
+from sqlalchemy import func
+from collections import defaultdict, deque
+
+# Team slots that do not hold a real team yet
+PLACEHOLDER_TEAM_IDS = (None, 'TBD')
+
+def _match_key(round_id, pool, team1_id, team2_id, round_number, bracket_position):
+    """Key used to line up inserted rows with the IDs read back from the database"""
+    return (str(round_id), pool, team1_id, team2_id, round_number, bracket_position)
+
+def bulk_create_matches(tournament_id, match_rows, with_scores=True):
+    """
+    Insert many matches (and their initial 0-0 scores) with a fixed number of statements.
+
+    All matches go in with one bulk insert, their IDs are read back with one query
+    and the scores go in with one more bulk insert, no matter how many matches there
+    are. The caller owns the transaction (nothing is committed here).
+
+    Returns the new match IDs in the same order as match_rows.
+    """
+    if not match_rows:
+        return []
+
+    # Everything inserted after this ID for the tournament belongs to this batch
+    last_id = db.session.query(func.max(Match.id)).filter(
+        Match.tournament_id == tournament_id
+    ).scalar() or 0
+
+    rows = []
+    for row in match_rows:
+        rows.append({
+            'match_name': row['match_name'],
+            'round_id': str(row['round_id']),
+            'pool': row['pool'],
+            'team1_id': row.get('team1_id'),
+            'team2_id': row.get('team2_id'),
+            'tournament_id': tournament_id,
+            'status': row.get('status', 'pending'),
+            'outcome': row.get('outcome', 'normal'),
+            'is_final': row.get('is_final', False),
+            'winner_team_id': row.get('winner_team_id'),
+            'round_number': row.get('round_number'),
+            'bracket_position': row.get('bracket_position')
+        })
+
+    db.session.bulk_insert_mappings(Match, rows)
+    # Bulk inserts skip the unit of work, so flag the tournament for cache invalidation
+    mark_tournament_changed(tournament_id)
+
+    created = db.session.query(
+        Match.id,
+        Match.round_id,
+        Match.pool,
+        Match.team1_id,
+        Match.team2_id,
+        Match.round_number,
+        Match.bracket_position
+    ).filter(
+        Match.tournament_id == tournament_id,
+        Match.id > last_id,
+        Match.round_id.in_({row['round_id'] for row in rows}),
+        Match.pool.in_({row['pool'] for row in rows})
+    ).order_by(Match.id).all()
+
+    ids_by_key = defaultdict(deque)
+    for match in created:
+        ids_by_key[_match_key(*match[1:])].append(match.id)
+
+    match_ids = []
+    for row in rows:
+        key = _match_key(
+            row['round_id'], row['pool'], row['team1_id'], row['team2_id'],
+            row['round_number'], row['bracket_position']
+        )
+        if not ids_by_key[key]:
+            raise RuntimeError(f"Could not read back inserted match {row['match_name']}")
+        match_ids.append(ids_by_key[key].popleft())
+
+    if with_scores:
+        scores = []
+        for match_id, row in zip(match_ids, rows):
+            if row['team1_id'] in PLACEHOLDER_TEAM_IDS or row['team2_id'] in PLACEHOLDER_TEAM_IDS:
+                continue
+            scores.extend([
+                {
+                    'match_id': match_id,
+                    'team_id': row['team1_id'],
+                    'score': 0,
+                    'tournament_id': tournament_id
+                },
+                {
+                    'match_id': match_id,
+                    'team_id': row['team2_id'],
+                    'score': 0,
+                    'tournament_id': tournament_id
+                }
+            ])
+        if scores:
+            db.session.bulk_insert_mappings(Score, scores)
+
+    return match_ids
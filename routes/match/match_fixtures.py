@@ -1,12 +1,14 @@
 from flask import request, jsonify, Response
 from models import Match, Team, Player, Score, Tournament, db, Round
 from sqlalchemy.orm import aliased
+from single_flight import single_flight
 import csv
 import io
 from . import match_bp
 from sqlalchemy import cast
 
 @match_bp.route('/get-match-fixtures', methods=['GET'])
+@single_flight()
 def get_match_fixtures():
     tournament_id = request.args.get('tournament_id')
     pool = request.args.get('pool')
@@ -1,9 +1,12 @@
 from flask import request, jsonify
 from models import Tournament, Team, Round, Match, Score, db, Player
+from hierarchy import get_tournament_hierarchy
 from . import match_ops_bp
 from sqlalchemy.orm import aliased
 import logging
 from .teams import generate_team_id, generate_phone_number, validate_player_data, generate_uuid, find_existing_player
+from routes.match.match_bulk import bulk_create_matches
+from utils import round_robin_schedule
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,56 @@ def check_player_in_tournament(player_uuid, tournament_id):
         Team.tournament_id == tournament_id
     ).first() is not None
 
+def create_round_robin_fixtures(tournament_id, pools, round_id='1'):
+    """
+    Create round-robin fixtures for any number of pools in one go.
+
+    pools maps a pool name to its list of Team objects (in seeding order). Each pool
+    is scheduled with the circle method, so every match gets a round slot
+    (round_number) and no team plays twice in the same slot. All matches and their
+    initial scores are bulk inserted; the caller commits.
+
+    Returns the fixture list for the response.
+    """
+    matches = []
+    match_rows = []
+
+    for pool_name, pool_teams in pools.items():
+        teams_dict = {team.team_id: team for team in pool_teams}
+        schedule = round_robin_schedule([team.team_id for team in pool_teams])
+
+        for slot, pairs in enumerate(schedule, start=1):
+            for team1_id, team2_id in pairs:
+                team1 = teams_dict[team1_id]
+                team2 = teams_dict[team2_id]
+                match_name = f"Round Robin Pool {pool_name} - {team1.name} vs {team2.name}"
+
+                match_rows.append({
+                    'round_id': round_id,
+                    'pool': pool_name,
+                    'team1_id': team1_id,
+                    'team2_id': team2_id,
+                    'match_name': match_name,
+                    'round_number': slot
+                })
+                matches.append({
+                    'pool': pool_name,
+                    'round_number': slot,
+                    'team1_id': team1_id,
+                    'team1_name': team1.name,
+                    'team2_id': team2_id,
+                    'team2_name': team2.name,
+                    'match_name': match_name
+                })
+
+    logger.debug(f"Generated {len(matches)} matches across {len(pools)} pools")
+
+    match_ids = bulk_create_matches(tournament_id, match_rows)
+    for match, match_id in zip(matches, match_ids):
+        match['match_id'] = match_id
+
+    return matches
+
 # This is the old endpoint for generating fixtures
 @match_ops_bp.route('/pools/<pool_name>/fixtures', methods=['POST'])
 def generate_pool_fixtures(pool_name):
@@ -69,101 +122,99 @@ def generate_pool_fixtures(pool_name):
 
         logger.debug(f"Found {len(team_ids)} teams in pool {pool_name}")
 
-        # Generate round-robin matches
-        matches = []
-        match_objects = []
-        score_objects = []
-        pool_matches = set()
+        pool_teams = [teams_dict[team_id] for team_id in team_ids if team_id in teams_dict]
+        matches = create_round_robin_fixtures(tournament_id, {pool_name: pool_teams})
+
+        if not matches:
+            return jsonify({'error': 'No valid matches could be generated'}), 400
 
-        # Generate matchups between teams (round-robin style)
-        for i in range(len(team_ids)):
-            for j in range(i + 1, len(team_ids)):
-                team1_id = team_ids[i]
-                team2_id = team_ids[j]
+        db.session.commit()
+        logger.debug(f"Successfully committed {len(matches)} fixtures")
+
+        return jsonify({
+            'message': 'Fixtures generated successfully',
+            'matches': matches,
+            'total_matches': len(matches)
+        }), 201
 
-                if team1_id == team2_id:  # Skip if same team
-                    continue
+    except Exception as e:
+        logger.error(f"Error generating fixtures: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-                # Create a unique match identifier
-                match_key = tuple(sorted([team1_id, team2_id]))
-                if match_key in pool_matches:
-                    logger.debug(f"Skipping duplicate match between teams {team1_id} and {team2_id}")
-                    continue
+@match_ops_bp.route('/fixtures', methods=['POST'])
+def generate_tournament_fixtures():
+    """Generate round-robin fixtures for every pool in a tournament"""
+    data = request.json
+    tournament_id = data.get('tournament_id')
 
-                pool_matches.add(match_key)
+    if not tournament_id:
+        return jsonify({
+            'error': 'tournament_id is required'
+        }), 400
 
-                team1 = teams_dict.get(team1_id)
-                team2 = teams_dict.get(team2_id)
+    # Check if tournament exists
+    tournament = Tournament.query.filter_by(id=tournament_id).first()
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
 
-                if not team1 or not team2:
-                    logger.warning(f"Team not found. Team1: {team1}, Team2: {team2}")
-                    continue
+    # Get every pool entry of the round robin round in one query
+    pool_entries = Round.query.filter_by(
+        tournament_id=tournament_id,
+        round_id=1  # Round Robin is always round 1
+    ).order_by(Round.id).all()
 
-                match_name = f"Round Robin Pool {pool_name} - {team1.name} vs {team2.name}"
-                logger.debug(f"Creating match: {match_name}")
-
-                # Create match object
-                match = Match(
-                    round_id='1',  # Round Robin is always round 1
-                    pool=pool_name,
-                    team1_id=team1_id,
-                    team2_id=team2_id,
-                    match_name=match_name,
-                    tournament_id=tournament_id,
-                    status='pending'
-                )
-                match_objects.append(match)
+    if not pool_entries:
+        return jsonify({'error': 'No pools found for this tournament'}), 404
 
-                # Store match data for response
-                matches.append({
-                    'pool': pool_name,
-                    'team1_id': team1_id,
-                    'team1_name': team1.name,
-                    'team2_id': team2_id,
-                    'team2_name': team2.name,
-                    'match_name': match_name
-                })
+    # Pools that already have fixtures are left alone
+    existing_pools = {
+        pool for (pool,) in db.session.query(Match.pool).filter_by(
+            tournament_id=tournament_id,
+            round_id='1'  # Round Robin is always round 1
+        ).distinct().all()
+    }
 
-        if not matches:
-            return jsonify({'error': 'No valid matches could be generated'}), 400
+    pool_team_ids = {}
+    for entry in pool_entries:
+        pool_team_ids.setdefault(entry.pool, [])
+        if entry.team_id and entry.pool not in existing_pools:
+            pool_team_ids[entry.pool].append(entry.team_id)
 
-        logger.debug(f"Generated {len(matches)} matches")
+    skipped_pools = [pool for pool in pool_team_ids if pool in existing_pools]
+    if len(skipped_pools) == len(pool_team_ids):
+        return jsonify({'error': 'Fixtures already exist for all pools'}), 409
 
-        # Bulk insert all matches
-        db.session.bulk_save_objects(match_objects)
-        db.session.flush()
+    try:
+        # Get all team details in one query
+        all_team_ids = [team_id for team_ids in pool_team_ids.values() for team_id in team_ids]
+        teams_dict = {
+            team.team_id: team for team in Team.query.filter(
+                Team.team_id.in_(all_team_ids),
+                Team.tournament_id == tournament_id
+            ).all()
+        } if all_team_ids else {}
 
-        # Create score objects for all matches
-        for match in match_objects:
-            score_objects.extend([
-                Score(
-                    match_id=match.id,
-                    team_id=match.team1_id,
-                    score=0,
-                    tournament_id=tournament_id
-                ),
-                Score(
-                    match_id=match.id,
-                    team_id=match.team2_id,
-                    score=0,
-                    tournament_id=tournament_id
-                )
-            ])
+        pools = {
+            pool: [teams_dict[team_id] for team_id in team_ids if team_id in teams_dict]
+            for pool, team_ids in pool_team_ids.items()
+            if pool not in existing_pools
+        }
 
-        # Bulk insert all scores
-        db.session.bulk_save_objects(score_objects)
-        db.session.commit()
+        matches = create_round_robin_fixtures(tournament_id, pools)
 
-        # Update match IDs in the response
-        for i, match in enumerate(match_objects):
-            matches[i]['match_id'] = match.id
+        if not matches:
+            return jsonify({'error': 'No valid matches could be generated'}), 400
 
-        logger.debug("Successfully committed all fixtures")
+        db.session.commit()
+        logger.debug(f"Successfully committed {len(matches)} fixtures for {len(pools)} pools")
 
         return jsonify({
             'message': 'Fixtures generated successfully',
             'matches': matches,
-            'total_matches': len(matches)
+            'total_matches': len(matches),
+            'pools': list(pools.keys()),
+            'skipped_pools': skipped_pools
         }), 201
 
     except Exception as e:
@@ -355,10 +406,13 @@ def add_wildcard_teams(pool_name):
             'error': 'Exactly two teams are required for wildcard entry'
         }), 400
 
-    # Check if tournament exists
-    tournament = Tournament.query.filter_by(id=tournament_id).first()
-    if not tournament:
+    # Check if tournament exists; its super tournament comes from the hierarchy cache
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    if not hierarchy:
         return jsonify({'error': 'Tournament not found'}), 404
+    if not hierarchy['super_tournament']:
+        return jsonify({'error': 'Tournament must be part of a super tournament'}), 400
+    super_tournament_id = hierarchy['super_tournament']['id']
 
     # Check if pool exists
     pool_exists = Round.query.filter_by(
@@ -407,7 +461,7 @@ def add_wildcard_teams(pool_name):
             existing_player1 = find_existing_player(
                 player1_info['first_name'],
                 player1_info['last_name'],
-                tournament.season.super_tournament.id
+                super_tournament_id
             )
 
             if existing_player1:
@@ -430,7 +484,7 @@ def add_wildcard_teams(pool_name):
                     age=player1_info['age'],
                     skill_type=player1_info['skill_type'],
                     dupr_id=player1_info['dupr_id'],
-                    super_tournament_id=tournament.season.super_tournament.id
+                    super_tournament_id=super_tournament_id
                 )
                 db.session.add(player1)
                 db.session.flush()
@@ -449,7 +503,7 @@ def add_wildcard_teams(pool_name):
                 existing_player2 = find_existing_player(
                     player2_info['first_name'],
                     player2_info['last_name'],
-                    tournament.season.super_tournament.id
+                    super_tournament_id
                 )
 
                 if existing_player2:
@@ -472,7 +526,7 @@ def add_wildcard_teams(pool_name):
                         age=player2_info['age'],
                         skill_type=player2_info['skill_type'],
                         dupr_id=player2_info['dupr_id'],
-                        super_tournament_id=tournament.season.super_tournament.id
+                        super_tournament_id=super_tournament_id
                     )
                     db.session.add(player2)
                     db.session.flush()
@@ -1,7 +1,9 @@
 from flask import request, jsonify
-from models import Tournament, Team, Player, Round, Match, db
+from models import Team, Player, Round, Match, db
+from hierarchy import get_tournament_hierarchy
 from . import match_ops_bp
-from sqlalchemy import func, or_, text
+from sqlalchemy import or_, text
+from utils import normalize_name
 import uuid
 import logging
 import random
@@ -146,10 +148,9 @@ def generate_uuid():
             return new_uuid
 
 def find_existing_player(first_name, last_name, super_tournament_id):
-    """Find existing player by name in the super tournament"""
+    """Find existing player by name in the super tournament (case and accent insensitive, indexed)"""
     return Player.query.filter(
-        func.lower(Player.first_name) == func.lower(first_name),
-        func.lower(Player.last_name) == func.lower(last_name),
+        Player.search_key == normalize_name(first_name, last_name),
         Player.super_tournament_id == super_tournament_id
     ).first()
 
@@ -179,10 +180,13 @@ def add_teams_to_pool(pool_name):
             'error': 'At least one team is required'
         }), 400
 
-    # Check if tournament exists
-    tournament = Tournament.query.filter_by(id=tournament_id).first()
-    if not tournament:
+    # Check if tournament exists; its super tournament comes from the hierarchy cache
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    if not hierarchy:
         return jsonify({'error': 'Tournament not found'}), 404
+    if not hierarchy['super_tournament']:
+        return jsonify({'error': 'Tournament must be part of a super tournament'}), 400
+    super_tournament_id = hierarchy['super_tournament']['id']
 
     # Check if pool exists
     pool_exists = Round.query.filter_by(
@@ -228,7 +232,7 @@ def add_teams_to_pool(pool_name):
             existing_player1 = find_existing_player(
                 player1_info['first_name'],
                 player1_info['last_name'],
-                tournament.season.super_tournament.id
+                super_tournament_id
             )
 
             if existing_player1:
@@ -251,7 +255,7 @@ def add_teams_to_pool(pool_name):
                     age=player1_info['age'],
                     skill_type=player1_info['skill_type'],
                     dupr_id=player1_info['dupr_id'],
-                    super_tournament_id=tournament.season.super_tournament.id
+                    super_tournament_id=super_tournament_id
                 )
                 db.session.add(player1)
                 db.session.flush()
@@ -270,7 +274,7 @@ def add_teams_to_pool(pool_name):
                 existing_player2 = find_existing_player(
                     player2_info['first_name'],
                     player2_info['last_name'],
-                    tournament.season.super_tournament.id
+                    super_tournament_id
                 )
 
                 if existing_player2:
@@ -293,7 +297,7 @@ def add_teams_to_pool(pool_name):
                         age=player2_info['age'],
                         skill_type=player2_info['skill_type'],
                         dupr_id=player2_info['dupr_id'],
-                        super_tournament_id=tournament.season.super_tournament.id
+                        super_tournament_id=super_tournament_id
                     )
                     db.session.add(player2)
                     db.session.flush()
@@ -520,10 +524,13 @@ def add_team_by_uuid(pool_name):
             'error': 'player1_uuid is required'
         }), 400
 
-    # Check if tournament exists
-    tournament = Tournament.query.filter_by(id=tournament_id).first()
-    if not tournament:
+    # Check if tournament exists; its super tournament comes from the hierarchy cache
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    if not hierarchy:
         return jsonify({'error': 'Tournament not found'}), 404
+    if not hierarchy['super_tournament']:
+        return jsonify({'error': 'Tournament must be part of a super tournament'}), 400
+    super_tournament_id = hierarchy['super_tournament']['id']
 
     # Check if pool exists
     pool_exists = Round.query.filter_by(
@@ -550,7 +557,7 @@ def add_team_by_uuid(pool_name):
         # Check if player1 exists and belongs to the super tournament
         player1 = Player.query.filter_by(
             uuid=player1_uuid,
-            super_tournament_id=tournament.season.super_tournament.id
+            super_tournament_id=super_tournament_id
         ).first()
         if not player1:
             return jsonify({
@@ -573,7 +580,7 @@ def add_team_by_uuid(pool_name):
 
             player2 = Player.query.filter_by(
                 uuid=player2_uuid,
-                super_tournament_id=tournament.season.super_tournament.id
+                super_tournament_id=super_tournament_id
             ).first()
             if not player2:
                 return jsonify({
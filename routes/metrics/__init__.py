@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+metrics_bp = Blueprint('metrics', __name__)
+
+from . import metrics_core
\ No newline at end of file
@@ -0,0 +1,20 @@
+from flask import jsonify
+from compression import get_compression_stats
+from cache import get_cache_stats
+from single_flight import flights
+from . import metrics_bp
+
+@metrics_bp.route('/compression', methods=['GET'])
+def compression_metrics():
+    """Bytes in / out and saved by response compression since the server started"""
+    return jsonify(get_compression_stats()), 200
+
+@metrics_bp.route('/cache', methods=['GET'])
+def cache_metrics():
+    """Size and hit / miss counters of the in-process caches"""
+    return jsonify(get_cache_stats()), 200
+
+@metrics_bp.route('/single-flight', methods=['GET'])
+def single_flight_metrics():
+    """Requests that ran a coalesced view (leader) vs. shared another request's result"""
+    return jsonify(flights.stats()), 200
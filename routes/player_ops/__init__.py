@@ -2,4 +2,6 @@ from flask import Blueprint
 
 player_ops_bp = Blueprint('player_ops', __name__)
 
-from . import players 
\ No newline at end of file
+from . import players
+from . import ratings
+from . import duplicates
\ No newline at end of file
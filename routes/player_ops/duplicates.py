@@ -0,0 +1,77 @@
+from flask import request, jsonify
+from models import SuperTournament, db
+from . import player_ops_bp
+from player_dedupe import find_duplicate_players, merge_players, DEFAULT_THRESHOLD
+import logging
+
+logger = logging.getLogger(__name__)
+
+@player_ops_bp.route('/players/duplicates', methods=['GET'])
+def get_duplicate_players():
+    """Merge proposals for near-duplicate players of a super tournament"""
+    super_tournament_id = request.args.get('super_tournament_id', type=int)
+    threshold = request.args.get('threshold', DEFAULT_THRESHOLD, type=float)
+
+    if not super_tournament_id:
+        return jsonify({'error': 'super_tournament_id is required'}), 400
+
+    if not 0 < threshold <= 1:
+        return jsonify({'error': 'threshold must be between 0 and 1'}), 400
+
+    try:
+        if not SuperTournament.query.get(super_tournament_id):
+            return jsonify({'error': 'Super tournament not found'}), 404
+
+        proposals = find_duplicate_players(super_tournament_id, threshold)
+
+        return jsonify({
+            'super_tournament_id': super_tournament_id,
+            'threshold': threshold,
+            'proposals': proposals
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error finding duplicate players: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@player_ops_bp.route('/players/merge', methods=['POST'])
+def merge_duplicate_players():
+    """
+    Merge duplicate players: merges is a list of {keep: uuid, merge: [uuid, ...]},
+    e.g. the proposals from GET /players/duplicates
+    """
+    data = request.json
+    super_tournament_id = data.get('super_tournament_id')
+    merges = data.get('merges', [])
+
+    if not super_tournament_id or not merges:
+        return jsonify({'error': 'super_tournament_id and merges are required'}), 400
+
+    mapping = {}
+    for group in merges:
+        keep = group.get('keep')
+        keep = keep.get('uuid') if isinstance(keep, dict) else keep
+        if not keep:
+            return jsonify({'error': 'Every merge needs the uuid to keep'}), 400
+        for duplicate in group.get('merge', []):
+            duplicate = duplicate.get('uuid') if isinstance(duplicate, dict) else duplicate
+            if duplicate in mapping and mapping[duplicate] != keep:
+                return jsonify({'error': f'Player {duplicate} is merged into two different players'}), 400
+            mapping[duplicate] = keep
+
+    try:
+        result = merge_players(int(super_tournament_id), mapping)
+        db.session.commit()
+
+        return jsonify({
+            'message': f"Merged {result['players']} players",
+            **result
+        }), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error merging players: {str(e)}")
+        return jsonify({'error': str(e)}), 500
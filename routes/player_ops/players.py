@@ -1,7 +1,7 @@
 from flask import request, jsonify
 from models import Player, Team, Tournament, SuperTournament, db
 from . import player_ops_bp
-from sqlalchemy import func, or_, text
+from sqlalchemy import func, or_, select, text, union_all
 import logging
 from ..match_ops.teams import generate_phone_number, generate_uuid
 
@@ -14,75 +14,139 @@ def find_player_by_phone(phone_number, super_tournament_id):
         Player.super_tournament_id == super_tournament_id
     ).first()
 
+# Fields a player listing can be projected to (fields=uuid,first_name,...)
+PLAYER_FIELDS = {
+    'uuid': Player.uuid,
+    'first_name': Player.first_name,
+    'last_name': Player.last_name,
+    'phone_number': Player.phone_number,
+    'email': Player.email,
+    'gender': Player.gender,
+    'age': Player.age,
+    'skill_type': Player.skill_type,
+    'dupr_id': Player.dupr_id,
+    'checked_in': Player.checked_in,
+    'super_tournament_id': Player.super_tournament_id
+}
+MAX_PAGE_SIZE = 1000
+# Upper bound on the number of player UUIDs in one IN clause
+IN_BATCH = 1000
+
+def tournament_player_uuids(tournament_id):
+    """UNION of the player1 / player2 UUIDs of a tournament's teams, for use in IN (...)"""
+    return select(Team.player1_uuid).where(Team.tournament_id == tournament_id).union(
+        select(Team.player2_uuid).where(Team.tournament_id == tournament_id)
+    )
+
+def get_player_teams(player_uuids):
+    """
+    Map player UUIDs to their teams.
+
+    Each chunk of UUIDs is looked up with a UNION ALL of two indexed IN lookups (one
+    per team slot) instead of an OR across both columns, which the database can't
+    serve from a single index.
+    """
+    player_teams = {}
+    for start in range(0, len(player_uuids), IN_BATCH):
+        uuids = player_uuids[start:start + IN_BATCH]
+        links = union_all(
+            select(Team.player1_uuid.label('uuid'), Team.team_id, Team.tournament_id)
+            .where(Team.player1_uuid.in_(uuids)),
+            select(Team.player2_uuid.label('uuid'), Team.team_id, Team.tournament_id)
+            .where(Team.player2_uuid.in_(uuids))
+        )
+        for uuid, team_id, tournament_id in db.session.execute(links):
+            player_teams.setdefault(uuid, []).append({
+                'team_id': team_id,
+                'tournament_id': tournament_id
+            })
+    return player_teams
+
 @player_ops_bp.route('/players', methods=['GET'])
 def get_players():
-    """Get all players in a super tournament with optional checked_in filter"""
+    """
+    Get players in a super tournament.
+
+    Optional filters: checked_in, skill (skill_type), gender and tournament_id (players
+    on a team in that tournament). fields=uuid,first_name,... limits the returned fields
+    ("teams" included). Without limit every matching player is returned as a list; with
+    limit (max 1000) the result is paged by player ID: {"players": [...], "next_cursor"},
+    and the next page is fetched with after=<next_cursor>.
+    """
     super_tournament_id = request.args.get('super_tournament_id')
     checked_in = request.args.get('checked_in', type=lambda v: v.lower() == 'true')
+    skill = request.args.get('skill')
+    gender = request.args.get('gender')
+    tournament_id = request.args.get('tournament_id', type=int)
+    limit = request.args.get('limit', type=int)
+    after = request.args.get('after', type=int)
+    fields = request.args.get('fields')
 
     if not super_tournament_id:
         return jsonify({
             'error': 'super_tournament_id is required'
         }), 400
 
-    try:
-        # Build base query
-        query = Player.query.filter_by(super_tournament_id=super_tournament_id)
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in PLAYER_FIELDS and field != 'teams']
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    else:
+        fields = list(PLAYER_FIELDS) + ['teams']
 
-        # Apply checked_in filter if provided
-        if checked_in is not None:
-            query = query.filter_by(checked_in=checked_in)
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
 
-        # Get all players
-        players = query.all()
+    try:
+        columns = [PLAYER_FIELDS[field] for field in fields if field != 'teams']
+        query = db.session.query(Player.id, Player.uuid, *columns).filter(
+            Player.super_tournament_id == super_tournament_id
+        )
 
-        # Get all teams for these players
-        player_uuids = [p.uuid for p in players]
-        teams = Team.query.filter(
-            or_(
-                Team.player1_uuid.in_(player_uuids),
-                Team.player2_uuid.in_(player_uuids)
-            )
-        ).all()
+        if checked_in is not None:
+            query = query.filter(Player.checked_in == checked_in)
+        if skill:
+            query = query.filter(Player.skill_type == skill)
+        if gender:
+            query = query.filter(Player.gender == gender)
+        if tournament_id:
+            query = query.filter(Player.uuid.in_(tournament_player_uuids(tournament_id)))
+        if after is not None:
+            query = query.filter(Player.id > after)
+
+        query = query.order_by(Player.id)
+        if limit is not None:
+            # One extra row tells whether there is a next page
+            rows = query.limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+        else:
+            rows = query.all()
+            has_more = False
 
-        # Create a mapping of player UUID to their teams
         player_teams = {}
-        for team in teams:
-            if team.player1_uuid:
-                if team.player1_uuid not in player_teams:
-                    player_teams[team.player1_uuid] = []
-                player_teams[team.player1_uuid].append({
-                    'team_id': team.team_id,
-                    'tournament_id': team.tournament_id
-                })
-            if team.player2_uuid:
-                if team.player2_uuid not in player_teams:
-                    player_teams[team.player2_uuid] = []
-                player_teams[team.player2_uuid].append({
-                    'team_id': team.team_id,
-                    'tournament_id': team.tournament_id
-                })
+        if 'teams' in fields:
+            player_teams = get_player_teams([row.uuid for row in rows if row.uuid])
 
         # Build response
         response = []
-        for player in players:
-            player_data = {
-                'uuid': player.uuid,
-                'first_name': player.first_name,
-                'last_name': player.last_name,
-                'phone_number': player.phone_number,
-                'email': player.email,
-                'gender': player.gender,
-                'age': player.age,
-                'skill_type': player.skill_type,
-                'dupr_id': player.dupr_id,
-                'checked_in': player.checked_in,
-                'super_tournament_id': player.super_tournament_id,
-                'teams': player_teams.get(player.uuid, [])
-            }
+        for row in rows:
+            player_data = {}
+            for field in fields:
+                if field == 'teams':
+                    player_data['teams'] = player_teams.get(row.uuid, [])
+                else:
+                    player_data[field] = getattr(row, field)
             response.append(player_data)
 
-        return jsonify(response), 200
+        if limit is None:
+            return jsonify(response), 200
+
+        return jsonify({
+            'players': response,
+            'next_cursor': rows[-1].id if has_more else None
+        }), 200
 
     except Exception as e:
         logger.error(f"Error fetching players: {str(e)}")
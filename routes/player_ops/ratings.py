@@ -0,0 +1,58 @@
+from flask import request, jsonify
+from models import Player, PlayerRating, PlayerRatingHistory, Match, db
+from . import player_ops_bp
+import logging
+
+logger = logging.getLogger(__name__)
+
+@player_ops_bp.route('/players/<uuid>/ratings', methods=['GET'])
+def get_player_rating_history(uuid):
+    """Get a player's current rating and its history match by match"""
+    super_tournament_id = request.args.get('super_tournament_id', type=int)
+    limit = request.args.get('limit', type=int)  # Only the most recent N entries
+
+    try:
+        player = Player.query.filter_by(uuid=uuid).first()
+        if not player:
+            return jsonify({'error': 'Player not found'}), 404
+
+        super_tournament_id = super_tournament_id or player.super_tournament_id
+
+        rating = PlayerRating.query.filter_by(
+            player_uuid=uuid,
+            super_tournament_id=super_tournament_id
+        ).first()
+
+        query = db.session.query(
+            PlayerRatingHistory,
+            Match.match_name
+        ).join(
+            Match, PlayerRatingHistory.match_id == Match.id
+        ).filter(
+            PlayerRatingHistory.player_uuid == uuid,
+            PlayerRatingHistory.super_tournament_id == super_tournament_id
+        ).order_by(PlayerRatingHistory.match_id.desc())
+        if limit:
+            query = query.limit(limit)
+
+        history = [{
+            'match_id': entry.match_id,
+            'match_name': match_name,
+            'tournament_id': entry.tournament_id,
+            'rating_before': round(entry.rating_before, 2),
+            'rating_after': round(entry.rating_after, 2),
+            'change': round(entry.rating_after - entry.rating_before, 2)
+        } for entry, match_name in query.all()]
+        history.reverse()
+
+        return jsonify({
+            'uuid': uuid,
+            'super_tournament_id': super_tournament_id,
+            'rating': round(rating.rating, 2) if rating else None,
+            'matches_played': rating.matches_played if rating else 0,
+            'history': history
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching rating history: {str(e)}")
+        return jsonify({'error': str(e)}), 500
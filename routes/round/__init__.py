@@ -6,4 +6,6 @@ round_bp = Blueprint('round', __name__)
 from .round_core import create_round, delete_round
 from .round_completion import complete_round, complete_round2
 from .round_knockout import get_top_teams_for_knockout, create_knockout_bracket
-from .round_helpers import get_cumulative_points_for_round 
+from .round_helpers import get_cumulative_points_for_round
+from .round_seeding import create_seeded_knockout, create_double_elimination 
+from .round_qualification import get_qualification_scenarios
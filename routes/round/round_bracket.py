@@ -0,0 +1,364 @@
+from models import db, Match, Round
+from routes.match.match_bulk import bulk_create_matches
+import math
+
+# Pools whose matches form a bracket tree (linked through predecessor/successor)
+BRACKET_POOLS = ("knockout", "losers", "plate")
+
+def is_power_of_two(n):
+    return n != 0 and (n & (n - 1)) == 0
+
+def get_round_name(round_num, total_rounds, num_teams):
+    """Helper function to get appropriate round name based on position and bracket size"""
+    if round_num == total_rounds:
+        return "Finals"
+    elif round_num == total_rounds - 1:
+        return "Semi Finals"
+    elif round_num == total_rounds - 2:
+        return "Quarter Finals"
+    else:
+        remaining_teams = num_teams // (2 ** (round_num - 1))
+        return f"Round of {remaining_teams}"
+
+def get_match_name(round_num, total_rounds, match_num, num_teams):
+    """Helper function to get appropriate match name based on round and position"""
+    if round_num == total_rounds:
+        return "F1"
+    elif round_num == total_rounds - 1:
+        return f"SF{match_num}"
+    elif round_num == total_rounds - 2:
+        return f"QF{match_num}"
+    else:
+        remaining_teams = num_teams // (2 ** (round_num - 1))
+        return f"R{remaining_teams}-M{match_num}"
+
+def node_key(pool, round_number, bracket_position):
+    """Key of a bracket node before it has a match ID"""
+    return (pool, round_number, bracket_position)
+
+def build_knockout_tree(first_round_pairs, starting_round_id, pool="knockout"):
+    """
+    Compute a full single-elimination bracket in memory.
+
+    first_round_pairs is a list of (team1_id, team2_id) tuples for the opening
+    round; its length must be a power of two. Every node knows its round, position,
+    round_id and the keys of its predecessors and successor, so the whole tree can
+    be written with bulk statements afterwards (see persist_bracket).
+
+    Returns a dict with the nodes (in round/position order), the Round rows to
+    insert and the bracket dimensions.
+    """
+    num_matches = len(first_round_pairs)
+    if not is_power_of_two(num_matches):
+        raise ValueError("Number of first round matches must be a power of 2")
+
+    num_teams = num_matches * 2
+    total_rounds = int(math.log2(num_teams))
+    nodes = []
+    round_rows = []
+
+    for round_num in range(1, total_rounds + 1):
+        current_round_id = starting_round_id + round_num - 1
+        round_name = get_round_name(round_num, total_rounds, num_teams)
+        matches_in_round = num_matches // (2 ** (round_num - 1))
+
+        # Only first round has known teams; other rounds get a TBD placeholder entry
+        round_team_ids = []
+        if round_num == 1:
+            round_team_ids = [
+                team_id for pair in first_round_pairs for team_id in pair
+                if team_id not in (None, "TBD")
+            ]
+        for team_id in round_team_ids or ["TBD"]:
+            round_rows.append({
+                'tournament_id': None,
+                'round_id': current_round_id,
+                'team_id': team_id,
+                'pool': pool,
+                'name': round_name
+            })
+
+        for i in range(matches_in_round):
+            if round_num == 1:
+                team1_id, team2_id = first_round_pairs[i]
+            else:
+                team1_id, team2_id = "TBD", "TBD"
+
+            nodes.append({
+                'key': node_key(pool, round_num, i),
+                'match_name': get_match_name(round_num, total_rounds, i + 1, num_teams),
+                'round_id': str(current_round_id),
+                'pool': pool,
+                'team1_id': team1_id,
+                'team2_id': team2_id,
+                'round_number': round_num,
+                'bracket_position': i,
+                'status': 'pending',
+                'is_final': False,
+                'predecessor_1': node_key(pool, round_num - 1, i * 2) if round_num > 1 else None,
+                'predecessor_2': node_key(pool, round_num - 1, i * 2 + 1) if round_num > 1 else None,
+                'successor': node_key(pool, round_num + 1, i // 2) if round_num < total_rounds else None,
+                'loser_successor': None
+            })
+
+    return {
+        'pool': pool,
+        'starting_round_id': starting_round_id,
+        'total_rounds': total_rounds,
+        'num_teams': num_teams,
+        'nodes': nodes,
+        'rounds': round_rows
+    }
+
+def add_third_place_match(tree):
+    """
+    Add a 3rd-place match to a bracket tree, fed by the losers of the semi finals.
+
+    It sits in the final round next to the final (bracket_position 1) and is the
+    loser_successor of both semi finals.
+    """
+    total_rounds = tree['total_rounds']
+    if total_rounds < 2:
+        raise ValueError("A 3rd place match needs at least semi finals")
+
+    pool = tree['pool']
+    final = next(node for node in tree['nodes'] if node['key'] == node_key(pool, total_rounds, 0))
+    for node in tree['nodes']:
+        if node['round_number'] == total_rounds - 1:
+            node['loser_successor'] = node_key(pool, total_rounds, 1)
+    tree['nodes'].append({
+        'key': node_key(pool, total_rounds, 1),
+        'match_name': "3rd Place",
+        'round_id': final['round_id'],
+        'pool': pool,
+        'team1_id': "TBD",
+        'team2_id': "TBD",
+        'round_number': total_rounds,
+        'bracket_position': 1,
+        'status': 'pending',
+        'is_final': False,
+        'predecessor_1': node_key(pool, total_rounds - 1, 0),
+        'predecessor_2': node_key(pool, total_rounds - 1, 1),
+        'successor': None,
+        'loser_successor': None
+    })
+    return tree
+
+def build_plate_tree(tree, pool="plate"):
+    """
+    Build a consolation (plate) bracket for the first round losers of tree.
+
+    Plate round 1 is played alongside the main round 2: plate match i takes the
+    losers of main first round matches 2i and 2i+1.
+    """
+    first_round = [node for node in tree['nodes'] if node['round_number'] == 1 and node['pool'] == tree['pool']]
+    if len(first_round) < 2:
+        raise ValueError("A plate bracket needs at least two first round matches")
+    if any(node['loser_successor'] for node in first_round):
+        raise ValueError("The first round losers already have a loser route (3rd place match)")
+
+    plate = build_knockout_tree(
+        [("TBD", "TBD")] * (len(first_round) // 2),
+        tree['starting_round_id'] + 1,
+        pool=pool
+    )
+    for node in plate['nodes']:
+        node['match_name'] = f"Plate {node['match_name']}"
+        if node['round_number'] == 1:
+            feeders = first_round[node['bracket_position'] * 2:node['bracket_position'] * 2 + 2]
+            node['predecessor_1'], node['predecessor_2'] = (feeder['key'] for feeder in feeders)
+            for feeder in feeders:
+                feeder['loser_successor'] = node['key']
+    return plate
+
+def build_double_elimination_tree(first_round_pairs, starting_round_id):
+    """
+    Compute a double-elimination draw in memory.
+
+    The winners bracket is a normal knockout tree (pool "knockout"). Its losers
+    drop into a losers bracket (pool "losers") of 2 * (k - 1) rounds for a bracket
+    of k winners rounds: odd losers rounds pair up the survivors, even ones take the
+    losers coming down from the next winners round (in reverse order, to avoid
+    early rematches). The winners and losers bracket champions meet in the grand
+    final. Losers bracket and grand final rounds follow the winners rounds.
+
+    Returns a tree dict like build_knockout_tree with every node and Round row.
+    """
+    tree = build_knockout_tree(first_round_pairs, starting_round_id)
+    total_rounds = tree['total_rounds']
+    if total_rounds < 2:
+        raise ValueError("Double elimination needs at least 3 teams")
+
+    winners = {(node['round_number'], node['bracket_position']): node for node in tree['nodes']}
+    num_matches = len(first_round_pairs)
+    losers_rounds = 2 * (total_rounds - 1)
+    losers = {}
+
+    for losers_round in range(1, losers_rounds + 1):
+        current_round_id = starting_round_id + total_rounds + losers_round - 1
+        # Rounds 1-2 have num_matches / 2 matches, rounds 3-4 half of that, ...
+        matches_in_round = num_matches // (2 ** ((losers_round + 1) // 2))
+        round_name = "Losers Final" if losers_round == losers_rounds else f"Losers Round {losers_round}"
+
+        tree['rounds'].append({
+            'tournament_id': None,
+            'round_id': current_round_id,
+            'team_id': "TBD",
+            'pool': "losers",
+            'name': round_name
+        })
+
+        for i in range(matches_in_round):
+            key = node_key("losers", losers_round, i)
+            if losers_round == 1:
+                # First round losers of the winners bracket, two by two
+                feeders = [winners[(1, i * 2)], winners[(1, i * 2 + 1)]]
+                for feeder in feeders:
+                    feeder['loser_successor'] = key
+                predecessors = [feeder['key'] for feeder in feeders]
+            elif losers_round % 2 == 0:
+                # Survivor meets a loser coming down from winners round losers_round / 2 + 1
+                survivor = losers[(losers_round - 1, i)]
+                survivor['successor'] = key
+                drop_round = losers_round // 2 + 1
+                dropping = winners[(drop_round, matches_in_round - 1 - i if drop_round % 2 == 0 else i)]
+                dropping['loser_successor'] = key
+                predecessors = [survivor['key'], dropping['key']]
+            else:
+                feeders = [losers[(losers_round - 1, i * 2)], losers[(losers_round - 1, i * 2 + 1)]]
+                for feeder in feeders:
+                    feeder['successor'] = key
+                predecessors = [feeder['key'] for feeder in feeders]
+
+            losers[(losers_round, i)] = {
+                'key': key,
+                'match_name': "LF1" if losers_round == losers_rounds else f"LR{losers_round}-M{i + 1}",
+                'round_id': str(current_round_id),
+                'pool': "losers",
+                'team1_id': "TBD",
+                'team2_id': "TBD",
+                'round_number': losers_round,
+                'bracket_position': i,
+                'status': 'pending',
+                'is_final': False,
+                'predecessor_1': predecessors[0],
+                'predecessor_2': predecessors[1],
+                'successor': None,
+                'loser_successor': None
+            }
+
+    # Grand final between the two bracket winners
+    grand_final_key = node_key("knockout", total_rounds + 1, 0)
+    grand_final_round_id = starting_round_id + total_rounds + losers_rounds
+    winners_final = winners[(total_rounds, 0)]
+    losers_final = losers[(losers_rounds, 0)]
+    winners_final['successor'] = grand_final_key
+    losers_final['successor'] = grand_final_key
+
+    tree['rounds'].append({
+        'tournament_id': None,
+        'round_id': grand_final_round_id,
+        'team_id': "TBD",
+        'pool': "knockout",
+        'name': "Grand Final"
+    })
+    tree['nodes'].extend(losers.values())
+    tree['nodes'].append({
+        'key': grand_final_key,
+        'match_name': "GF1",
+        'round_id': str(grand_final_round_id),
+        'pool': "knockout",
+        'team1_id': "TBD",
+        'team2_id': "TBD",
+        'round_number': total_rounds + 1,
+        'bracket_position': 0,
+        'status': 'pending',
+        'is_final': False,
+        'predecessor_1': winners_final['key'],
+        'predecessor_2': losers_final['key'],
+        'successor': None,
+        'loser_successor': None
+    })
+    tree['losers_rounds'] = losers_rounds
+    return tree
+
+def resolve_tree_byes(nodes):
+    """
+    Complete the byes of a bracket built in memory before it is persisted.
+
+    Runs the progression engine over lightweight views of the nodes (node keys
+    stand in for match IDs) and copies the results back onto the nodes.
+    """
+    from types import SimpleNamespace
+    from routes.score.score_progression import resolve_byes
+
+    fields = ('team1_id', 'team2_id', 'predecessor_1', 'predecessor_2', 'successor',
+              'loser_successor', 'is_final', 'winner_team_id', 'status', 'outcome', 'round_number')
+    views = {
+        node['key']: SimpleNamespace(id=node['key'], **{field: node.get(field) for field in fields})
+        for node in nodes
+    }
+    for view in views.values():
+        view.outcome = view.outcome or 'normal'
+
+    changed = resolve_byes(views)
+    for node in nodes:
+        if node['key'] in changed:
+            view = views[node['key']]
+            for field in ('team1_id', 'team2_id', 'is_final', 'winner_team_id', 'status', 'outcome'):
+                node[field] = getattr(view, field)
+    return changed
+
+def persist_bracket(tournament_id, nodes, round_rows):
+    """
+    Write bracket nodes built in memory with a fixed number of statements.
+
+    Round rows and matches go in with bulk inserts (matches get their 0-0 scores
+    through bulk_create_matches), then the predecessor/successor links are filled
+    in with a single bulk update. The caller owns the transaction.
+
+    Returns the match details for the response, in node order.
+    """
+    if round_rows:
+        db.session.bulk_insert_mappings(Round, [
+            dict(row, tournament_id=tournament_id) for row in round_rows
+        ])
+
+    match_ids = bulk_create_matches(tournament_id, nodes)
+    ids_by_key = {node['key']: match_id for node, match_id in zip(nodes, match_ids)}
+
+    match_details = []
+    links = []
+    for node, match_id in zip(nodes, match_ids):
+        detail = {
+            'id': match_id,
+            'name': node['match_name'],
+            'round_id': node['round_id'],
+            'round_number': node['round_number'],
+            'pool': node['pool'],
+            'team1_id': node['team1_id'],
+            'team2_id': node['team2_id'],
+            'bracket_position': node['bracket_position'],
+            'status': node['status'],
+            'outcome': node.get('outcome', 'normal'),
+            'winner_team_id': node.get('winner_team_id'),
+            'predecessor_1': ids_by_key.get(node['predecessor_1']),
+            'predecessor_2': ids_by_key.get(node['predecessor_2']),
+            'successor': ids_by_key.get(node['successor']),
+            'loser_successor': ids_by_key.get(node.get('loser_successor'))
+        }
+        match_details.append(detail)
+
+        if detail['predecessor_1'] or detail['predecessor_2'] or detail['successor'] or detail['loser_successor']:
+            links.append({
+                'id': match_id,
+                'predecessor_1': detail['predecessor_1'],
+                'predecessor_2': detail['predecessor_2'],
+                'successor': detail['successor'],
+                'loser_successor': detail['loser_successor']
+            })
+
+    if links:
+        db.session.bulk_update_mappings(Match, links)
+
+    return match_details
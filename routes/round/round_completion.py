@@ -1,7 +1,14 @@
+import uuid
 from flask import request, jsonify
-from models import Tournament, Team, Player, Match, Score, Round, db
+from models import Tournament, Team, Player, Match, Score, Round, MatchOutcome, db
 from routes.tournament.tournament_core import show_standings
+from routes.match.match_bulk import bulk_create_matches
+from cache import VersionedCache, get_tournament_version, mark_tournament_changed
 from . import round_bp
+from .round_swiss import SWISS_POOL, plan_swiss_round
+
+# Previewed round plans by (tournament_id, plan_token), valid while the tournament is unchanged
+round_plans = VersionedCache(maxsize=64, name='round_plans')
 
 def get_round_standings(tournament_id, round_id):
     """
@@ -21,6 +28,13 @@ def get_round_standings(tournament_id, round_id):
             Score.tournament_id == tournament_id
         ).all()
 
+        # Team names with one query
+        team_ids = {score.team_id for score in scores}
+        team_names = {
+            team.team_id: team.name
+            for team in Team.query.filter(Team.team_id.in_(team_ids)).all()
+        } if team_ids else {}
+
         # Organize scores by pool
         pool_standings = {}
         for match in matches:
@@ -32,10 +46,9 @@ def get_round_standings(tournament_id, round_id):
             
             for score in match_scores:
                 if score.team_id not in pool_standings[match.pool]:
-                    team = Team.query.get(score.team_id)
                     pool_standings[match.pool][score.team_id] = {
                         'team_id': score.team_id,
-                        'name': team.name if team else 'Unknown',
+                        'name': team_names.get(score.team_id, 'Unknown'),
                         'total_scores': 0,
                         'points_scored': 0,
                         'points_lost': 0,
@@ -81,13 +94,19 @@ def get_round_standings(tournament_id, round_id):
 
 @round_bp.route('/complete-round', methods=['POST'])
 def complete_round():
+    """
+    Complete a round and create the next one.
+
+    With dry_run the promoted teams and pairings are only computed and returned
+    with a plan_token; POST /complete-round/commit applies that plan later.
+    """
     data = request.json
     tournament_id = data.get('tournament_id')
     round_id = data.get('round_id')
-    next_round_name = data.get('next_round_name')
-    promotion_type = data.get('promotion_type')  # 'pool_based', 'leaderboard_based', or 'custom'
+    promotion_type = data.get('promotion_type')  # 'pool_based', 'leaderboard_based', 'swiss', or 'custom'
+    dry_run = data.get('dry_run', False)
     
-    # For non-custom promotion
+    # For non-custom promotion (optional for swiss: limits the field of the first Swiss round)
     teams_to_promote = data.get('teams_to_promote')
     
     # Only needed for pool-based promotion
@@ -116,55 +135,185 @@ def complete_round():
             return jsonify({
                 'error': 'teams_to_promote is required for leaderboard-based promotion'
             }), 400
+    elif promotion_type != 'swiss':
+        return jsonify({
+            'error': 'promotion_type must be one of: pool_based, leaderboard_based, swiss, custom'
+        }), 400
 
     try:
-        new_round_id = int(round_id) + 1
-        next_round_name = next_round_name or f"Round {new_round_id}"
-
-        if promotion_type == 'custom':
-            # For custom matches, directly create matches from provided pairs
-            matches = []
-            for team1_id, team2_id in custom_matches:
-                team1 = Team.query.get(team1_id)
-                team2 = Team.query.get(team2_id)
-                if team1 and team2:
-                    matches.append((team1, team2))
-                    
-        else:
-            # Get standings data
-            standings_data = get_round_standings(tournament_id, round_id)
-            round_data = standings_data.get(str(round_id))
-            if not round_data:
-                return jsonify({'error': 'No standings data found'}), 404
-
-            if promotion_type == 'leaderboard_based':
-                # For leaderboard, teams are already in correct order for matches
-                promoted_teams = get_leaderboard_promoted_teams(round_data, teams_to_promote)
-                # Create matches by pairing adjacent teams
-                matches = [(promoted_teams[i], promoted_teams[i+1]) 
-                          for i in range(0, len(promoted_teams)-1, 2)]
-            else:  # pool_based
-                promoted_teams = get_pool_promoted_teams(round_data, teams_to_promote)
-                if len(promoted_teams) < 2:
-                    return jsonify({'error': 'Not enough teams to create matches'}), 400
-                # Create matches based on matchmaking type
-                matches = create_matches_by_type(promoted_teams, matchmaking_type)
-
-        # Create round entries and matches in database
-        created_matches = create_round_entries_and_matches(
-            tournament_id, new_round_id, next_round_name, matches
-        )
+        # The plan is only valid for the data it was computed from
+        version = get_tournament_version(tournament_id)
 
-        # Prepare response with new round details and fixtures
-        fixtures = get_round_fixtures(tournament_id, new_round_id)
-        
-        return jsonify({
-            'message': f'Round {new_round_id} created successfully',
+        plan, error = plan_round_completion(data)
+        if error:
+            return jsonify({'error': error[0]}), error[1]
+
+        if dry_run:
+            return jsonify(save_round_plan(plan, version)), 200
+
+        return jsonify(apply_round_plan(plan)), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def plan_round_completion(data):
+    """
+    Work out the next round for complete_round fully in memory.
+
+    Standings are loaded once and teams come from that load (or one query for
+    custom pairs); nothing is written.
+
+    Returns (plan, None) or (None, (error message, status code)).
+    """
+    tournament_id = data.get('tournament_id')
+    round_id = data.get('round_id')
+    promotion_type = data.get('promotion_type')
+    teams_to_promote = data.get('teams_to_promote')
+    matchmaking_type = data.get('matchmaking_type')
+    custom_matches = data.get('custom_matches')
+
+    new_round_id = int(round_id) + 1
+    next_round_name = data.get('next_round_name') or f"Round {new_round_id}"
+    pool_name = 'A'
+    round_number = None
+    bye_teams = []
+
+    if promotion_type == 'custom':
+        # For custom matches, directly create matches from provided pairs
+        team_ids = {team_id for pair in custom_matches for team_id in pair}
+        teams = [
+            {'team_id': team.team_id, 'name': team.name}
+            for team in Team.query.filter(Team.team_id.in_(team_ids)).all()
+        ]
+        promoted_teams = teams
+        matches = create_custom_matches(custom_matches, teams)
+
+    else:
+        # Get standings data
+        standings_data = get_round_standings(tournament_id, round_id)
+        round_data = standings_data.get(str(round_id))
+
+        if promotion_type == 'swiss':
+            # Pair by Swiss record; the first Swiss round is seeded from this round's standings
+            swiss_plan = plan_swiss_round(tournament_id, round_id, round_data, teams_to_promote)
+            matches = swiss_plan['matches']
+            bye_teams = [swiss_plan['bye_team']] if swiss_plan['bye_team'] else []
+            promoted_teams = [team for pair in matches for team in pair] + bye_teams
+            pool_name = SWISS_POOL
+            round_number = swiss_plan['round_number']
+            next_round_name = data.get('next_round_name') or f"Swiss Round {round_number}"
+
+        elif not round_data:
+            return None, ('No standings data found', 404)
+
+        elif promotion_type == 'leaderboard_based':
+            # For leaderboard, teams are already in correct order for matches
+            promoted_teams = get_leaderboard_promoted_teams(round_data, teams_to_promote)
+            # Create matches by pairing adjacent teams
+            matches = [(promoted_teams[i], promoted_teams[i+1]) 
+                      for i in range(0, len(promoted_teams)-1, 2)]
+        else:  # pool_based
+            promoted_teams = get_pool_promoted_teams(round_data, teams_to_promote)
+            if len(promoted_teams) < 2:
+                return None, ('Not enough teams to create matches', 400)
+            # Create matches based on matchmaking type
+            matches = create_matches_by_type(promoted_teams, matchmaking_type)
+
+    if not matches:
+        return None, ('Not enough teams to create matches', 400)
+
+    def team_ref(team):
+        return {'team_id': team['team_id'], 'name': team['name']}
+
+    return {
+        'tournament_id': tournament_id,
+        'round_id': round_id,
+        'new_round_id': new_round_id,
+        'new_round_name': next_round_name,
+        'pool': pool_name,
+        'round_number': round_number,
+        'promoted_teams': [team_ref(team) for team in promoted_teams],
+        'matches': [{'team1': team_ref(team1), 'team2': team_ref(team2)} for team1, team2 in matches],
+        'byes': [team_ref(team) for team in bye_teams],
+        'round_entries': None
+    }, None
+
+def save_round_plan(plan, version):
+    """Keep a previewed plan for a later commit and return the preview response"""
+    plan_token = uuid.uuid4().hex
+    round_plans.set((int(plan['tournament_id']), plan_token), version, plan)
+
+    preview = dict(plan)
+    preview['dry_run'] = True
+    preview['plan_token'] = plan_token
+    return preview
+
+def apply_round_plan(plan):
+    """
+    Write a round plan: round entries, matches and scores with bulk inserts and one commit.
+
+    Returns the complete_round style response.
+    """
+    tournament_id = plan['tournament_id']
+    new_round_id = plan['new_round_id']
+
+    if plan['round_entries'] is not None:
+        # Entries only (complete_round2): promoted teams go into the next round without matches
+        db.session.bulk_insert_mappings(Round, [{
+            'round_id': new_round_id,
+            'team_id': entry['team_id'],
+            'pool': entry['pool'],
+            'tournament_id': tournament_id,
+            'name': plan['new_round_name']
+        } for entry in plan['round_entries']])
+        # Bulk inserts skip the unit of work, so flag the tournament for cache invalidation
+        mark_tournament_changed(tournament_id)
+        db.session.commit()
+
+        return {
+            'message': 'New round complete!',
             'new_round_id': new_round_id,
-            'new_round_name': next_round_name,
-            'matches_created': len(created_matches),
-            'fixtures': fixtures
-        }), 201
+            'teams_promoted': len(plan['round_entries'])
+        }
+
+    # Create round entries and matches in database
+    created_matches = create_round_entries_and_matches(
+        tournament_id, new_round_id, plan['new_round_name'],
+        [(match['team1'], match['team2']) for match in plan['matches']],
+        pool_name=plan['pool'], round_number=plan['round_number'], bye_teams=plan['byes']
+    )
+
+    # Prepare response with new round details and fixtures
+    fixtures = get_round_fixtures(tournament_id, new_round_id)
+
+    return {
+        'message': f'Round {new_round_id} created successfully',
+        'new_round_id': new_round_id,
+        'new_round_name': plan['new_round_name'],
+        'matches_created': len(created_matches),
+        'fixtures': fixtures
+    }
+
+@round_bp.route('/complete-round/commit', methods=['POST'])
+def commit_round_plan():
+    """Apply a plan previewed with dry_run by complete_round or complete_round2"""
+    data = request.json
+    tournament_id = data.get('tournament_id')
+    plan_token = data.get('plan_token')
+
+    if not tournament_id or not plan_token:
+        return jsonify({'error': 'tournament_id and plan_token are required'}), 400
+
+    plan = round_plans.get((int(tournament_id), plan_token), get_tournament_version(tournament_id))
+    if plan is None:
+        return jsonify({
+            'error': 'Plan not found or the tournament changed since the preview. Run the preview again.'
+        }), 409
+
+    try:
+        response = apply_round_plan(plan)
+        return jsonify(response), (200 if plan['round_entries'] is not None else 201)
 
     except Exception as e:
         db.session.rollback()
@@ -183,7 +332,7 @@ def get_leaderboard_promoted_teams(round_data, teams_to_promote):
         reverse=True
     )
     
-    return [Team.query.get(t['team_id']) for t in sorted_teams[:teams_to_promote]]
+    return sorted_teams[:teams_to_promote]
 
 def get_pool_promoted_teams(round_data, teams_to_promote):
     """Get top teams from each pool evenly"""
@@ -201,10 +350,7 @@ def get_pool_promoted_teams(round_data, teams_to_promote):
             key=lambda x: (x['total_scores'], x['points_difference']),
             reverse=True
         )
-        promoted_teams.extend([
-            Team.query.get(t['team_id']) 
-            for t in sorted_pool[:teams_per_pool]
-        ])
+        promoted_teams.extend(sorted_pool[:teams_per_pool])
     
     return promoted_teams
 
@@ -268,7 +414,7 @@ def create_matches_by_type(teams, matchmaking_type):
 
 def create_custom_matches(custom_matches, promoted_teams):
     """Create matches from custom team pairings"""
-    team_dict = {team.team_id: team for team in promoted_teams}
+    team_dict = {team['team_id']: team for team in promoted_teams}
     matches = []
     
     for team1_id, team2_id in custom_matches:
@@ -277,46 +423,59 @@ def create_custom_matches(custom_matches, promoted_teams):
     
     return matches
 
-def create_round_entries_and_matches(tournament_id, new_round_id, round_name, matches):
-    """Create round entries and matches in database"""
-    created_matches = []
-    pool_name = 'A'
-    
-    for team1, team2 in matches:
-        # Create round entries
-        for team in [team1, team2]:
-            round_entry = Round(
-                round_id=new_round_id,
-                team_id=team.team_id,
-                pool=pool_name,
-                tournament_id=tournament_id,
-                name=round_name
-            )
-            db.session.add(round_entry)
-
-        # Create match
-        match = Match(
-            round_id=new_round_id,
-            pool=pool_name,
-            team1_id=team1.team_id,
-            team2_id=team2.team_id,
-            match_name=f"{round_name} - {team1.name} vs {team2.name}",
-            tournament_id=tournament_id,
-            status='pending'
-        )
-        db.session.add(match)
-        db.session.flush()
-        created_matches.append(match)
+def create_round_entries_and_matches(tournament_id, new_round_id, round_name, matches,
+                                     pool_name='A', round_number=None, bye_teams=()):
+    """
+    Create round entries and matches in database.
+
+    Teams are dicts with team_id and name. Round entries, matches and their 0-0
+    scores go in with bulk inserts and a single commit. Teams in bye_teams get a
+    completed bye match (a win) instead of an opponent.
+    """
+    round_rows = []
+    match_rows = []
 
-        # Create initial scores
+    for team1, team2 in matches:
         for team in [team1, team2]:
-            score = Score(
-                match_id=match.id,
-                team_id=team.team_id,
-                score=0,
-                tournament_id=tournament_id
-            )
-            db.session.add(score)
+            round_rows.append({
+                'round_id': new_round_id,
+                'team_id': team['team_id'],
+                'pool': pool_name,
+                'tournament_id': tournament_id,
+                'name': round_name
+            })
+        match_rows.append({
+            'round_id': new_round_id,
+            'pool': pool_name,
+            'team1_id': team1['team_id'],
+            'team2_id': team2['team_id'],
+            'match_name': f"{round_name} - {team1['name']} vs {team2['name']}",
+            'round_number': round_number
+        })
+
+    for team in bye_teams:
+        round_rows.append({
+            'round_id': new_round_id,
+            'team_id': team['team_id'],
+            'pool': pool_name,
+            'tournament_id': tournament_id,
+            'name': round_name
+        })
+        match_rows.append({
+            'round_id': new_round_id,
+            'pool': pool_name,
+            'team1_id': team['team_id'],
+            'team2_id': None,
+            'match_name': f"{round_name} - {team['name']} (bye)",
+            'round_number': round_number,
+            'status': 'completed',
+            'outcome': MatchOutcome.BYE.value,
+            'is_final': True,
+            'winner_team_id': team['team_id']
+        })
+
+    db.session.bulk_insert_mappings(Round, round_rows)
+    created_matches = bulk_create_matches(tournament_id, match_rows)
 
     db.session.commit()
     return created_matches
@@ -325,25 +484,33 @@ def get_round_fixtures(tournament_id, round_id):
     """Get fixtures for the newly created round"""
     matches = Match.query.filter_by(
         tournament_id=tournament_id,
-        round_id=round_id
+        round_id=str(round_id)
     ).all()
-    
+
+    team_ids = {team_id for match in matches for team_id in (match.team1_id, match.team2_id) if team_id}
+    team_names = {
+        team.team_id: team.name
+        for team in Team.query.filter(Team.team_id.in_(team_ids)).all()
+    } if team_ids else {}
+
     return [{
         'match_id': match.id,
         'match_name': match.match_name,
-        'team1': Team.query.get(match.team1_id).name,
-        'team2': Team.query.get(match.team2_id).name,
+        'team1': team_names.get(match.team1_id, 'BYE'),
+        'team2': team_names.get(match.team2_id, 'BYE'),
         'pool': match.pool,
         'status': match.status
     } for match in matches]
 
 @round_bp.route('/complete-round-2', methods=['POST'])
 def complete_round2():
+    """Promote the top teams of each pool into the next round (elimination tournaments). Supports dry_run"""
     data = request.json
     tournament_id = data.get('tournament_id')
     round_id = data.get('round_id')
     num_promoted = data.get('num_promoted')
     round_name = data.get('round_name')  # Optional, if provided
+    dry_run = data.get('dry_run', False)
 
     if not tournament_id or not num_promoted or not round_id:
         return jsonify({'error': 'tournament_id, num_promoted and round_id are required'}), 400
@@ -357,14 +524,19 @@ def complete_round2():
         return jsonify({'error': 'This tournament is not elimination type'}), 400
 
     try:
+        version = get_tournament_version(tournament_id)
+
         # Get all matches for the current round
-        matches = Match.query.filter_by(round_id=round_id, tournament_id=tournament_id).all()
+        matches = Match.query.filter_by(round_id=str(round_id), tournament_id=tournament_id).all()
         if not matches:
             return jsonify({'error': f'No matches found for round {round_id}'}), 404
 
         # Get all scores for these matches
         match_ids = [match.id for match in matches]
         scores = Score.query.filter(Score.match_id.in_(match_ids)).all()
+        scores_by_match = {}
+        for score in scores:
+            scores_by_match.setdefault(score.match_id, []).append(score)
 
         # Create a dictionary to store team scores by pool
         pool_scores = {}
@@ -372,41 +544,49 @@ def complete_round2():
             if match.pool not in pool_scores:
                 pool_scores[match.pool] = {}
 
-            # Get scores for this match
-            match_scores = [s for s in scores if s.match_id == match.id]
-            for score in match_scores:
+            for score in scores_by_match.get(match.id, []):
                 if score.team_id not in pool_scores[match.pool]:
                     pool_scores[match.pool][score.team_id] = 0
                 pool_scores[match.pool][score.team_id] += score.score
 
         # Sort teams by score in each pool and get top teams
-        promoted_teams = []
+        round_entries = []
         for pool, team_scores in pool_scores.items():
             sorted_teams = sorted(team_scores.items(), key=lambda x: x[1], reverse=True)
             top_teams = sorted_teams[:num_promoted]
-            promoted_teams.extend([team_id for team_id, _ in top_teams])
+            round_entries.extend({'team_id': team_id, 'pool': pool} for team_id, _ in top_teams)
+
+        # Team names with one query
+        team_names = {
+            team.team_id: team.name
+            for team in Team.query.filter(
+                Team.team_id.in_([entry['team_id'] for entry in round_entries])
+            ).all()
+        } if round_entries else {}
 
         # Create new round with promoted teams
         new_round_id = int(round_id) + 1
-        round_name = round_name or f"Round {new_round_id}"
-
-        # Create round entries for promoted teams
-        for team_id in promoted_teams:
-            new_round = Round(
-                tournament_id=tournament_id,
-                round_id=new_round_id,
-                team_id=team_id,
-                name=round_name
-            )
-            db.session.add(new_round)
+        plan = {
+            'tournament_id': tournament_id,
+            'round_id': round_id,
+            'new_round_id': new_round_id,
+            'new_round_name': round_name or f"Round {new_round_id}",
+            'pool': None,
+            'round_number': None,
+            'promoted_teams': [
+                {'team_id': entry['team_id'], 'name': team_names.get(entry['team_id'], 'Unknown')}
+                for entry in round_entries
+            ],
+            'matches': [],
+            'byes': [],
+            'round_entries': round_entries
+        }
 
-        db.session.commit()
+        if dry_run:
+            return jsonify(save_round_plan(plan, version)), 200
 
-        return jsonify({
-            'message': 'New round complete!',
-            'new_round_id': new_round_id,
-        }), 200
+        return jsonify(apply_round_plan(plan)), 200
 
     except Exception as e:
         db.session.rollback()
-        raise e 
\ No newline at end of file
+        raise e
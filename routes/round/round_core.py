@@ -1,9 +1,67 @@
 from flask import request, jsonify
-from models import Tournament, Team, Player, Match, Score, Round, db
+from sqlalchemy import or_
+from models import Tournament, Team, Player, Match, Score, Round, PlayerRating, SkillType, db
+from utils import snake_seed_pools
+from cache import mark_tournament_changed
+from ratings import DEFAULT_RATING
 from . import round_bp
+from .round_helpers import cumulative_points
+
+SEEDING_TYPES = ('sequential', 'order', 'rating', 'skill', 'standings')
+
+# Strength of a player's skill label, for skill seeding
+SKILL_LEVELS = {
+    SkillType.BEGINNER.value: 1,
+    SkillType.INTERMEDIATE.value: 2,
+    SkillType.ADVANCED.value: 3,
+    SkillType.PROFESSIONAL.value: 4
+}
+
+def get_team_strengths(tournament, team_ids, seeding):
+    """
+    Strength per team for snake seeding, higher is stronger.
+
+    'rating' averages the players' internal ratings, 'skill' their skill labels and
+    'standings' uses total points and points difference over the tournament so far.
+    Each source is read with one query.
+    """
+    if seeding == 'standings':
+        return {
+            team['team_id']: (team['total_points'], team['points_difference'])
+            for team in cumulative_points(tournament.id)
+        }
+
+    players = db.session.query(Team.team_id, Player.uuid, Player.skill_type).join(
+        Player, or_(Player.uuid == Team.player1_uuid, Player.uuid == Team.player2_uuid)
+    ).filter(Team.team_id.in_(team_ids)).all()
+
+    if seeding == 'rating':
+        ratings = {
+            rating.player_uuid: rating.rating for rating in PlayerRating.query.filter(
+                PlayerRating.super_tournament_id == tournament.season.super_tournament_id,
+                PlayerRating.player_uuid.in_([player.uuid for player in players])
+            ).all()
+        } if players else {}
+        values = [(player.team_id, ratings.get(player.uuid, DEFAULT_RATING)) for player in players]
+    else:  # skill
+        values = [(player.team_id, SKILL_LEVELS.get((player.skill_type or '').lower(), 0)) for player in players]
+
+    team_values = {}
+    for team_id, value in values:
+        team_values.setdefault(team_id, []).append(value)
+    return {team_id: sum(vals) / len(vals) for team_id, vals in team_values.items()}
 
 @round_bp.route('/create-round', methods=['POST'])
 def create_round():
+    """
+    Create a round by splitting teams into pools.
+
+    seeding 'sequential' (default) slices the team list in order; 'order', 'rating',
+    'skill' and 'standings' snake-seed the teams by that strength. clubs
+    ({team_id: club}) keeps teams of the same club apart, max_pool_size caps pool
+    sizes (and sets the number of pools if number_of_pools is left out), and
+    dry_run returns the pools without creating the round.
+    """
     data = request.json
     
     # Extract data from request
@@ -13,21 +71,33 @@ def create_round():
     round_name = data.get('round_name', f'Round {round_id}')  # Default to round ID if no name provided
     num_of_top_teams_to_promote = data.get('num_of_top_teams_to_promote')  # Optional
     teams = data.get('teams')  # Optional, array of team_ids
+    seeding = data.get('seeding', 'sequential')
+    clubs = data.get('clubs')  # Optional, {team_id: club}
+    max_pool_size = data.get('max_pool_size')  # Optional
+    dry_run = data.get('dry_run', False)
 
-    if not all([tournament_id, round_id, number_of_pools]):
+    if not all([tournament_id, round_id]) or not (number_of_pools or max_pool_size):
         return jsonify({
-            'error': 'tournament_id, round_id, and number_of_pools are required',
+            'error': 'tournament_id, round_id, and number_of_pools (or max_pool_size) are required',
             'tournament_id': tournament_id,
             'round_id': round_id,
             'number_of_pools': number_of_pools
         }), 400
 
+    if seeding not in SEEDING_TYPES:
+        return jsonify({'error': f"seeding must be one of: {', '.join(SEEDING_TYPES)}"}), 400
+
     try:
-        number_of_pools = int(number_of_pools)
-        if number_of_pools <= 0:
-            return jsonify({'error': 'number_of_pools must be a positive integer'}), 400
+        if number_of_pools:
+            number_of_pools = int(number_of_pools)
+            if number_of_pools <= 0:
+                return jsonify({'error': 'number_of_pools must be a positive integer'}), 400
+        if max_pool_size:
+            max_pool_size = int(max_pool_size)
+            if max_pool_size <= 0:
+                return jsonify({'error': 'max_pool_size must be a positive integer'}), 400
     except ValueError:
-        return jsonify({'error': 'number_of_pools must be a valid integer'}), 400
+        return jsonify({'error': 'number_of_pools and max_pool_size must be valid integers'}), 400
 
     tournament = Tournament.query.filter_by(id=tournament_id).first()
     if not tournament:
@@ -45,12 +115,8 @@ def create_round():
         }), 409
 
     if num_of_top_teams_to_promote:
-        # Call the cumulative points API to get the top teams
-        standings_response = get_cumulative_points_for_round(tournament_id)
-        standings_data = standings_response.get_json()
-
-        # Get the top `num_of_top_teams_to_promote` teams
-        sorted_teams = sorted(standings_data['standings'], key=lambda x: (x['total_points'], x['points_difference']), reverse=True)
+        # Get the top `num_of_top_teams_to_promote` teams by cumulative points
+        sorted_teams = sorted(cumulative_points(tournament_id), key=lambda x: (x['total_points'], x['points_difference']), reverse=True)
         top_teams = sorted_teams[:int(num_of_top_teams_to_promote)]
 
         # Extract team_ids
@@ -60,50 +126,96 @@ def create_round():
         team_ids_to_use = teams
     else:
         # Use all teams in the tournament
-        team_ids_to_use = [team.team_id for team in tournament.teams]
+        team_ids_to_use = [team_id for (team_id,) in db.session.query(Team.team_id).filter_by(tournament_id=tournament.id).all()]
+
+    if not number_of_pools:
+        number_of_pools = max(1, -(-len(team_ids_to_use) // max_pool_size))
 
     # Step 2: Create the rounds
     try:
+        pool_names = [str(pool_number) for pool_number in range(1, number_of_pools + 1)]
+
+        if seeding == 'sequential' and not clubs:
+            if max_pool_size and len(team_ids_to_use) > number_of_pools * max_pool_size:
+                return jsonify({
+                    'error': f'{len(team_ids_to_use)} teams do not fit into {number_of_pools} pools of at most {max_pool_size} teams'
+                }), 400
+
+            teams_per_pool = len(team_ids_to_use) // number_of_pools
+            remaining_teams = len(team_ids_to_use) % number_of_pools
+
+            # Distribute teams into pools
+            pools = {}
+            index = 0
+            for pool_number in range(1, number_of_pools + 1):
+                pool_size = teams_per_pool + (1 if pool_number <= remaining_teams else 0)
+                pools[str(pool_number)] = team_ids_to_use[index:index + pool_size]
+                index += pool_size
+            strengths = {}
+        else:
+            # Strongest first ('order' keeps the given order), then snake into pools
+            strengths = {} if seeding in ('sequential', 'order') else get_team_strengths(tournament, team_ids_to_use, seeding)
+            if strengths:
+                lowest = min(strengths.values())
+                seeded = sorted(team_ids_to_use, key=lambda team_id: strengths.get(team_id, lowest), reverse=True)
+            else:
+                seeded = list(team_ids_to_use)
+
+            try:
+                pools = snake_seed_pools(seeded, number_of_pools, clubs, max_pool_size, pool_names)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
         created_pools = []
-        teams_per_pool = len(team_ids_to_use) // number_of_pools
-        remaining_teams = len(team_ids_to_use) % number_of_pools
-
-        # Distribute teams into pools
-        pool_teams = []
-        index = 0
-        for pool_number in range(1, number_of_pools + 1):
-            pool_size = teams_per_pool + (1 if pool_number <= remaining_teams else 0)
-            pool_teams.append(team_ids_to_use[index:index + pool_size])
-            index += pool_size
-
-        # Create round entries for each pool
-        for pool_number, pool_teams_in_pool in enumerate(pool_teams, start=1):
-            for team_id in pool_teams_in_pool:
-                new_round = Round(
-                    tournament_id=tournament_id,
-                    round_id=round_id,
-                    pool=str(pool_number),
-                    team_id=team_id,
-                    name=round_name
-                )
-                db.session.add(new_round)
-
-            created_pools.append({
-                'pool': str(pool_number),
+        for pool_name, pool_teams_in_pool in pools.items():
+            pool_info = {
+                'pool': pool_name,
                 'teams': pool_teams_in_pool
-            })
+            }
+            if seeding in ('rating', 'skill'):
+                pool_strengths = [strengths[team_id] for team_id in pool_teams_in_pool if team_id in strengths]
+                pool_info['average_strength'] = round(sum(pool_strengths) / len(pool_strengths), 2) if pool_strengths else None
+            if clubs:
+                pool_clubs = [clubs[team_id] for team_id in pool_teams_in_pool if clubs.get(team_id)]
+                pool_info['club_clashes'] = len(pool_clubs) - len(set(pool_clubs))
+            created_pools.append(pool_info)
 
-        db.session.commit()
+        round_details = {
+            'tournament_id': tournament_id,
+            'round_id': round_id,
+            'round_name': round_name,
+            'number_of_pools': number_of_pools,
+            'seeding': seeding,
+            'pools': created_pools
+        }
 
-        return jsonify({
-            'message': 'Round created successfully with multiple pools',
-            'round_details': {
+        if dry_run:
+            return jsonify({
+                'message': 'Round preview (nothing was created)',
+                'dry_run': True,
+                'round_details': round_details
+            }), 200
+
+        # Create round entries for each pool with one bulk insert
+        db.session.bulk_insert_mappings(Round, [
+            {
                 'tournament_id': tournament_id,
                 'round_id': round_id,
-                'round_name': round_name,
-                'number_of_pools': number_of_pools,
-                'pools': created_pools
+                'pool': pool_name,
+                'team_id': team_id,
+                'name': round_name
             }
+            for pool_name, pool_teams_in_pool in pools.items()
+            for team_id in pool_teams_in_pool
+        ])
+        # Bulk inserts skip the unit of work, so flag the tournament for cache invalidation
+        mark_tournament_changed(tournament_id)
+
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Round created successfully with multiple pools',
+            'round_details': round_details
         }), 201
 
     except Exception as e:
@@ -3,12 +3,9 @@ from models import db, Tournament, Match, Team, Score, Round
 from sqlalchemy import func
 from . import round_bp
 from flask_cors import cross_origin
+from .round_bracket import is_power_of_two, build_knockout_tree, persist_bracket, BRACKET_POOLS
 import csv
 import io
-import math
-
-def is_power_of_two(n):
-    return n != 0 and (n & (n - 1)) == 0
 
 def get_pool_standings(tournament_id, round_id):
     """Get standings for each pool"""
@@ -122,113 +119,6 @@ def get_top_teams_for_knockout():
         print(f"Error in get_top_teams_for_knockout: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-def create_knockout_structure(team_ids, tournament_id, starting_round_id):
-    """Creates a knockout bracket structure from a list of team IDs"""
-    if not is_power_of_two(len(team_ids)):
-        raise ValueError("Number of teams must be a power of 2")
-
-    total_rounds = int(math.log2(len(team_ids)))
-    matches = []
-    rounds = []
-    match_positions = {}  # To store matches by position for easy reference
-
-    def get_round_name(round_num, total_rounds, num_teams):
-        """Helper function to get appropriate round name based on position and bracket size"""
-        if round_num == total_rounds:
-            return "Finals"
-        elif round_num == total_rounds - 1:
-            return "Semi Finals"
-        elif round_num == total_rounds - 2:
-            return "Quarter Finals"
-        elif round_num == 1:
-            if num_teams == 16:
-                return "Round of 16"
-            elif num_teams == 32:
-                return "Round of 32"
-            else:
-                return f"Round {round_num}"
-        else:
-            remaining_teams = num_teams // (2 ** (round_num - 1))
-            return f"Round of {remaining_teams}"
-
-    # Create rounds for each bracket stage
-    for round_num in range(1, total_rounds + 1):
-        current_round_id = starting_round_id + round_num - 1
-        round_name = get_round_name(round_num, total_rounds, len(team_ids))
-
-        # Create Round entries for teams in this round
-        if round_num == 1:  # Only first round has known teams
-            for team_id in team_ids:
-                rounds.append(Round(
-                    tournament_id=tournament_id,
-                    round_id=current_round_id,
-                    team_id=team_id,
-                    pool="knockout",
-                    name=round_name
-                ))
-        else:
-            # Create placeholder round entries for future rounds with TBD
-            rounds.append(Round(
-                tournament_id=tournament_id,
-                round_id=current_round_id,
-                team_id="TBD",
-                pool="knockout",
-                name=round_name
-            ))
-
-    # Create first round matches
-    first_round_count = len(team_ids) // 2
-    for i in range(first_round_count):
-        match_name = get_match_name(1, total_rounds, i + 1, len(team_ids))
-        match = Match(
-            tournament_id=tournament_id,
-            match_name=match_name,
-            round_id=str(starting_round_id),
-            pool="knockout",
-            team1_id=team_ids[i*2],
-            team2_id=team_ids[i*2+1],
-            round_number=1,
-            bracket_position=i,
-            status='pending'
-        )
-        matches.append(match)
-        match_positions[f"1_{i}"] = match
-
-    # Create subsequent round matches (empty/placeholder matches)
-    for round_num in range(2, total_rounds + 1):
-        current_round_id = starting_round_id + round_num - 1
-        matches_in_round = 2 ** (total_rounds - round_num)
-        
-        for i in range(matches_in_round):
-            match_name = get_match_name(round_num, total_rounds, i + 1, len(team_ids))
-            match = Match(
-                tournament_id=tournament_id,
-                match_name=match_name,
-                round_id=str(current_round_id),
-                pool="knockout",
-                team1_id="TBD",
-                team2_id="TBD",
-                round_number=round_num,
-                bracket_position=i,
-                status='pending'
-            )
-            matches.append(match)
-            match_positions[f"{round_num}_{i}"] = match
-
-    return matches, rounds, match_positions
-
-def get_match_name(round_num, total_rounds, match_num, num_teams):
-    """Helper function to get appropriate match name based on round and position"""
-    if round_num == total_rounds:
-        return "F1"
-    elif round_num == total_rounds - 1:
-        return f"SF{match_num}"
-    elif round_num == total_rounds - 2:
-        return f"QF{match_num}"
-    else:
-        remaining_teams = num_teams // (2 ** (round_num - 1))
-        return f"R{remaining_teams}-M{match_num}"
-
 @round_bp.route('/knockout', methods=['POST', 'OPTIONS'])
 def create_knockout_bracket():
     if request.method == 'OPTIONS':
@@ -249,9 +139,20 @@ def create_knockout_bracket():
     if not team_ids:
         return jsonify({'error': 'team_ids array is required'}), 400
 
+    # Check if knockout bracket already exists
+    existing_knockout = Match.query.filter_by(
+        tournament_id=tournament_id,
+        pool="knockout"
+    ).first()
+
+    if existing_knockout:
+        return jsonify({
+            'error': 'Knockout bracket already exists for this tournament. Delete it first.'
+        }), 400
+
     try:
         # Validate number of teams
-        if not is_power_of_two(len(team_ids)):
+        if len(team_ids) < 2 or not is_power_of_two(len(team_ids)):
             return jsonify({
                 'error': f'Number of teams must be a power of 2. Got {len(team_ids)} teams'
             }), 400
@@ -268,80 +169,25 @@ def create_knockout_bracket():
 
         # Create knockout structure starting from next round
         starting_round_id = current_round_id + 1
-        matches, rounds, match_positions = create_knockout_structure(team_ids, tournament_id, starting_round_id)
-
-        # First save rounds
-        db.session.bulk_save_objects(rounds)
-        db.session.flush()
+        first_round_pairs = [(team_ids[i], team_ids[i + 1]) for i in range(0, len(team_ids), 2)]
+        tree = build_knockout_tree(first_round_pairs, starting_round_id)
 
-        # Save matches and get their IDs
-        for match in matches:
-            db.session.add(match)
-        db.session.flush()
+        # Rounds, matches, scores and links all go in with bulk statements
+        match_details = persist_bracket(tournament_id, tree['nodes'], tree['rounds'])
 
-        # Refresh each match to ensure they have IDs
-        for match in matches:
-            db.session.refresh(match)
-
-        # Now set up predecessor and successor relationships
-        total_rounds = int(math.log2(len(team_ids)))
-        for round_num in range(1, total_rounds):
-            matches_in_round = 2 ** (total_rounds - round_num)
-            for i in range(matches_in_round):
-                current_match = match_positions[f"{round_num}_{i}"]
-                successor_match = match_positions[f"{round_num+1}_{i//2}"]
-                
-                # Update the relationships using the model
-                current_match.successor = successor_match.id
-                if i % 2 == 0:
-                    successor_match.predecessor_1 = current_match.id
-                else:
-                    successor_match.predecessor_2 = current_match.id
-
-        # Flush to ensure relationships are saved
-        db.session.flush()
-
-        # Create initial scores for first round matches with known teams
-        scores = []
-        for match in matches:
-            if match.team1_id != "TBD" and match.team2_id != "TBD":  # Only for matches with known teams
-                scores.extend([
-                    Score(
-                        match_id=match.id,
-                        team_id=match.team1_id,
-                        score=0,
-                        tournament_id=tournament_id
-                    ),
-                    Score(
-                        match_id=match.id,
-                        team_id=match.team2_id,
-                        score=0,
-                        tournament_id=tournament_id
-                    )
-                ])
-
-        if scores:
-            db.session.bulk_save_objects(scores)
-        
         # Final commit of all changes
         db.session.commit()
 
-        # Verify the relationships were saved
-        saved_matches = Match.query.filter(
-            Match.tournament_id == tournament_id,
-            Match.round_id >= str(starting_round_id),
-            Match.round_id < str(starting_round_id + total_rounds)
-        ).all()
-
         return jsonify({
             'message': 'Knockout bracket created successfully',
-            'matches_created': len(matches),
-            'rounds_created': len(rounds),
+            'matches_created': len(match_details),
+            'rounds_created': len(tree['rounds']),
             'starting_round': starting_round_id,
-            'total_rounds': total_rounds,
+            'total_rounds': tree['total_rounds'],
+            'matches': match_details,
             'verification': {
-                'matches_with_successors': len([m for m in saved_matches if m.successor is not None]),
-                'matches_with_predecessors': len([m for m in saved_matches if m.predecessor_1 is not None or m.predecessor_2 is not None])
+                'matches_with_successors': len([m for m in match_details if m['successor'] is not None]),
+                'matches_with_predecessors': len([m for m in match_details if m['predecessor_1'] is not None or m['predecessor_2'] is not None])
             }
         }), 201
 
@@ -350,25 +196,6 @@ def create_knockout_bracket():
         print(f"Error in create_knockout_bracket: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-def get_round_name(round_num, total_rounds, num_teams):
-    """Helper function to get appropriate round name based on position and bracket size"""
-    if round_num == total_rounds:
-        return "Finals"
-    elif round_num == total_rounds - 1:
-        return "Semi Finals"
-    elif round_num == total_rounds - 2:
-        return "Quarter Finals"
-    elif round_num == 1:
-        if num_teams == 16:
-            return "Round of 16"
-        elif num_teams == 32:
-            return "Round of 32"
-        else:
-            return f"Round {round_num}"
-    else:
-        remaining_teams = num_teams // (2 ** (round_num - 1))
-        return f"Round of {remaining_teams}"
-
 @round_bp.route('/knockout-from-matches', methods=['POST', 'OPTIONS'])
 def create_knockout_from_matches():
     if request.method == 'OPTIONS':
@@ -402,19 +229,18 @@ def create_knockout_from_matches():
     # Determine round type based on number of matches
     num_matches = len(matches)
     round_types = {
-        16: ('round_of_32', 32),
-        8: ('round_of_16', 16),
-        4: ('quarter_finals', 8),
-        2: ('semi_finals', 4),
-        1: ('finals', 2)
+        1: 'finals',
+        2: 'semi_finals',
+        4: 'quarter_finals'
     }
 
-    if num_matches not in round_types:
+    if not is_power_of_two(num_matches) or num_matches > 64:
         return jsonify({
-            'error': f'Invalid number of matches. Must be one of: {list(round_types.keys())} matches. Got {num_matches} matches'
+            'error': f'Invalid number of matches. Must be a power of 2 up to 64 matches. Got {num_matches} matches'
         }), 400
 
-    round_type, total_teams = round_types[num_matches]
+    total_teams = num_matches * 2
+    round_type = round_types.get(num_matches, f'round_of_{total_teams}')
     print(f"Determined round type: {round_type} with {total_teams} total teams")
 
     try:
@@ -443,185 +269,31 @@ def create_knockout_from_matches():
 
         print(f"All {len(team_ids)} teams validated successfully")
 
-        # Calculate total rounds needed to reach finals
-        total_rounds = int(math.log2(num_matches * 2))  # If 8 matches (R16) -> 4 rounds (R16, QF, SF, F)
         starting_round_id = current_round_id + 1
-        rounds = []
-        all_matches = []
-        match_positions = {}
-
-        print(f"Creating {total_rounds} rounds starting from round {starting_round_id}")
-
-        # Create rounds
-        for round_num in range(1, total_rounds + 1):
-            current_round_id = starting_round_id + round_num - 1
-            teams_in_round = num_matches * 2 // (2 ** (round_num - 1))  # For R16: 16->8->4->2
-            round_name = get_round_name(round_num, total_rounds, num_matches * 2)  # num_matches * 2 gives total teams
-            print(f"Creating round {round_num}: {round_name} with {teams_in_round} teams")
-
-            if round_num == 1:
-                # First round with provided matches
-                for match in matches:
-                    rounds.extend([
-                        Round(
-                            tournament_id=tournament_id,
-                            round_id=current_round_id,
-                            team_id=match['team1_id'],
-                            pool="knockout",
-                            name=round_name
-                        ),
-                        Round(
-                            tournament_id=tournament_id,
-                            round_id=current_round_id,
-                            team_id=match['team2_id'],
-                            pool="knockout",
-                            name=round_name
-                        )
-                    ])
-            else:
-                # Future rounds with TBD teams
-                for _ in range(teams_in_round):
-                    rounds.append(Round(
-                        tournament_id=tournament_id,
-                        round_id=current_round_id,
-                        team_id="TBD",
-                        pool="knockout",
-                        name=round_name
-                    ))
-
-        # Create first round matches from provided matches
-        print("\nCreating first round matches:")
-        for i, match_data in enumerate(matches):
-            match_name = get_match_name(1, total_rounds, i + 1, num_matches * 2)
-            print(f"Creating match {match_name}: {match_data['team1_id']} vs {match_data['team2_id']}")
-            match = Match(
-                tournament_id=tournament_id,
-                match_name=match_name,
-                round_id=str(starting_round_id),
-                pool="knockout",
-                team1_id=match_data['team1_id'],
-                team2_id=match_data['team2_id'],
-                round_number=1,
-                bracket_position=i,
-                status='pending'
-            )
-            all_matches.append(match)
-            match_positions[f"1_{i}"] = match
-
-        # Create subsequent round matches (empty/placeholder matches)
-        print("\nCreating subsequent round matches:")
-        for round_num in range(2, total_rounds + 1):
-            current_round_id = starting_round_id + round_num - 1
-            matches_in_round = num_matches // (2 ** (round_num - 1))  # For R16: 8->4->2->1
-            print(f"Round {round_num}: Creating {matches_in_round} matches")
-            
-            for i in range(matches_in_round):
-                match_name = get_match_name(round_num, total_rounds, i + 1, num_matches * 2)
-                match = Match(
-                    tournament_id=tournament_id,
-                    match_name=match_name,
-                    round_id=str(current_round_id),
-                    pool="knockout",
-                    team1_id="TBD",
-                    team2_id="TBD",
-                    round_number=round_num,
-                    bracket_position=i,
-                    status='pending'
-                )
-                all_matches.append(match)
-                match_positions[f"{round_num}_{i}"] = match
+        first_round_pairs = [(match['team1_id'], match['team2_id']) for match in matches]
+
+        # Build the whole bracket in memory first
+        tree = build_knockout_tree(first_round_pairs, starting_round_id)
+        print(f"Creating {tree['total_rounds']} rounds starting from round {starting_round_id}")
 
-        # Save rounds and matches
+        # Rounds, matches, scores and links all go in with bulk statements
         print("\nSaving rounds and matches to database")
-        db.session.bulk_save_objects(rounds)
-        db.session.flush()
-
-        for match in all_matches:
-            db.session.add(match)
-        db.session.flush()
-
-        # Refresh matches to get IDs
-        for match in all_matches:
-            db.session.refresh(match)
-
-        # Set up predecessor and successor relationships
-        print("\nSetting up match relationships")
-        for round_num in range(1, total_rounds):
-            matches_in_round = num_matches // (2 ** (round_num - 1))  # For R16: 8->4->2->1
-            for i in range(matches_in_round):
-                current_match = match_positions[f"{round_num}_{i}"]
-                successor_match = match_positions[f"{round_num+1}_{i//2}"]
-                
-                current_match.successor = successor_match.id
-                if i % 2 == 0:
-                    successor_match.predecessor_1 = current_match.id
-                else:
-                    successor_match.predecessor_2 = current_match.id
-
-        # Flush to ensure relationships are saved
-        db.session.flush()
-
-        # Create initial scores for first round matches
-        print("\nCreating initial scores for first round matches")
-        scores = []
-        for match in all_matches:
-            if match.team1_id != "TBD" and match.team2_id != "TBD":
-                scores.extend([
-                    Score(
-                        match_id=match.id,
-                        team_id=match.team1_id,
-                        score=0,
-                        tournament_id=tournament_id
-                    ),
-                    Score(
-                        match_id=match.id,
-                        team_id=match.team2_id,
-                        score=0,
-                        tournament_id=tournament_id
-                    )
-                ])
-
-        if scores:
-            db.session.bulk_save_objects(scores)
-        
-        db.session.commit()
+        match_details = persist_bracket(tournament_id, tree['nodes'], tree['rounds'])
 
-        # Verify the relationships were saved
-        saved_matches = Match.query.filter(
-            Match.tournament_id == tournament_id,
-            Match.round_id >= str(starting_round_id),
-            Match.round_id < str(starting_round_id + total_rounds)
-        ).all()
-
-        # Prepare match details for response
-        match_details = []
-        for match in all_matches:
-            match_details.append({
-                'id': match.id,
-                'name': match.match_name,
-                'round_id': match.round_id,
-                'round_number': match.round_number,
-                'team1_id': match.team1_id,
-                'team2_id': match.team2_id,
-                'bracket_position': match.bracket_position,
-                'status': match.status,
-                'predecessor_1': match.predecessor_1,
-                'predecessor_2': match.predecessor_2,
-                'successor': match.successor
-            })
+        db.session.commit()
 
         print("\nKnockout bracket creation completed successfully")
         return jsonify({
             'message': f'Knockout bracket created successfully starting from {round_type}',
             'round_type': round_type,
-            'matches_created': len(all_matches),
-            'rounds_created': len(rounds),
+            'matches_created': len(match_details),
+            'rounds_created': len(tree['rounds']),
             'starting_round': starting_round_id,
-            'total_rounds': total_rounds,
+            'total_rounds': tree['total_rounds'],
             'matches': match_details,
             'verification': {
-                'matches_with_successors': len([m for m in saved_matches if m.successor is not None]),
-                'matches_with_predecessors': len([m for m in saved_matches if m.predecessor_1 is not None or m.predecessor_2 is not None])
+                'matches_with_successors': len([m for m in match_details if m['successor'] is not None]),
+                'matches_with_predecessors': len([m for m in match_details if m['predecessor_1'] is not None or m['predecessor_2'] is not None])
             }
         }), 201
 
@@ -640,10 +312,10 @@ def check_knockout_exists(tournament_id):
         ).first()
         
         if knockout_matches:
-            # Get details about the knockout stage
-            matches = Match.query.filter_by(
-                tournament_id=tournament_id,
-                pool="knockout"
+            # Get details about the knockout stage (including any plate bracket)
+            matches = Match.query.filter(
+                Match.tournament_id == tournament_id,
+                Match.pool.in_(BRACKET_POOLS)
             ).all()
             
             rounds = set()
@@ -677,25 +349,25 @@ def delete_knockout_bracket(tournament_id):
         # Delete scores first due to foreign key constraints
         scores_deleted = Score.query.filter(
             Score.match_id.in_(
-                db.session.query(Match.id).filter_by(
-                    tournament_id=tournament_id,
-                    pool="knockout"
+                db.session.query(Match.id).filter(
+                    Match.tournament_id == tournament_id,
+                    Match.pool.in_(BRACKET_POOLS)
                 )
             )
         ).delete(synchronize_session=False)
         print(f"Deleted {scores_deleted} scores")
         
-        # Delete matches
-        matches_deleted = Match.query.filter_by(
-            tournament_id=tournament_id,
-            pool="knockout"
+        # Delete matches (knockout and its plate bracket)
+        matches_deleted = Match.query.filter(
+            Match.tournament_id == tournament_id,
+            Match.pool.in_(BRACKET_POOLS)
         ).delete(synchronize_session=False)
         print(f"Deleted {matches_deleted} matches")
         
         # Delete rounds
-        rounds_deleted = Round.query.filter_by(
-            tournament_id=tournament_id,
-            pool="knockout"
+        rounds_deleted = Round.query.filter(
+            Round.tournament_id == tournament_id,
+            Round.pool.in_(BRACKET_POOLS)
         ).delete(synchronize_session=False)
         print(f"Deleted {rounds_deleted} rounds")
         
@@ -0,0 +1,229 @@
+import numpy as np
+from flask import request, jsonify
+from sqlalchemy.orm import aliased
+from models import Match, Team, Score, db
+from cache import VersionedCache, get_tournament_version
+from . import round_bp
+
+# Pools with at most this many unplayed matches are enumerated exactly (2^n outcomes)
+EXACT_MAX_REMAINING = 16
+# ...as long as the outcome x team x team comparison stays this small
+EXACT_MAX_CELLS = 4000000
+DEFAULT_SIMULATIONS = 10000
+MAX_SIMULATIONS = 200000
+
+# Scenario results, valid until the tournament's data version changes
+qualification_cache = VersionedCache(maxsize=128, name='qualification')
+
+def load_pool_results(tournament_id, round_id):
+    """
+    Get the played results and remaining fixtures of every pool in a round.
+
+    Uses one query for matches with both scores and one for team names. A match
+    is unplayed while both scores are 0, the same rule the standings use.
+
+    Returns {pool: {'teams': [team_id, ...], 'played': [(t1, t2, s1, s2)], 'remaining': [(t1, t2)]}}
+    and a team_id -> name mapping.
+    """
+    Score1 = aliased(Score)
+    Score2 = aliased(Score)
+
+    rows = db.session.query(
+        Match.pool,
+        Match.team1_id,
+        Match.team2_id,
+        Score1.score.label('team1_score'),
+        Score2.score.label('team2_score')
+    ).outerjoin(
+        Score1, (Score1.match_id == Match.id) & (Score1.team_id == Match.team1_id)
+    ).outerjoin(
+        Score2, (Score2.match_id == Match.id) & (Score2.team_id == Match.team2_id)
+    ).filter(
+        Match.tournament_id == tournament_id,
+        Match.round_id == str(round_id),
+        Match.team1_id.isnot(None),
+        Match.team2_id.isnot(None)
+    ).order_by(Match.id).all()
+
+    pools = {}
+    for row in rows:
+        pool = pools.setdefault(row.pool, {'teams': [], 'played': [], 'remaining': []})
+        for team_id in (row.team1_id, row.team2_id):
+            if team_id not in pool['teams']:
+                pool['teams'].append(team_id)
+
+        team1_score = row.team1_score or 0
+        team2_score = row.team2_score or 0
+        if team1_score == 0 and team2_score == 0:
+            pool['remaining'].append((row.team1_id, row.team2_id))
+        else:
+            pool['played'].append((row.team1_id, row.team2_id, team1_score, team2_score))
+
+    team_ids = {team_id for pool in pools.values() for team_id in pool['teams']}
+    team_names = {
+        team.team_id: team.name
+        for team in Team.query.filter(Team.team_id.in_(team_ids)).all()
+    } if team_ids else {}
+
+    return pools, team_names
+
+def pool_outcomes(pool, qualifiers, simulations=DEFAULT_SIMULATIONS, seed=None):
+    """
+    Qualification outcomes for one pool.
+
+    Every remaining match is a coin flip. With few remaining matches all 2^n
+    results are enumerated; otherwise `simulations` random seasons are played out.
+    Both run as one vectorized NumPy evaluation: teams are ordered like the
+    standings (wins, then points difference, then the current standings order),
+    and a simulated win is worth the pool's average winning margin in points
+    difference.
+
+    guaranteed/eliminated never depend on the assumed margins: they follow from
+    wins, and a tie on wins only counts as decided between teams that have nothing
+    left to play (their points difference is final). They are exact in that sense
+    when enumerated and conservative bounds (wins only) otherwise.
+
+    Returns (per-team result dicts in current standings order, method, outcomes evaluated).
+    """
+    teams = pool['teams']
+    n = len(teams)
+    index = {team_id: i for i, team_id in enumerate(teams)}
+
+    base_wins = np.zeros(n, dtype=np.int64)
+    base_diff = np.zeros(n, dtype=np.int64)
+    margins = []
+    for team1_id, team2_id, team1_score, team2_score in pool['played']:
+        i, j = index[team1_id], index[team2_id]
+        base_diff[i] += team1_score - team2_score
+        base_diff[j] += team2_score - team1_score
+        if team1_score > team2_score:
+            base_wins[i] += 1
+        elif team2_score > team1_score:
+            base_wins[j] += 1
+        if team1_score != team2_score:
+            margins.append(abs(team1_score - team2_score))
+    margin = float(np.mean(margins)) if margins else 0.0
+
+    # Current standings order, used as the last tie-break
+    standing = sorted(range(n), key=lambda i: (-base_wins[i], -base_diff[i]))
+    tie_rank = np.empty(n, dtype=np.int64)
+    tie_rank[standing] = np.arange(n)
+
+    remaining = pool['remaining']
+    m = len(remaining)
+    side1 = np.zeros((m, n), dtype=np.int64)
+    side2 = np.zeros((m, n), dtype=np.int64)
+    for k, (team1_id, team2_id) in enumerate(remaining):
+        side1[k, index[team1_id]] = 1
+        side2[k, index[team2_id]] = 1
+
+    if m <= EXACT_MAX_REMAINING and (1 << m) * n * n <= EXACT_MAX_CELLS:
+        method = 'exact'
+        # Row r is the outcome whose bit k says whether team1 wins remaining match k
+        team1_wins = (np.arange(1 << m)[:, None] >> np.arange(m)) & 1
+    else:
+        method = 'monte_carlo'
+        rng = np.random.default_rng(seed)
+        team1_wins = (rng.random((simulations, m)) < 0.5).astype(np.int64)
+
+    wins = base_wins + team1_wins @ side1 + (1 - team1_wins) @ side2
+    diff = base_diff + margin * ((2 * team1_wins - 1) @ (side1 - side2))
+    outcomes = wins.shape[0]
+
+    # Sort each outcome by wins, points difference, then current order (lexsort: last key first)
+    keys = np.stack([np.broadcast_to(tie_rank, wins.shape), -diff, -wins])
+    order = np.lexsort(keys, axis=-1)
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(n)[None, :].repeat(outcomes, axis=0), axis=-1)
+    probability = (position < qualifiers).mean(axis=0)
+
+    left_to_play = side1.sum(axis=0) + side2.sum(axis=0)
+    max_wins = base_wins + left_to_play
+    if method == 'exact':
+        # [outcome, i, j]: how team j compares with team i
+        above = (wins[:, None, :] > wins[:, :, None]).sum(axis=-1)
+        level = (wins[:, None, :] == wins[:, :, None]) & ~np.eye(n, dtype=bool)
+        # [i, j]: the tie-break between i and j is settled, and j wins it
+        settled = (left_to_play[:, None] == 0) & (left_to_play[None, :] == 0)
+        ahead = (base_diff[None, :] > base_diff[:, None]) | (
+            (base_diff[None, :] == base_diff[:, None]) & (tie_rank[None, :] < tie_rank[:, None])
+        )
+        most_ahead = above + (level & ~(settled & ~ahead)).sum(axis=-1)
+        least_ahead = above + (level & settled & ahead).sum(axis=-1)
+        guaranteed = (most_ahead < qualifiers).all(axis=0)
+        eliminated = (least_ahead >= qualifiers).all(axis=0)
+    else:
+        # Teams that can still reach a team's current wins / that are already out of its reach
+        can_catch = (max_wins[None, :] >= base_wins[:, None]).sum(axis=1) - 1
+        out_of_reach = (base_wins[None, :] > max_wins[:, None]).sum(axis=1)
+        guaranteed = can_catch < qualifiers
+        eliminated = out_of_reach >= qualifiers
+
+    results = []
+    for i in standing:
+        if guaranteed[i]:
+            status, team_probability = 'qualified', 1.0
+        elif eliminated[i]:
+            status, team_probability = 'eliminated', 0.0
+        else:
+            status, team_probability = 'alive', round(float(probability[i]), 4)
+        results.append({
+            'team_id': teams[i],
+            'matches_won': int(base_wins[i]),
+            'points_difference': int(base_diff[i]),
+            'max_wins': int(max_wins[i]),
+            'guaranteed': bool(guaranteed[i]),
+            'eliminated': bool(eliminated[i]),
+            'status': status,
+            'probability': team_probability
+        })
+
+    return results, method, outcomes
+
+@round_bp.route('/qualification/<int:tournament_id>', methods=['GET'])
+def get_qualification_scenarios(tournament_id):
+    """Who can still qualify: guaranteed, eliminated and probability per team for each pool"""
+    round_id = request.args.get('round_id', 1, type=int)
+    qualifiers = request.args.get('qualifiers', 2, type=int)  # Teams per pool that advance
+    simulations = request.args.get('simulations', DEFAULT_SIMULATIONS, type=int)
+
+    if qualifiers < 1:
+        return jsonify({'error': 'qualifiers must be at least 1'}), 400
+    if simulations < 1 or simulations > MAX_SIMULATIONS:
+        return jsonify({'error': f'simulations must be between 1 and {MAX_SIMULATIONS}'}), 400
+
+    try:
+        version = get_tournament_version(tournament_id)
+        cache_key = (tournament_id, round_id, qualifiers, simulations)
+        response = qualification_cache.get(cache_key, version)
+
+        if response is None:
+            pools, team_names = load_pool_results(tournament_id, round_id)
+            if not pools:
+                return jsonify({'error': f'No matches found for round {round_id}'}), 404
+
+            response = {
+                'tournament_id': tournament_id,
+                'round_id': round_id,
+                'qualifiers': qualifiers,
+                'pools': {}
+            }
+            for pool_name in sorted(pools.keys()):
+                pool = pools[pool_name]
+                results, method, outcomes = pool_outcomes(pool, qualifiers, simulations, seed=tournament_id)
+                for result in results:
+                    result['name'] = team_names.get(result['team_id'], 'Unknown')
+                response['pools'][pool_name] = {
+                    'method': method,
+                    'outcomes_evaluated': outcomes,
+                    'remaining_matches': len(pool['remaining']),
+                    'teams': results
+                }
+
+            qualification_cache.set(cache_key, version, response)
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        print(f"Error in get_qualification_scenarios: {str(e)}")
+        return jsonify({'error': str(e)}), 500
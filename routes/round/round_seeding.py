@@ -0,0 +1,313 @@
+from flask import request, jsonify
+from models import db, Match, Team
+from . import round_bp
+from .round_bracket import (
+    build_knockout_tree, add_third_place_match, build_plate_tree,
+    build_double_elimination_tree, resolve_tree_byes, persist_bracket
+)
+from .round_knockout import get_pool_standings
+
+MAX_SEEDED_TEAMS = 256
+
+def standard_seed_order(bracket_size):
+    """
+    Seeds in bracket slot order for a standard seeded draw (1 v 16, 8 v 9, ...).
+
+    Seed 1 and 2 can only meet in the final, seeds 1-4 not before the semi finals,
+    and so on.
+    """
+    order = [1]
+    while len(order) < bracket_size:
+        size = len(order) * 2
+        order = [seed for top in order for seed in (top, size + 1 - top)]
+    return order
+
+def meeting_round(slot_a, slot_b):
+    """Round (1 = first round) in which two bracket slots can meet"""
+    return (slot_a ^ slot_b).bit_length()
+
+def seed_bracket(seeded_team_ids, team_pools=None):
+    """
+    Place seeded teams into bracket slots.
+
+    The bracket is the next power of two; the missing entries are byes and go to
+    the top seeds. Seeds are placed tier by tier (1, 2, 3-4, 5-8, ...), and within a
+    tier each team takes the allowed slot that keeps it away from teams of its own
+    pool for as long as possible. Slots only swap with slots of the same kind (with
+    or without a bye), so byes stay with the top seeds.
+
+    Returns the list of first round (team1_id, team2_id) pairs, with None for a bye.
+    """
+    team_pools = team_pools or {}
+    num_teams = len(seeded_team_ids)
+    bracket_size = 1 << (num_teams - 1).bit_length()
+    order = standard_seed_order(bracket_size)
+    slot_of_seed = {seed: slot for slot, seed in enumerate(order)}
+
+    def has_bye(seed):
+        return bracket_size + 1 - seed > num_teams
+
+    slots = [None] * bracket_size
+    pool_slots = {}
+    tier_start = 1
+    while tier_start <= num_teams:
+        tier_end = 2 if tier_start == 1 else (tier_start - 1) * 2
+        tier_seeds = [seed for seed in range(tier_start, tier_end + 1) if seed <= num_teams]
+        free_slots = [slot_of_seed[seed] for seed in tier_seeds]
+
+        for seed in tier_seeds:
+            team_id = seeded_team_ids[seed - 1]
+            pool = team_pools.get(team_id)
+            candidates = [
+                slot for slot in free_slots
+                if has_bye(order[slot]) == has_bye(seed)
+            ]
+
+            def separation(slot):
+                placed = pool_slots.get(pool, []) if pool else []
+                earliest = min((meeting_round(slot, other) for other in placed), default=bracket_size)
+                # Prefer the latest possible meeting, then the standard slot order
+                return (earliest, -free_slots.index(slot))
+
+            slot = max(candidates, key=separation)
+            free_slots.remove(slot)
+            slots[slot] = team_id
+            if pool:
+                pool_slots.setdefault(pool, []).append(slot)
+
+        tier_start = tier_end + 1
+
+    return [(slots[i], slots[i + 1]) for i in range(0, bracket_size, 2)]
+
+def seeds_from_standings(tournament_id, round_id, teams_per_pool=None, num_teams=None):
+    """
+    Rank qualified teams from pool standings.
+
+    Pool winners come first, then runners-up and so on; within the same finishing
+    position teams are ordered by matches won, points difference and points scored.
+
+    Returns the seeded team IDs and a team -> pool mapping.
+    """
+    pool_standings = get_pool_standings(tournament_id, round_id)
+
+    def strength(item):
+        stats = item[1]
+        return (
+            stats['matches_won'],
+            stats['points_scored'] - stats['points_against'],
+            stats['points_scored']
+        )
+
+    by_position = {}
+    team_pools = {}
+    for pool, teams in pool_standings.items():
+        ranked = sorted(teams.items(), key=strength, reverse=True)
+        if teams_per_pool:
+            ranked = ranked[:teams_per_pool]
+        for position, item in enumerate(ranked):
+            by_position.setdefault(position, []).append(item)
+            team_pools[item[0]] = pool
+
+    seeded = []
+    for position in sorted(by_position.keys()):
+        seeded.extend(team_id for team_id, _ in sorted(by_position[position], key=strength, reverse=True))
+
+    if num_teams:
+        seeded = seeded[:num_teams]
+    return seeded, team_pools
+
+def load_seeded_teams(tournament_id, data):
+    """
+    Get the seeded team list for a bracket request.
+
+    Uses data['team_ids'] as the seeding order when given (pools are still looked up
+    for separation), otherwise ranks teams from the standings of
+    data['standings_round_id'], optionally limited by teams_per_pool / num_teams.
+
+    Returns (seeded_team_ids, team_pools, error message or None).
+    """
+    team_ids = data.get('team_ids')  # Optional explicit seeding order
+
+    if team_ids:
+        if len(set(team_ids)) != len(team_ids):
+            return None, None, 'Duplicate teams found in team_ids'
+
+        # Explicit order: pools still come from the teams for separation
+        team_pools = {
+            team.team_id: team.pool for team in Team.query.filter(
+                Team.team_id.in_(team_ids),
+                Team.tournament_id == tournament_id
+            ).all()
+        }
+        if len(team_pools) != len(team_ids):
+            return None, None, 'Some teams not found in tournament'
+        seeded_team_ids = team_ids
+    else:
+        seeded_team_ids, team_pools = seeds_from_standings(
+            tournament_id,
+            data.get('standings_round_id', data.get('current_round_id', 1)),
+            data.get('teams_per_pool'),
+            data.get('num_teams')
+        )
+
+    if len(seeded_team_ids) < 2 or len(seeded_team_ids) > MAX_SEEDED_TEAMS:
+        return None, None, f'Number of teams must be between 2 and {MAX_SEEDED_TEAMS}. Got {len(seeded_team_ids)} teams'
+
+    return seeded_team_ids, team_pools, None
+
+def seeds_payload(seeded_team_ids, team_pools, first_round_pairs):
+    """Seed list for the response: seed, team, pool and first round slot"""
+    slot_of_team = {
+        team_id: slot
+        for slot, team_id in enumerate(team_id for pair in first_round_pairs for team_id in pair)
+        if team_id is not None
+    }
+    return [
+        {
+            'seed': seed,
+            'team_id': team_id,
+            'pool': team_pools.get(team_id),
+            'slot': slot_of_team[team_id]
+        }
+        for seed, team_id in enumerate(seeded_team_ids, start=1)
+    ]
+
+def knockout_exists(tournament_id):
+    return Match.query.filter_by(
+        tournament_id=tournament_id,
+        pool="knockout"
+    ).first() is not None
+
+@round_bp.route('/knockout-seeded', methods=['POST', 'OPTIONS'])
+def create_seeded_knockout():
+    """Create a seeded knockout bracket for any number of teams, with byes for top seeds"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    tournament_id = data.get('tournament_id')
+    current_round_id = data.get('current_round_id', 1)  # The round ID after which knockout starts
+    third_place = data.get('third_place_match', False)
+    plate = data.get('plate', False)
+
+    if not tournament_id:
+        return jsonify({'error': 'tournament_id is required'}), 400
+
+    # Check if knockout bracket already exists
+    if knockout_exists(tournament_id):
+        return jsonify({
+            'error': 'Knockout bracket already exists for this tournament. Delete it first.'
+        }), 400
+
+    try:
+        seeded_team_ids, team_pools, error = load_seeded_teams(tournament_id, data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        first_round_pairs = seed_bracket(seeded_team_ids, team_pools)
+
+        # Build the whole bracket (and optional extra matches) in memory
+        starting_round_id = current_round_id + 1
+        tree = build_knockout_tree(first_round_pairs, starting_round_id)
+        nodes = tree['nodes']
+        round_rows = tree['rounds']
+
+        if third_place:
+            if tree['total_rounds'] < 2:
+                return jsonify({'error': 'A 3rd place match needs at least 3 teams'}), 400
+            add_third_place_match(tree)
+
+        if plate:
+            if len(first_round_pairs) < 2:
+                return jsonify({'error': 'A plate bracket needs at least 3 teams'}), 400
+            if third_place and tree['total_rounds'] == 2:
+                # The first round is the semi finals, whose losers already play the 3rd place match
+                return jsonify({'error': 'A plate bracket and a 3rd place match need at least 5 teams'}), 400
+            plate_tree = build_plate_tree(tree)
+            nodes = nodes + plate_tree['nodes']
+            round_rows = round_rows + plate_tree['rounds']
+
+        # Byes are completed before anything is written
+        resolve_tree_byes(nodes)
+        match_details = persist_bracket(tournament_id, nodes, round_rows)
+
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Seeded knockout bracket created successfully',
+            'matches_created': len(match_details),
+            'rounds_created': len(round_rows),
+            'starting_round': starting_round_id,
+            'total_rounds': tree['total_rounds'],
+            'bracket_size': tree['num_teams'],
+            'byes': tree['num_teams'] - len(seeded_team_ids),
+            'seeds': seeds_payload(seeded_team_ids, team_pools, first_round_pairs),
+            'matches': match_details
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in create_seeded_knockout: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@round_bp.route('/knockout-double-elimination', methods=['POST', 'OPTIONS'])
+def create_double_elimination():
+    """Create a seeded double-elimination draw (winners bracket, losers bracket, grand final)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    tournament_id = data.get('tournament_id')
+    current_round_id = data.get('current_round_id', 1)  # The round ID after which knockout starts
+
+    if not tournament_id:
+        return jsonify({'error': 'tournament_id is required'}), 400
+
+    # Check if knockout bracket already exists
+    if knockout_exists(tournament_id):
+        return jsonify({
+            'error': 'Knockout bracket already exists for this tournament. Delete it first.'
+        }), 400
+
+    try:
+        seeded_team_ids, team_pools, error = load_seeded_teams(tournament_id, data)
+        if error:
+            return jsonify({'error': error}), 400
+        if len(seeded_team_ids) < 3:
+            return jsonify({'error': 'Double elimination needs at least 3 teams'}), 400
+
+        first_round_pairs = seed_bracket(seeded_team_ids, team_pools)
+
+        # Build winners bracket, losers bracket and grand final in memory
+        starting_round_id = current_round_id + 1
+        tree = build_double_elimination_tree(first_round_pairs, starting_round_id)
+
+        # Byes (and the empty losers bracket slots they leave) are completed before anything is written
+        resolve_tree_byes(tree['nodes'])
+        match_details = persist_bracket(tournament_id, tree['nodes'], tree['rounds'])
+
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Double elimination bracket created successfully',
+            'matches_created': len(match_details),
+            'rounds_created': len(tree['rounds']),
+            'starting_round': starting_round_id,
+            'winners_rounds': tree['total_rounds'],
+            'losers_rounds': tree['losers_rounds'],
+            'bracket_size': tree['num_teams'],
+            'byes': tree['num_teams'] - len(seeded_team_ids),
+            'seeds': seeds_payload(seeded_team_ids, team_pools, first_round_pairs),
+            'matches': match_details
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in create_double_elimination: {str(e)}")
+        return jsonify({'error': str(e)}), 500
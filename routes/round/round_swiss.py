@@ -0,0 +1,189 @@
+from models import Match, Score, Round, Team
+
+SWISS_POOL = "swiss"
+
+# Upper bound on pairing attempts before rematches are allowed as a last resort
+PAIRING_STEP_LIMIT = 200000
+
+def get_swiss_records(tournament_id):
+    """
+    Build every team's Swiss record from the matches already played in the Swiss pool.
+
+    Returns {team_id: record} with wins, points, opponents, side balance and byes,
+    plus the number of Swiss rounds played so far.
+    """
+    matches = Match.query.filter_by(
+        tournament_id=tournament_id,
+        pool=SWISS_POOL
+    ).all()
+
+    scores = {}
+    if matches:
+        for score in Score.query.filter(Score.match_id.in_([match.id for match in matches])).all():
+            scores[(score.match_id, score.team_id)] = score.score
+
+    records = {}
+
+    def record(team_id):
+        if team_id not in records:
+            records[team_id] = {
+                'wins': 0,
+                'points_scored': 0,
+                'points_against': 0,
+                'opponents': set(),
+                'side_balance': 0,  # times as team1 minus times as team2
+                'had_bye': False
+            }
+        return records[team_id]
+
+    rounds_played = set()
+    for match in matches:
+        rounds_played.add(match.round_number)
+
+        if match.team2_id is None:
+            # Bye: counts as a win
+            bye_record = record(match.team1_id)
+            bye_record['wins'] += 1
+            bye_record['had_bye'] = True
+            continue
+
+        team1, team2 = record(match.team1_id), record(match.team2_id)
+        team1['opponents'].add(match.team2_id)
+        team2['opponents'].add(match.team1_id)
+        team1['side_balance'] += 1
+        team2['side_balance'] -= 1
+
+        team1_score = scores.get((match.id, match.team1_id), 0)
+        team2_score = scores.get((match.id, match.team2_id), 0)
+        team1['points_scored'] += team1_score
+        team1['points_against'] += team2_score
+        team2['points_scored'] += team2_score
+        team2['points_against'] += team1_score
+
+        winner = match.winner_team_id
+        if not winner and team1_score != team2_score:
+            winner = match.team1_id if team1_score > team2_score else match.team2_id
+        if winner in (match.team1_id, match.team2_id):
+            record(winner)['wins'] += 1
+
+    return records, len(rounds_played)
+
+def pair_swiss_round(ranked_team_ids, records):
+    """
+    Pair one Swiss round.
+
+    ranked_team_ids is ordered best first. If the field is odd, the lowest ranked
+    team that has not had a bye sits out. Teams are then paired top-down: each
+    unpaired team takes the highest ranked team it has not met, so equal records
+    meet first and the rest float down a score group. When a choice leaves the rest
+    of the field unpairable the search backtracks. Sides are balanced by giving
+    team1 to whoever has played it less.
+
+    Returns (pairs, bye_team_id).
+    """
+    teams = list(ranked_team_ids)
+    bye_team_id = None
+
+    if len(teams) % 2 == 1:
+        without_bye = [team_id for team_id in teams if not records.get(team_id, {}).get('had_bye')]
+        bye_team_id = (without_bye or teams)[-1]
+        teams.remove(bye_team_id)
+
+    def opponents(team_id):
+        return records.get(team_id, {}).get('opponents', set())
+
+    def search(allow_rematches):
+        # Iterative depth-first search over "first unpaired team takes candidate i"
+        unpaired = list(teams)
+        stack = []
+        choice = 0
+        steps = 0
+        while unpaired:
+            steps += 1
+            if steps > PAIRING_STEP_LIMIT:
+                return None
+            top = unpaired[0]
+            candidates = [
+                team_id for team_id in unpaired[1:]
+                if allow_rematches or team_id not in opponents(top)
+            ]
+            if choice < len(candidates):
+                opponent = candidates[choice]
+                stack.append((top, opponent, choice, unpaired))
+                unpaired = [team_id for team_id in unpaired[1:] if team_id != opponent]
+                choice = 0
+            else:
+                if not stack:
+                    return None
+                _, _, last_choice, unpaired = stack.pop()
+                choice = last_choice + 1
+        return [(top, opponent) for top, opponent, _, _ in stack]
+
+    pairs = search(allow_rematches=False)
+    if pairs is None:
+        pairs = search(allow_rematches=True) or []
+
+    balanced = []
+    for higher, lower in pairs:
+        higher_balance = records.get(higher, {}).get('side_balance', 0)
+        lower_balance = records.get(lower, {}).get('side_balance', 0)
+        if lower_balance < higher_balance:
+            balanced.append((lower, higher))
+        else:
+            balanced.append((higher, lower))
+
+    return balanced, bye_team_id
+
+def plan_swiss_round(tournament_id, round_id, round_data, teams_to_promote=None):
+    """
+    Work out the next Swiss round in memory.
+
+    The first Swiss round seeds the field from the standings of the round being
+    completed (round_data, optionally cut to teams_to_promote), or from the teams
+    entered in round_id when it has no results yet. Later rounds rank the Swiss
+    field by wins, points difference and points scored.
+
+    Returns a dict with the pairings as team dicts (team_id, name), the bye team and the Swiss
+    round number.
+    """
+    records, rounds_played = get_swiss_records(tournament_id)
+
+    if rounds_played == 0:
+        if round_data and round_data['pools']:
+            standings = [team for pool_standings in round_data['pools'].values() for team in pool_standings]
+            standings.sort(key=lambda x: (x['total_scores'], x['points_difference']), reverse=True)
+            ranked_team_ids = [team['team_id'] for team in standings]
+        else:
+            # Open field with no results yet: everyone entered in the round, in entry order
+            entries = Round.query.filter_by(
+                tournament_id=tournament_id,
+                round_id=round_id
+            ).order_by(Round.id).all()
+            ranked_team_ids = list(dict.fromkeys(entry.team_id for entry in entries))
+        if teams_to_promote:
+            ranked_team_ids = ranked_team_ids[:teams_to_promote]
+    else:
+        ranked_team_ids = sorted(
+            records.keys(),
+            key=lambda team_id: (
+                records[team_id]['wins'],
+                records[team_id]['points_scored'] - records[team_id]['points_against'],
+                records[team_id]['points_scored']
+            ),
+            reverse=True
+        )
+
+    pairs, bye_team_id = pair_swiss_round(ranked_team_ids, records)
+
+    teams = {
+        team.team_id: {'team_id': team.team_id, 'name': team.name} for team in Team.query.filter(
+            Team.team_id.in_(ranked_team_ids),
+            Team.tournament_id == tournament_id
+        ).all()
+    } if ranked_team_ids else {}
+
+    return {
+        'matches': [(teams[team1_id], teams[team2_id]) for team1_id, team2_id in pairs],
+        'bye_team': teams.get(bye_team_id),
+        'round_number': rounds_played + 1
+    }
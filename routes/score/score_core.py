@@ -4,43 +4,9 @@ from models import Score, Match, db, Player, Team
 from . import score_bp
 from socket_instance import socketio
 from flask_cors import cross_origin
-
-def update_successor_match(successor_match_id, current_match_id, winning_team_id):
-    """Updates the successor match with the winning team"""
-    try:
-        successor_match = Match.query.get(successor_match_id)
-        if not successor_match:
-            return
-        
-        # Determine which predecessor this match is and update corresponding team
-        if successor_match.predecessor_1 == current_match_id:
-            successor_match.team1_id = winning_team_id
-        elif successor_match.predecessor_2 == current_match_id:
-            successor_match.team2_id = winning_team_id
-            
-        # If both teams are set, create score entries
-        if successor_match.team1_id and successor_match.team2_id:
-            scores = [
-                Score(
-                    match_id=str(successor_match.id),
-                    team_id=successor_match.team1_id,
-                    score=0,
-                    tournament_id=successor_match.tournament_id
-                ),
-                Score(
-                    match_id=str(successor_match.id),
-                    team_id=successor_match.team2_id,
-                    score=0,
-                    tournament_id=successor_match.tournament_id
-                )
-            ]
-            db.session.bulk_save_objects(scores)
-            
-        db.session.commit()
-        
-    except Exception as e:
-        db.session.rollback()
-        raise e 
+from .score_progression import progress_bracket, bracket_node_payload
+from ratings import update_match_ratings, revert_match_ratings
+from leaderboards import update_tournament_completion
 
 @score_bp.route('/update-score', methods=['POST'])
 def update_score():
@@ -110,6 +76,8 @@ def update_score():
         else:
             team2_score_record.score = team2_score
 
+        bracket_changes = []
+
         # Update match final status and winner if final is True
         if final:
             match.is_final = True
@@ -135,8 +103,23 @@ def update_score():
                     match.winner_team_id = None  # Draw
                 print(f"Match finalized with winner_team_id: {match.winner_team_id}")
 
-            if match.successor:
-                update_successor_match(match.successor, match.id, match.winner_team_id)
+            if match.successor or match.loser_successor:
+                # Walk the result up the bracket (byes, corrections) in this same transaction
+                bracket_changes = progress_bracket(match)
+                # Downstream results a corrected winner wiped out leave the ratings too
+                revert_match_ratings([node for node in bracket_changes if not node.is_final])
+
+            # Player ratings move with the result in this same transaction
+            update_match_ratings(match)
+        elif override and match.is_final:
+            # Re-opening a finished match invalidates everything it fed
+            match.is_final = False
+            bracket_changes = progress_bracket(match, revert=True)
+            revert_match_ratings([match] + [node for node in bracket_changes if not node.is_final])
+
+        if final or override:
+            # Finishing positions (and the season leaderboards) follow once the tournament is complete
+            update_tournament_completion(match.tournament_id)
         
         # Commit all changes
         db.session.commit()
@@ -155,6 +138,13 @@ def update_score():
 
         # Emit WebSocket event with the updated scores
         socketio.emit('score_update', response, namespace='/scores')
+
+        # One batched event for every bracket node the result touched
+        if bracket_changes:
+            socketio.emit('bracket_update', {
+                'tournament_id': tournament_id,
+                'matches': [bracket_node_payload(node) for node in bracket_changes]
+            }, namespace='/scores')
         
         print(f"\nSending response: {response}")
         return jsonify(response), 200
@@ -0,0 +1,192 @@
+from models import Match, Score, MatchOutcome, db
+from routes.round.round_bracket import BRACKET_POOLS
+
+# Slot values that are not a team: None is an empty slot (bye), "TBD" waits on a result
+UNDECIDED = "TBD"
+
+def is_real_team(team_id):
+    return team_id is not None and team_id != UNDECIDED
+
+def result_for_successor(node):
+    """What a match sends up the bracket: its winner, an empty slot, or still TBD"""
+    if node.is_final and is_real_team(node.winner_team_id):
+        return node.winner_team_id
+    if node.is_final and node.outcome == MatchOutcome.BYE and node.winner_team_id is None:
+        return None
+    return UNDECIDED
+
+def loser_for_successor(node):
+    """What a match sends down its loser route: the beaten team, an empty slot, or still TBD"""
+    if node.is_final and node.outcome == MatchOutcome.BYE:
+        return None
+    if node.is_final and is_real_team(node.winner_team_id):
+        return node.team2_id if node.winner_team_id == node.team1_id else node.team1_id
+    return UNDECIDED
+
+def loser_targets(nodes, node):
+    """The match the loser of node drops into (losers bracket, 3rd place, plate), if any"""
+    target = nodes.get(node.loser_successor)
+    return [target] if target is not None else []
+
+def set_slot(nodes, node, predecessor_id, value, changed):
+    """Put value into the slot of node fed by predecessor_id and follow the consequences"""
+    if node.predecessor_1 == predecessor_id:
+        slot = 'team1_id'
+    elif node.predecessor_2 == predecessor_id:
+        slot = 'team2_id'
+    else:
+        return
+
+    if getattr(node, slot) == value:
+        return
+
+    # Different participants make any existing result meaningless
+    if node.is_final or node.winner_team_id:
+        reset_match(nodes, node, changed)
+
+    setattr(node, slot, value)
+    changed.add(node.id)
+    resolve_match(nodes, node, changed)
+
+def reset_match(nodes, node, changed):
+    """Clear a match result and pull its old result back out of the successor"""
+    node.is_final = False
+    node.winner_team_id = None
+    node.status = 'pending'
+    node.outcome = MatchOutcome.NORMAL.value
+    changed.add(node.id)
+
+    successor = nodes.get(node.successor)
+    if successor is not None:
+        set_slot(nodes, successor, node.id, UNDECIDED, changed)
+    for target in loser_targets(nodes, node):
+        set_slot(nodes, target, node.id, UNDECIDED, changed)
+
+def resolve_match(nodes, node, changed):
+    """Complete a match automatically when a side is empty (a bye)"""
+    if node.is_final:
+        return
+
+    team1_id, team2_id = node.team1_id, node.team2_id
+    if team1_id is None and team2_id is None:
+        winner_team_id = None
+    elif team1_id is None and is_real_team(team2_id):
+        winner_team_id = team2_id
+    elif team2_id is None and is_real_team(team1_id):
+        winner_team_id = team1_id
+    else:
+        return
+
+    node.is_final = True
+    node.winner_team_id = winner_team_id
+    node.status = 'completed'
+    node.outcome = MatchOutcome.BYE.value
+    changed.add(node.id)
+    advance_match(nodes, node, changed)
+
+def advance_match(nodes, node, changed):
+    """Send the result of node into its successor and its loser into any loser route"""
+    successor = nodes.get(node.successor)
+    if successor is not None:
+        set_slot(nodes, successor, node.id, result_for_successor(node), changed)
+    for target in loser_targets(nodes, node):
+        set_slot(nodes, target, node.id, loser_for_successor(node), changed)
+
+def apply_match_result(nodes, match_id):
+    """
+    Walk a finished (or corrected) result up the successor chain in memory.
+
+    nodes maps match ID to match-like objects (team1_id, team2_id, predecessor_1,
+    predecessor_2, successor, loser_successor, is_final, winner_team_id, status,
+    outcome). Losers are routed through loser_successor in the same pass. Byes met
+    on the way are completed automatically, and a changed winner wipes every
+    downstream result it invalidates.
+
+    Returns the set of match IDs whose state changed.
+    """
+    changed = {match_id}
+    advance_match(nodes, nodes[match_id], changed)
+    return changed
+
+def revert_match_result(nodes, match_id):
+    """Clear the result of a match and invalidate everything it fed. Returns changed IDs"""
+    changed = set()
+    reset_match(nodes, nodes[match_id], changed)
+    return changed
+
+def resolve_byes(nodes):
+    """Complete every bye in the bracket, lowest rounds first. Returns changed IDs"""
+    changed = set()
+    for node in sorted(nodes.values(), key=lambda n: (n.round_number or 0, n.id)):
+        resolve_match(nodes, node, changed)
+    return changed
+
+def load_bracket(tournament_id):
+    """Load every bracket match and its scores with one query each"""
+    matches = Match.query.filter(
+        Match.tournament_id == tournament_id,
+        Match.pool.in_(BRACKET_POOLS)
+    ).all()
+    nodes = {match.id: match for match in matches}
+
+    scores_by_match = {}
+    if nodes:
+        for score in Score.query.filter(Score.match_id.in_(list(nodes.keys()))).all():
+            scores_by_match.setdefault(score.match_id, []).append(score)
+
+    return nodes, scores_by_match
+
+def sync_bracket_scores(nodes, scores_by_match, changed, tournament_id, skip_match_id=None):
+    """Give every changed match fresh 0-0 scores for its current teams (none for byes)"""
+    new_scores = []
+    for match_id in changed:
+        if match_id == skip_match_id:
+            continue
+        node = nodes[match_id]
+
+        for score in scores_by_match.pop(match_id, []):
+            db.session.delete(score)
+
+        if is_real_team(node.team1_id) and is_real_team(node.team2_id):
+            new_scores.extend([
+                Score(match_id=match_id, team_id=node.team1_id, score=0, tournament_id=tournament_id),
+                Score(match_id=match_id, team_id=node.team2_id, score=0, tournament_id=tournament_id)
+            ])
+
+    if new_scores:
+        db.session.add_all(new_scores)
+
+def progress_bracket(match, revert=False):
+    """
+    Apply a match result (or its reversal) to the whole bracket in the current session.
+
+    Loads the bracket once, runs the progression in memory and stages every match
+    and score change. Nothing is committed here.
+
+    Returns the changed bracket matches (including match itself).
+    """
+    nodes, scores_by_match = load_bracket(match.tournament_id)
+    if match.id not in nodes:
+        nodes[match.id] = match
+
+    if revert:
+        changed = revert_match_result(nodes, match.id)
+    else:
+        changed = apply_match_result(nodes, match.id)
+
+    # The origin match keeps the scores that were just entered
+    sync_bracket_scores(nodes, scores_by_match, changed, match.tournament_id, skip_match_id=match.id)
+
+    return [nodes[match_id] for match_id in sorted(changed)]
+
+def bracket_node_payload(match):
+    """Socket payload for one bracket node"""
+    return {
+        'match_id': match.id,
+        'team1_id': match.team1_id,
+        'team2_id': match.team2_id,
+        'winner_team_id': match.winner_team_id,
+        'is_final': match.is_final,
+        'status': match.status,
+        'outcome': match.outcome
+    }
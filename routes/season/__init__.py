@@ -2,4 +2,6 @@ from flask import Blueprint
 season_bp = Blueprint('season', __name__)
 
 # Import views after creating blueprint
-from .season_core import * 
\ No newline at end of file
+from .season_core import *
+from .season_leaderboard import *
+from .season_tournaments import *
\ No newline at end of file
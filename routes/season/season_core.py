@@ -1,20 +1,28 @@
 from flask import Blueprint, request, jsonify
 from models import db, Season, SuperTournament
+from hierarchy import get_or_build, invalidate_hierarchy
 
 season_bp = Blueprint('season', __name__)
 
+def build_all_seasons():
+    """Every season with its super tournament name, read in one joined query"""
+    seasons = db.session.query(
+        Season.id, Season.name, Season.super_tournament_id, SuperTournament.name.label('super_tournament_name')
+    ).join(SuperTournament, Season.super_tournament_id == SuperTournament.id).order_by(Season.id).all()
+    return {
+        'seasons': [{
+            'id': s.id,
+            'name': s.name,
+            'super_tournament_id': s.super_tournament_id,
+            'super_tournament_name': s.super_tournament_name
+        } for s in seasons]
+    }
+
 @season_bp.route('/seasons', methods=['GET'])
 def get_all_seasons():
     try:
-        seasons = Season.query.all()
-        return jsonify({
-            'seasons': [{
-                'id': s.id,
-                'name': s.name,
-                'super_tournament_id': s.super_tournament_id,
-                'super_tournament_name': s.super_tournament.name
-            } for s in seasons]
-        }), 200
+        response_data = get_or_build(('seasons',), build_all_seasons)
+        return jsonify(response_data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -38,6 +46,7 @@ def create_season():
     try:
         db.session.add(season)
         db.session.commit()
+        invalidate_hierarchy()
         return jsonify({
             "message": "Season created successfully",
             "season_id": season.id,
@@ -71,6 +80,7 @@ def create_season_in_super_tournament(super_tournament_id):
     try:
         db.session.add(season)
         db.session.commit()
+        invalidate_hierarchy()
         return jsonify({
             "message": "Season created successfully",
             "season_id": season.id,
@@ -0,0 +1,25 @@
+from flask import request, jsonify
+from models import Season
+from leaderboards import get_leaderboard
+from .season_core import season_bp
+
+@season_bp.route('/seasons/<int:season_id>/leaderboard', methods=['GET'])
+def get_season_leaderboard(season_id):
+    """Season leaderboard of players or teams by ranking points across its tournaments"""
+    entity_type = request.args.get('type', 'player')  # 'player' or 'team'
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    if entity_type not in ('player', 'team'):
+        return jsonify({"error": "type must be 'player' or 'team'"}), 400
+
+    try:
+        season = Season.query.get_or_404(season_id)
+        return jsonify({
+            'season_id': season_id,
+            'season_name': season.name,
+            'type': entity_type,
+            'leaderboard': get_leaderboard('season', season_id, entity_type, limit, offset)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,22 +1,31 @@
 from flask import request, jsonify
 from models import Season, Tournament, db
-from . import season_bp
+from hierarchy import get_or_build
+from .season_core import season_bp
+
+def build_season_tournaments(season_id):
+    """A season's tournaments, or None if the season doesn't exist"""
+    season = Season.query.filter_by(id=season_id).first()
+    if not season:
+        return None
+    tournaments = Tournament.query.filter_by(season_id=season_id).all()
+    return {
+        'season_id': season_id,
+        'season_name': season.name,
+        'tournaments': [{
+            'id': t.id,
+            'name': t.tournament_name,
+            'type': t.type,
+            'num_courts': t.num_courts
+        } for t in tournaments]
+    }
 
 @season_bp.route('/seasons/<int:season_id>/tournaments', methods=['GET'])
 def get_season_tournaments(season_id):
     try:
-        season = Season.query.get_or_404(season_id)
-        tournaments = Tournament.query.filter_by(season_id=season_id).all()
-        
-        return jsonify({
-            'season_id': season_id,
-            'season_name': season.name,
-            'tournaments': [{
-                'id': t.id,
-                'name': t.tournament_name,
-                'type': t.type,
-                'num_courts': t.num_courts
-            } for t in tournaments]
-        }), 200
+        response_data = get_or_build(('season_tournaments', season_id), lambda: build_season_tournaments(season_id))
+        if response_data is None:
+            return jsonify({"error": "Season not found"}), 404
+        return jsonify(response_data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500 
\ No newline at end of file
@@ -2,4 +2,5 @@ from flask import Blueprint
 super_tournament_bp = Blueprint('super_tournament', __name__)
 
 # Import views after creating blueprint
-from .super_tournament_core import * 
\ No newline at end of file
+from .super_tournament_core import *
+from .super_tournament_leaderboard import *
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from models import db, SuperTournament, Season, Tournament
 from sqlalchemy.orm import joinedload
+from hierarchy import get_or_build, invalidate_hierarchy
 
 super_tournament_bp = Blueprint('super_tournament', __name__)
 
@@ -42,6 +43,7 @@ def create_super_tournament():
             created_seasons.append(season)
         
         db.session.commit()
+        invalidate_hierarchy()
         
         return jsonify({
             "message": "Super tournament created successfully",
@@ -63,52 +65,64 @@ def create_super_tournament():
 @super_tournament_bp.route('/super-tournaments/<int:super_tournament_id>', methods=['GET'])
 def get_super_tournament_details(super_tournament_id):
     try:
-        # Query with eager loading of relationships
-        super_tournament = SuperTournament.query.options(
-            joinedload(SuperTournament.seasons).joinedload(Season.tournaments)
-        ).get_or_404(super_tournament_id)
+        response_data = get_or_build(
+            ('super_tournament', super_tournament_id),
+            lambda: build_super_tournament_details(super_tournament_id)
+        )
+        if response_data is None:
+            return jsonify({"error": "Super tournament not found"}), 404
+        return jsonify(response_data), 200
         
-        # Build response data
-        response_data = {
-            'id': super_tournament.id,
-            'name': super_tournament.name,
-            'description': super_tournament.description,
-            'seasons': []
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500 
+
+def build_super_tournament_details(super_tournament_id):
+    """Super tournament with its seasons and their tournaments, or None if it doesn't exist"""
+    # Query with eager loading of relationships
+    super_tournament = SuperTournament.query.options(
+        joinedload(SuperTournament.seasons).joinedload(Season.tournaments)
+    ).filter_by(id=super_tournament_id).first()
+    if not super_tournament:
+        return None
+    
+    # Build response data
+    response_data = {
+        'id': super_tournament.id,
+        'name': super_tournament.name,
+        'description': super_tournament.description,
+        'seasons': []
+    }
+    
+    for season in super_tournament.seasons:
+        season_data = {
+            'id': season.id,
+            'name': season.name,
+            'tournaments': []
         }
         
-        for season in super_tournament.seasons:
-            season_data = {
-                'id': season.id,
-                'name': season.name,
-                'tournaments': []
+        for tournament in season.tournaments:
+            tournament_data = {
+                'id': tournament.id,
+                'name': tournament.tournament_name,
+                'type': tournament.type,
+                'num_courts': tournament.num_courts
             }
+            season_data['tournaments'].append(tournament_data)
             
-            for tournament in season.tournaments:
-                tournament_data = {
-                    'id': tournament.id,
-                    'name': tournament.tournament_name,
-                    'type': tournament.type,
-                    'num_courts': tournament.num_courts
-                }
-                season_data['tournaments'].append(tournament_data)
-                
-            response_data['seasons'].append(season_data)
-            
-        return jsonify(response_data), 200
+        response_data['seasons'].append(season_data)
         
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500 
+    return response_data
 
 @super_tournament_bp.route('/super-tournaments', methods=['GET'])
 def get_all_super_tournaments():
     try:
-        super_tournaments = SuperTournament.query.all()
-        return jsonify({
+        response_data = get_or_build(('super_tournaments',), lambda: {
             'super_tournaments': [{
                 'id': st.id,
                 'name': st.name,
                 'description': st.description
-            } for st in super_tournaments]
-        }), 200
+            } for st in SuperTournament.query.all()]
+        })
+        return jsonify(response_data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500 
\ No newline at end of file
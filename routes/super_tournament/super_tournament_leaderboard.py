@@ -0,0 +1,25 @@
+from flask import request, jsonify
+from models import SuperTournament
+from leaderboards import get_leaderboard
+from .super_tournament_core import super_tournament_bp
+
+@super_tournament_bp.route('/super-tournaments/<int:super_tournament_id>/leaderboard', methods=['GET'])
+def get_super_tournament_leaderboard(super_tournament_id):
+    """Leaderboard of players or teams by ranking points across every season"""
+    entity_type = request.args.get('type', 'player')  # 'player' or 'team'
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    if entity_type not in ('player', 'team'):
+        return jsonify({"error": "type must be 'player' or 'team'"}), 400
+
+    try:
+        super_tournament = SuperTournament.query.get_or_404(super_tournament_id)
+        return jsonify({
+            'super_tournament_id': super_tournament_id,
+            'super_tournament_name': super_tournament.name,
+            'type': entity_type,
+            'leaderboard': get_leaderboard('super_tournament', super_tournament_id, entity_type, limit, offset)
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,7 +1,12 @@
 from flask import request, jsonify
 from models import Team, Player, Tournament, SuperTournament, Season, db
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, case, select, true, false
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql import func
+from cache import VersionedCache, get_player_version
+from socket_instance import socketio
+from utils import normalize_name
+from player_search import search_players, DEFAULT_LIMIT, MAX_LIMIT
 from . import team_bp
 
 @team_bp.route('/teams/checkin', methods=['POST'])
@@ -64,6 +69,104 @@ def team_checkin():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Largest queue of players one batch check-in request takes
+MAX_BATCH_CHECKIN = 500
+
+def team_checked_in_expression():
+    """
+    SQL value of a team's check-in state: every player on it is checked in.
+
+    Read from both player rows with correlated subqueries, so one UPDATE recomputes
+    any number of teams. An empty slot (or a player that no longer exists) counts
+    as checked in.
+    """
+    Player1 = aliased(Player)
+    Player2 = aliased(Player)
+    player1_checked_in = select(func.coalesce(Player1.checked_in, false())).where(
+        Player1.uuid == Team.player1_uuid
+    ).scalar_subquery()
+    player2_checked_in = select(func.coalesce(Player2.checked_in, false())).where(
+        Player2.uuid == Team.player2_uuid
+    ).scalar_subquery()
+    return and_(func.coalesce(player1_checked_in, true()), func.coalesce(player2_checked_in, true()))
+
+def checkin_players(super_tournament_id, player_uuids, checked_in):
+    """
+    Check players in (or out) across a super tournament with set-based statements.
+
+    One UPDATE sets the players' checked_in and one more recomputes checked_in for
+    every team they play on in the super tournament's tournaments; the teams are read
+    before and after to tell which ones changed. The statement count does not depend
+    on the number of players or tournaments. Nothing is committed here.
+
+    Returns the affected teams (team_id, name, checked_in, tournament_id,
+    tournament_name) and the IDs of the teams whose check-in state changed.
+    """
+    tournament_ids = select(Tournament.id).join(
+        Season, Tournament.season_id == Season.id
+    ).where(Season.super_tournament_id == super_tournament_id)
+    team_filter = and_(
+        or_(Team.player1_uuid.in_(player_uuids), Team.player2_uuid.in_(player_uuids)),
+        Team.tournament_id.in_(tournament_ids)
+    )
+
+    before = dict(db.session.query(Team.team_id, Team.checked_in).filter(team_filter).all())
+
+    Player.query.filter(
+        Player.uuid.in_(player_uuids),
+        Player.super_tournament_id == super_tournament_id
+    ).update({Player.checked_in: checked_in}, synchronize_session=False)
+
+    Team.query.filter(team_filter).update(
+        {Team.checked_in: team_checked_in_expression()},
+        synchronize_session=False
+    )
+
+    # Objects already in the session still hold the old values
+    db.session.expire_all()
+
+    teams = db.session.query(
+        Team.team_id,
+        Team.name,
+        Team.checked_in,
+        Team.tournament_id,
+        Tournament.tournament_name
+    ).join(
+        Tournament, Team.tournament_id == Tournament.id
+    ).filter(team_filter).order_by(Tournament.id, Team.team_id).all()
+
+    changed = [team.team_id for team in teams if bool(before.get(team.team_id)) != bool(team.checked_in)]
+    return teams, changed
+
+def emit_checkin_update(super_tournament_id, teams, changed):
+    """Broadcast the teams whose check-in state changed, in one socket event"""
+    changed = set(changed)
+    if not changed:
+        return
+    socketio.emit('checkin_update', {
+        'super_tournament_id': super_tournament_id,
+        'teams': [
+            {
+                'team_id': team.team_id,
+                'tournament_id': team.tournament_id,
+                'checked_in': bool(team.checked_in)
+            }
+            for team in teams if team.team_id in changed
+        ]
+    }, namespace='/scores')
+
+def updated_tournament_entries(teams):
+    return [{
+        'tournament_id': team.tournament_id,
+        'tournament_name': team.tournament_name,
+        'team': {
+            'team_id': team.team_id,
+            'name': team.name,
+            'checked_in': bool(team.checked_in),
+            'all_players_checked_in': bool(team.checked_in)
+        }
+    } for team in teams]
+
 @team_bp.route('/player/checkin', methods=['POST'])
 def player_checkin():
     try:
@@ -80,53 +183,15 @@ def player_checkin():
         if not player:
             return jsonify({'error': 'Player not found'}), 404
             
-        # Update player's check-in status for the entire super tournament
-        player.checked_in = checked_in
-        
-        # Get all tournaments in this super tournament through seasons
         super_tournament = SuperTournament.query.get(player.super_tournament_id)
         if not super_tournament:
             return jsonify({'error': 'Super tournament not found'}), 404
-            
-        tournaments = []
-        for season in super_tournament.seasons:
-            tournaments.extend(season.tournaments)
-            
-        # Update team statuses in all tournaments
-        updated_teams = []
-        for tournament in tournaments:
-            # Find team in this tournament where player is either player1 or player2
-            team = Team.query.filter(
-                (Team.player1_uuid == player.uuid) | (Team.player2_uuid == player.uuid),
-                Team.tournament_id == tournament.id
-            ).first()
-            
-            if team:
-                # Get the other player in the team
-                other_player = None
-                if team.player1_uuid == player.uuid and team.player2_uuid:
-                    other_player = Player.query.filter_by(uuid=team.player2_uuid).first()
-                elif team.player2_uuid == player.uuid and team.player1_uuid:
-                    other_player = Player.query.filter_by(uuid=team.player1_uuid).first()
-                
-                # Check if all players in the team are checked in
-                all_players_checked_in = player.checked_in and (not other_player or other_player.checked_in)
-                
-                # Update team check-in status
-                team.checked_in = all_players_checked_in
-                
-                updated_teams.append({
-                    'tournament_id': tournament.id,
-                    'tournament_name': tournament.tournament_name,
-                    'team': {
-                        'team_id': team.team_id,
-                        'name': team.name,
-                        'checked_in': team.checked_in,
-                        'all_players_checked_in': all_players_checked_in
-                    }
-                })
+
+        # Update the player and their teams across the whole super tournament
+        teams, changed = checkin_players(super_tournament.id, [player.uuid], checked_in)
         
         db.session.commit()
+        emit_checkin_update(super_tournament.id, teams, changed)
         
         return jsonify({
             'message': 'Player check-in status updated successfully across super tournament',
@@ -140,7 +205,7 @@ def player_checkin():
                 'id': super_tournament.id,
                 'name': super_tournament.name
             },
-            'updated_teams': updated_teams
+            'updated_teams': updated_tournament_entries(teams)
         }), 200
         
     except Exception as e:
@@ -180,53 +245,18 @@ def player_super_tournament_checkin():
         super_tournament = SuperTournament.query.get(super_tournament_id)
         if not super_tournament:
             return jsonify({'error': 'Super tournament not found'}), 404
-            
-        # Get all tournaments in this super tournament through seasons
-        tournaments = []
-        for season in super_tournament.seasons:
-            tournaments.extend(season.tournaments)
-            
-        if not tournaments:
+
+        has_tournaments = db.session.query(Tournament.id).join(
+            Season, Tournament.season_id == Season.id
+        ).filter(Season.super_tournament_id == super_tournament.id).first()
+        if not has_tournaments:
             return jsonify({'error': 'No tournaments found in this super tournament'}), 404
             
-        # Update player's check-in status for the entire super tournament
-        player.checked_in = checked_in
-        
-        # Update team statuses in all tournaments
-        updated_tournaments = []
-        for tournament in tournaments:
-            # Find team in this tournament where player is either player1 or player2
-            team = Team.query.filter(
-                (Team.player1_uuid == player.uuid) | (Team.player2_uuid == player.uuid),
-                Team.tournament_id == tournament.id
-            ).first()
-            
-            if team:
-                # Get the other player in the team
-                other_player = None
-                if team.player1_uuid == player.uuid and team.player2_uuid:
-                    other_player = Player.query.filter_by(uuid=team.player2_uuid).first()
-                elif team.player2_uuid == player.uuid and team.player1_uuid:
-                    other_player = Player.query.filter_by(uuid=team.player1_uuid).first()
-                
-                # Check if all players in the team are checked in
-                all_players_checked_in = player.checked_in and (not other_player or other_player.checked_in)
-                
-                # Update team check-in status
-                team.checked_in = all_players_checked_in
-                
-                updated_tournaments.append({
-                    'tournament_id': tournament.id,
-                    'tournament_name': tournament.tournament_name,
-                    'team': {
-                        'team_id': team.team_id,
-                        'name': team.name,
-                        'checked_in': team.checked_in,
-                        'all_players_checked_in': all_players_checked_in
-                    }
-                })
+        # Update the player and recompute all their teams with set-based updates
+        teams, changed = checkin_players(super_tournament.id, [player.uuid], checked_in)
 
         db.session.commit()
+        emit_checkin_update(super_tournament.id, teams, changed)
         
         return jsonify({
             'message': 'Player check-in status updated successfully across super tournament',
@@ -240,13 +270,169 @@ def player_super_tournament_checkin():
                 'id': super_tournament.id,
                 'name': super_tournament.name
             },
-            'updated_tournaments': updated_tournaments
+            'updated_tournaments': updated_tournament_entries(teams)
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@team_bp.route('/player/batch-checkin', methods=['POST'])
+def player_batch_checkin():
+    """Check in a queue of players (e.g. from a QR scanning station) in one request"""
+    try:
+        data = request.get_json()
+        super_tournament_id = data.get('super_tournament_id')
+        uuids = data.get('uuids')
+        checked_in = data.get('checked_in', True)
+
+        if not super_tournament_id or not uuids:
+            return jsonify({'error': 'super_tournament_id and uuids are required'}), 400
+
+        if not isinstance(uuids, list):
+            return jsonify({'error': 'uuids must be a list'}), 400
+
+        if len(uuids) > MAX_BATCH_CHECKIN:
+            return jsonify({'error': f'At most {MAX_BATCH_CHECKIN} uuids can be checked in at once'}), 400
+
+        super_tournament = SuperTournament.query.get(super_tournament_id)
+        if not super_tournament:
+            return jsonify({'error': 'Super tournament not found'}), 404
+
+        # Scans can repeat; keep the first of each
+        uuids = list(dict.fromkeys(uuids))
+        players = Player.query.filter(
+            Player.uuid.in_(uuids),
+            Player.super_tournament_id == super_tournament.id
+        ).all()
+        found = {player.uuid for player in players}
+        not_found = [uuid for uuid in uuids if uuid not in found]
+        # Built before the update so the response does not reload every player
+        players_data = [{
+            'id': player.id,
+            'uuid': player.uuid,
+            'first_name': player.first_name,
+            'last_name': player.last_name,
+            'checked_in': checked_in
+        } for player in players]
+
+        teams, changed = checkin_players(super_tournament.id, list(found), checked_in) if found else ([], [])
+
+        db.session.commit()
+        emit_checkin_update(super_tournament.id, teams, changed)
+
+        return jsonify({
+            'message': f'{len(found)} players checked {"in" if checked_in else "out"}',
+            'super_tournament': {
+                'id': super_tournament.id,
+                'name': super_tournament.name
+            },
+            'players': players_data,
+            'not_found': not_found,
+            'updated_tournaments': updated_tournament_entries(teams),
+            'changed_team_ids': changed
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Player lookups, valid until players, teams or the tournament hierarchy change
+player_lookup_cache = VersionedCache(maxsize=512, name='player_lookup')
+
+def get_player_teams(player):
+    """
+    Get the player's team in every tournament of their super tournament, with teammates.
+
+    One query joins the teams to their tournament, season and teammate, instead of
+    walking seasons and tournaments and querying teams and teammates one by one.
+    """
+    Teammate = aliased(Player)
+    teammate_uuid = case(
+        (Team.player1_uuid == player.uuid, Team.player2_uuid),
+        else_=Team.player1_uuid
+    )
+
+    rows = db.session.query(Team, Tournament, Teammate).join(
+        Tournament, Team.tournament_id == Tournament.id
+    ).join(
+        Season, Tournament.season_id == Season.id
+    ).outerjoin(
+        Teammate, Teammate.uuid == teammate_uuid
+    ).filter(
+        Season.super_tournament_id == player.super_tournament_id,
+        or_(Team.player1_uuid == player.uuid, Team.player2_uuid == player.uuid)
+    ).order_by(Season.id, Tournament.id, Team.team_id).all()
+
+    teams = []
+    seen_tournaments = set()
+    for team, tournament, teammate in rows:
+        # One team per tournament, as before
+        if tournament.id in seen_tournaments:
+            continue
+        seen_tournaments.add(tournament.id)
+
+        teams.append({
+            'tournament': {
+                'id': tournament.id,
+                'name': tournament.tournament_name,
+                'type': tournament.type
+            },
+            'team': {
+                'team_id': team.team_id,
+                'name': team.name,
+                'checked_in': team.checked_in,
+                'teammate': {
+                    'id': teammate.id,
+                    'uuid': teammate.uuid,
+                    'first_name': teammate.first_name,
+                    'last_name': teammate.last_name,
+                    'checked_in': teammate.checked_in
+                } if teammate else None
+            }
+        })
+
+    return teams
+
+def build_player_lookup(player_query):
+    """
+    Run a player lookup: the first player matching player_query, their super
+    tournament (same query) and their teams (one more query).
+
+    Returns (response_data, status_code).
+    """
+    row = player_query.add_entity(SuperTournament).outerjoin(
+        SuperTournament, Player.super_tournament_id == SuperTournament.id
+    ).first()
+
+    if not row:
+        return {'error': 'No player found with the provided criteria'}, 404
+
+    player, super_tournament = row
+    if not super_tournament:
+        return {'error': 'Super tournament not found'}, 404
+
+    return {
+        'player': {
+            'id': player.id,
+            'uuid': player.uuid,
+            'first_name': player.first_name,
+            'last_name': player.last_name,
+            'gender': player.gender,
+            'age': player.age,
+            'phone_number': player.phone_number,
+            'email': player.email,
+            'skill_type': player.skill_type,
+            'dupr_id': player.dupr_id,
+            'checked_in': player.checked_in
+        },
+        'super_tournament': {
+            'id': super_tournament.id,
+            'name': super_tournament.name
+        },
+        'teams': get_player_teams(player)
+    }, 200
+
 @team_bp.route('/player/lookup', methods=['GET'])
 def lookup_player():
     try:
@@ -257,6 +443,12 @@ def lookup_player():
         
         if not phone_number and not uuid:
             return jsonify({'error': 'Either phone number or uuid must be provided'}), 400
+
+        version = get_player_version()
+        cache_key = ('lookup', phone_number, uuid, super_tournament_id)
+        cached = player_lookup_cache.get(cache_key, version)
+        if cached is not None:
+            return jsonify(cached[0]), cached[1]
             
         # Build query based on provided parameters
         query = Player.query
@@ -267,81 +459,11 @@ def lookup_player():
             query = query.filter(Player.uuid == uuid)
         if super_tournament_id:
             query = query.filter(Player.super_tournament_id == super_tournament_id)
-            
-        # Get the single matching player
-        player = query.first()
-        
-        if not player:
-            return jsonify({'error': 'No player found with the provided criteria'}), 404
-            
-        # Get super tournament info
-        super_tournament = SuperTournament.query.get(player.super_tournament_id)
-        if not super_tournament:
-            return jsonify({'error': 'Super tournament not found'}), 404
-            
-        # Get all tournaments for this player through super tournament
-        tournaments = []
-        for season in super_tournament.seasons:
-            tournaments.extend(season.tournaments)
-            
-        # Get all teams where player is either player1 or player2
-        teams = []
-        for tournament in tournaments:
-            team = Team.query.filter(
-                (Team.player1_uuid == player.uuid) | (Team.player2_uuid == player.uuid),
-                Team.tournament_id == tournament.id
-            ).first()
-            
-            if team:
-                # Get teammate info if it exists
-                teammate = None
-                if team.player1_uuid == player.uuid and team.player2_uuid:
-                    teammate = Player.query.filter_by(uuid=team.player2_uuid).first()
-                elif team.player2_uuid == player.uuid and team.player1_uuid:
-                    teammate = Player.query.filter_by(uuid=team.player1_uuid).first()
-                    
-                teams.append({
-                    'tournament': {
-                        'id': tournament.id,
-                        'name': tournament.tournament_name,
-                        'type': tournament.type
-                    },
-                    'team': {
-                        'team_id': team.team_id,
-                        'name': team.name,
-                        'checked_in': team.checked_in,
-                        'teammate': {
-                            'id': teammate.id,
-                            'uuid': teammate.uuid,
-                            'first_name': teammate.first_name,
-                            'last_name': teammate.last_name,
-                            'checked_in': teammate.checked_in
-                        } if teammate else None
-                    }
-                })
-        
-        response_data = {
-            'player': {
-                'id': player.id,
-                'uuid': player.uuid,
-                'first_name': player.first_name,
-                'last_name': player.last_name,
-                'gender': player.gender,
-                'age': player.age,
-                'phone_number': player.phone_number,
-                'email': player.email,
-                'skill_type': player.skill_type,
-                'dupr_id': player.dupr_id,
-                'checked_in': player.checked_in
-            },
-            'super_tournament': {
-                'id': super_tournament.id,
-                'name': super_tournament.name
-            },
-            'teams': teams
-        }
+
+        response_data, status = build_player_lookup(query)
+        player_lookup_cache.set(cache_key, version, (response_data, status))
         
-        return jsonify(response_data), 200
+        return jsonify(response_data), status
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -357,93 +479,49 @@ def lookup_player_by_name():
         if not first_name or not super_tournament_id:
             return jsonify({'error': 'first_name and super_tournament_id are required'}), 400
             
-        # Build query based on provided parameters
-        query = Player.query.filter(
-            # Case-insensitive first name search
-            func.lower(Player.first_name) == func.lower(first_name)
-        )
+        # Case and accent insensitive match on the indexed search key
+        query = Player.query.filter(Player.super_tournament_id == super_tournament_id)
         
-        # Add last name filter if provided (case-insensitive)
         if last_name:
-            query = query.filter(func.lower(Player.last_name) == func.lower(last_name))
-            
-        # Filter by super tournament
-        query = query.filter(Player.super_tournament_id == super_tournament_id)
-            
-        # Get the single matching player
-        player = query.first()
-        
-        if not player:
-            return jsonify({'error': 'No player found with the provided criteria'}), 404
-            
-        # Get super tournament info
-        super_tournament = SuperTournament.query.get(super_tournament_id)
-        if not super_tournament:
-            return jsonify({'error': 'Super tournament not found'}), 404
-            
-        # Get all tournaments for this player through super tournament
-        tournaments = []
-        for season in super_tournament.seasons:
-            tournaments.extend(season.tournaments)
-            
-        # Get all teams where player is either player1 or player2
-        teams = []
-        for tournament in tournaments:
-            team = Team.query.filter(
-                (Team.player1_uuid == player.uuid) | (Team.player2_uuid == player.uuid),
-                Team.tournament_id == tournament.id
-            ).first()
-            
-            if team:
-                # Get teammate info if it exists
-                teammate = None
-                if team.player1_uuid == player.uuid and team.player2_uuid:
-                    teammate = Player.query.filter_by(uuid=team.player2_uuid).first()
-                elif team.player2_uuid == player.uuid and team.player1_uuid:
-                    teammate = Player.query.filter_by(uuid=team.player1_uuid).first()
-                    
-                teams.append({
-                    'tournament': {
-                        'id': tournament.id,
-                        'name': tournament.tournament_name,
-                        'type': tournament.type
-                    },
-                    'team': {
-                        'team_id': team.team_id,
-                        'name': team.name,
-                        'checked_in': team.checked_in,
-                        'teammate': {
-                            'id': teammate.id,
-                            'uuid': teammate.uuid,
-                            'first_name': teammate.first_name,
-                            'last_name': teammate.last_name,
-                            'checked_in': teammate.checked_in
-                        } if teammate else None
-                    }
-                })
-        
-        response_data = {
-            'player': {
-                'id': player.id,
-                'uuid': player.uuid,
-                'first_name': player.first_name,
-                'last_name': player.last_name,
-                'gender': player.gender,
-                'age': player.age,
-                'phone_number': player.phone_number,
-                'email': player.email,
-                'skill_type': player.skill_type,
-                'dupr_id': player.dupr_id,
-                'checked_in': player.checked_in
-            },
-            'super_tournament': {
-                'id': super_tournament.id,
-                'name': super_tournament.name
-            },
-            'teams': teams
-        }
+            query = query.filter(Player.search_key == normalize_name(first_name, last_name))
+        else:
+            # Any last name: the key is "first" or starts with "first " (index range).
+            # The normalized first name itself must match too, so "John" doesn't find
+            # "John Paul" but "jose" still finds "José"
+            first_key = normalize_name(first_name)
+            candidates = query.with_entities(Player.id, Player.first_name).filter(or_(
+                Player.search_key == first_key,
+                Player.search_key.like(f'{first_key} %')
+            )).order_by(Player.id).all()
+            player_ids = [player_id for player_id, name in candidates if normalize_name(name) == first_key]
+            query = query.filter(Player.id.in_(player_ids[:1]))
+
+        response_data, status = build_player_lookup(query)
         
-        return jsonify(response_data), 200
+        return jsonify(response_data), status
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@team_bp.route('/player/search', methods=['GET'])
+def search_player_names():
+    """Typeahead search: ranked (prefix and fuzzy) name matches within a super tournament"""
+    query = request.args.get('q', '')
+    super_tournament_id = request.args.get('super_tournament_id', type=int)
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+
+    if not super_tournament_id:
+        return jsonify({'error': 'super_tournament_id is required'}), 400
+
+    if limit < 1 or limit > MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {MAX_LIMIT}'}), 400
+
+    try:
+        return jsonify({
+            'query': query,
+            'super_tournament_id': super_tournament_id,
+            'results': search_players(super_tournament_id, query, limit)
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
\ No newline at end of file
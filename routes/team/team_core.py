@@ -1,5 +1,6 @@
 from flask import request, jsonify
 from models import Team, Player, Tournament, Round, db, SuperTournament
+from hierarchy import get_tournament_hierarchy
 from . import team_bp
 import uuid
 
@@ -29,14 +30,14 @@ def register_player():
         return jsonify({'error': f'Invalid skill type. Must be one of: {", ".join(valid_skill_types)}'}), 400
     
     # Check if tournament exists and get super_tournament_id
-    tournament = Tournament.query.get(data['tournament_id'])
-    if not tournament:
+    hierarchy = get_tournament_hierarchy(data['tournament_id'])
+    if not hierarchy:
         return jsonify({'error': 'Tournament not found'}), 404
     
-    if not tournament.season or not tournament.season.super_tournament:
+    if not hierarchy['super_tournament']:
         return jsonify({'error': 'Tournament must be part of a super tournament'}), 400
     
-    super_tournament_id = tournament.season.super_tournament.id
+    super_tournament_id = hierarchy['super_tournament']['id']
     
     try:
         # Check if player already exists in this super tournament by phone number
@@ -1,5 +1,6 @@
 from flask import request, jsonify
-from models import Team, Player, Tournament, db
+from models import Team, Player, db
+from hierarchy import get_tournament_hierarchy
 from . import team_bp
 import io
 import csv
@@ -31,14 +32,14 @@ def register_teams():
         return jsonify({"error": "tournament_id is required"}), 400
     
     # Check if the tournament exists
-    tournament = Tournament.query.get(tournament_id)
-    if not tournament:
+    hierarchy = get_tournament_hierarchy(tournament_id)
+    if not hierarchy:
         return jsonify({"error": "Tournament not found"}), 404
         
-    # Get super_tournament_id through season
-    if not tournament.season or not tournament.season.super_tournament:
+    # Get super_tournament_id through season (from the hierarchy cache)
+    if not hierarchy['super_tournament']:
         return jsonify({"error": "Tournament must be part of a super tournament"}), 400
-    super_tournament_id = tournament.season.super_tournament.id
+    super_tournament_id = hierarchy['super_tournament']['id']
 
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
@@ -5,4 +5,5 @@ tournament_bp = Blueprint('tournament', __name__)
 # Import specific functions from each module
 from .tournament_core import *
 from .tournament_courts import *
-from .tournament_export import * 
\ No newline at end of file
+from .tournament_export import * 
+from .tournament_archive import *
\ No newline at end of file
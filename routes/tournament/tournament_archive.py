@@ -0,0 +1,244 @@
+from flask import request, jsonify, Response, stream_with_context
+from models import SuperTournament, Season, Tournament, Team, Player, Match, Score, Round, db
+import json
+import zlib
+from compression import disable_compression
+from . import tournament_bp
+
+# Tournaments (categories) loaded together; bounds the memory of one step of the stream
+TOURNAMENT_BATCH = 5
+# Upper bound on the number of values in one IN clause
+IN_BATCH = 1000
+# Plain output is sent in chunks of about this size
+CHUNK_SIZE = 64 * 1024
+
+def chunked(values, size=IN_BATCH):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def player_archive(player):
+    return {
+        'uuid': player.uuid,
+        'firstName': player.first_name,
+        'lastName': player.last_name,
+        'gender': player.gender,
+        'age': player.age,
+        'phoneNo': player.phone_number,
+        'email': player.email,
+        'skill': player.skill_type,
+        'duprId': player.dupr_id
+    }
+
+def load_categories(tournaments):
+    """
+    Build the archive entries ("categories") of a batch of tournaments.
+
+    Teams, round names, matches and scores are each loaded with one IN query over the
+    whole batch (scores in IN_BATCH sized pieces). Rounds and pools keep the order in
+    which their first match was created, like the offline gen.py scripts. On top of the
+    gen.py format, categories carry their type and matches their own ID and loser
+    successor, so import_archive.py can rebuild bracket links.
+
+    Returns the category dicts in tournament order and the player UUIDs of their teams.
+    """
+    tournament_ids = [tournament.id for tournament in tournaments]
+
+    teams = {tournament_id: [] for tournament_id in tournament_ids}
+    player_uuids = set()
+    for team in Team.query.filter(Team.tournament_id.in_(tournament_ids)).order_by(Team.team_id).all():
+        teams[team.tournament_id].append({
+            'id': team.team_id,
+            'name': team.name,
+            'player1uuid': team.player1_uuid,
+            'player2uuid': team.player2_uuid
+        })
+        for uuid in (team.player1_uuid, team.player2_uuid):
+            if uuid and uuid.strip():
+                player_uuids.add(uuid)
+
+    round_names = {}
+    for tournament_id, round_id, name in db.session.query(
+        Round.tournament_id, Round.round_id, Round.name
+    ).filter(Round.tournament_id.in_(tournament_ids)).distinct().all():
+        round_names.setdefault((tournament_id, str(round_id)), name)
+
+    matches = Match.query.filter(Match.tournament_id.in_(tournament_ids)).order_by(Match.id).all()
+
+    scores = {}
+    for match_ids in chunked([match.id for match in matches]):
+        for score in Score.query.filter(Score.match_id.in_(match_ids)).all():
+            scores[(score.match_id, score.team_id)] = score.score
+
+    rounds = {tournament_id: {} for tournament_id in tournament_ids}
+    for match in matches:
+        round_entry = rounds[match.tournament_id].get(match.round_id)
+        if round_entry is None:
+            round_entry = rounds[match.tournament_id][match.round_id] = {
+                'name': round_names.get((match.tournament_id, str(match.round_id))) or f"Round {match.round_id}",
+                'id': match.round_id,
+                'pools': {}
+            }
+        pool = round_entry['pools'].setdefault(match.pool, {'poolName': match.pool, 'matches': []})
+        pool['matches'].append({
+            'id': match.id,
+            'name': match.match_name,
+            'teamId1': match.team1_id,
+            'teamId2': match.team2_id,
+            'teamId1_score': scores.get((match.id, match.team1_id)),
+            'teamId2_score': scores.get((match.id, match.team2_id)),
+            'winnerTeamId': match.winner_team_id,
+            'isFinal': match.is_final,
+            'status': match.status,
+            'predecessor1': match.predecessor_1,
+            'predecessor2': match.predecessor_2,
+            'successor': match.successor,
+            'loserSuccessor': match.loser_successor,
+            'bracketPosition': match.bracket_position,
+            'roundNumber': match.round_number,
+            'outcome': match.outcome
+        })
+
+    categories = []
+    for tournament in tournaments:
+        categories.append({
+            'name': tournament.tournament_name,
+            'type': tournament.type,
+            'rounds': [
+                {
+                    'name': round_entry['name'],
+                    'id': round_entry['id'],
+                    'pools': list(round_entry['pools'].values())
+                }
+                for round_entry in rounds[tournament.id].values()
+            ],
+            'teams': teams[tournament.id]
+        })
+
+    return categories, player_uuids
+
+def stream_players(player_uuids):
+    """Yield the JSON of each archived player, loaded IN_BATCH at a time"""
+    first = True
+    for uuids in chunked(sorted(player_uuids)):
+        for player in Player.query.filter(Player.uuid.in_(uuids)).order_by(Player.uuid).all():
+            yield ('' if first else ',') + json.dumps(player_archive(player))
+            first = False
+
+def stream_season(season, super_tournament_name, all_player_uuids=None):
+    """
+    Yield one season in the archive format: {"name", "categories", "players"}.
+
+    Categories are written one tournament batch at a time, so only the current batch
+    is held in memory. Player UUIDs seen in the season are added to all_player_uuids
+    when given (the combined super tournament archive lists every player once at the end).
+    """
+    yield '{"name":' + json.dumps(f"{super_tournament_name} - {season.name}") + ',"categories":['
+
+    tournaments = Tournament.query.filter_by(season_id=season.id).order_by(Tournament.id).all()
+    player_uuids = set()
+    first = True
+    for start in range(0, len(tournaments), TOURNAMENT_BATCH):
+        categories, batch_uuids = load_categories(tournaments[start:start + TOURNAMENT_BATCH])
+        player_uuids |= batch_uuids
+        for category in categories:
+            yield ('' if first else ',') + json.dumps(category)
+            first = False
+        # Done with this batch; don't let the session keep every loaded row around
+        db.session.expunge_all()
+
+    yield '],"players":['
+    yield from stream_players(player_uuids)
+    yield ']}'
+
+    if all_player_uuids is not None:
+        all_player_uuids |= player_uuids
+
+def stream_super_tournament(super_tournament):
+    """Yield a super tournament archive: {"name", "seasons", "players"}"""
+    yield '{"name":' + json.dumps(super_tournament.name) + ',"seasons":['
+
+    seasons = Season.query.filter_by(super_tournament_id=super_tournament.id).order_by(Season.id).all()
+    all_player_uuids = set()
+    for index, season in enumerate(seasons):
+        if index:
+            yield ','
+        yield from stream_season(season, super_tournament.name, all_player_uuids)
+
+    yield '],"players":['
+    yield from stream_players(all_player_uuids)
+    yield ']}'
+
+def encode_stream(parts, compress):
+    """Turn JSON text parts into CHUNK_SIZE byte chunks, gzip compressed when asked"""
+    if compress:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        for part in parts:
+            data = compressor.compress(part.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+        return
+
+    buffer = []
+    size = 0
+    for part in parts:
+        data = part.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+@tournament_bp.route('/export-archive', methods=['GET'])
+def export_archive():
+    """
+    Stream a season or super tournament archive in the migrations/v1 JSON format.
+
+    Pass season_id for one season or super_tournament_id for every season of a super
+    tournament. The response is gzip encoded when the client accepts gzip, unless
+    gzip=false is given; gzip=true forces it.
+    """
+    season_id = request.args.get('season_id', type=int)
+    super_tournament_id = request.args.get('super_tournament_id', type=int)
+    gzip_param = request.args.get('gzip')
+
+    if not season_id and not super_tournament_id:
+        return jsonify({'error': 'season_id or super_tournament_id is required'}), 400
+
+    if gzip_param is None:
+        compress = 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+    else:
+        compress = gzip_param.lower() == 'true'
+
+    if season_id:
+        season = Season.query.filter_by(id=season_id).first()
+        if not season:
+            return jsonify({'error': 'Season not found'}), 404
+        super_tournament = SuperTournament.query.filter_by(id=season.super_tournament_id).first()
+        parts = stream_season(season, super_tournament.name if super_tournament else '')
+        filename = f"season_{season_id}.json"
+    else:
+        super_tournament = SuperTournament.query.filter_by(id=super_tournament_id).first()
+        if not super_tournament:
+            return jsonify({'error': 'Super tournament not found'}), 404
+        parts = stream_super_tournament(super_tournament)
+        filename = f"tournament_{super_tournament_id}_all_seasons.json"
+
+    headers = {"Content-Disposition": f"attachment;filename={filename}"}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+
+    response = Response(
+        stream_with_context(encode_stream(parts, compress)),
+        mimetype="application/json",
+        headers=headers
+    )
+    if gzip_param is not None and not compress:
+        # Asked for plain JSON; keep the response middleware from encoding it
+        disable_compression(response)
+    return response
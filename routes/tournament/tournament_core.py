@@ -1,6 +1,9 @@
 from flask import request, jsonify, current_app, render_template
 from models import Tournament, Team, Player, Match, Score, Round, db, Season
 from sqlalchemy import text, or_, and_, func, case, distinct
+from serializers import parse_include, serialize_tournament, tournament_loader_options, TOURNAMENT_INCLUDES, DEFAULT_TOURNAMENT_INCLUDES
+from hierarchy import get_tournament_hierarchy, invalidate_hierarchy
+from single_flight import single_flight
 from . import tournament_bp
 
 @tournament_bp.route('/tournaments', methods=['POST'])
@@ -37,6 +40,7 @@ def create_tournament():
     # Add to the database
     db.session.add(new_tournament)
     db.session.commit()
+    invalidate_hierarchy()
     return jsonify({
         "message": "Tournament created successfully.", 
         "tournament_id": new_tournament.id
@@ -44,72 +48,22 @@ def create_tournament():
 
 @tournament_bp.route('/tournaments/<int:tournament_id>', methods=['GET'])
 def get_tournament(tournament_id):
+    """
+    Get a tournament with its teams.
+
+    include= picks what each team carries: players (names, skill, DUPR ID, check-in)
+    and personal (player gender, age, phone and email). Without it, both are included;
+    include= (empty) returns the teams only.
+    """
     try:
-        # Log the request
-        current_app.logger.info(f"Fetching tournament with ID: {tournament_id}")
-        
-        tournament = Tournament.query.get_or_404(tournament_id)
-        current_app.logger.info(f"Found tournament: {tournament.tournament_name}")
-        
-        # Build response
-        tournament_data = {
-            'tournament_id': tournament.id,
-            'name': tournament.tournament_name,
-            'type': tournament.type,
-            'teams': []
-        } 
-
-        # Iterate over teams in the tournament
-        current_app.logger.debug(f"Fetching teams for tournament {tournament_id}")
-        for team in tournament.teams:
-            current_app.logger.debug(f"Processing team: {team.team_id}")
-            team_data = {
-                'team_id': team.team_id,
-                'name': team.name,
-                'points': team.points,
-                'checked_in': team.checked_in,
-                'players': []
-            }
-            
-            # Add players to the team using the new relationships
-            if team.player1:
-                player_data = {
-                    'player_id': team.player1.id,
-                    'uuid': team.player1.uuid,
-                    'first_name': team.player1.first_name,
-                    'last_name': team.player1.last_name,
-                    'gender': team.player1.gender,
-                    'age': team.player1.age,
-                    'phone_number': team.player1.phone_number,
-                    'email': team.player1.email,
-                    'skill_type': team.player1.skill_type,
-                    'dupr_id': team.player1.dupr_id,
-                    'checked_in': team.player1.checked_in
-                }
-                team_data['players'].append(player_data)
-            
-            if team.player2:
-                player_data = {
-                    'player_id': team.player2.id,
-                    'uuid': team.player2.uuid,
-                    'first_name': team.player2.first_name,
-                    'last_name': team.player2.last_name,
-                    'gender': team.player2.gender,
-                    'age': team.player2.age,
-                    'phone_number': team.player2.phone_number,
-                    'email': team.player2.email,
-                    'skill_type': team.player2.skill_type,
-                    'dupr_id': team.player2.dupr_id,
-                    'checked_in': team.player2.checked_in
-                }
-                team_data['players'].append(player_data)
-            
-            # Calculate if all players are checked in
-            team_data['all_players_checked_in'] = all(p.get('checked_in', False) for p in team_data['players'])
-            tournament_data['teams'].append(team_data)
+        include = parse_include(request.args.get('include'), TOURNAMENT_INCLUDES, DEFAULT_TOURNAMENT_INCLUDES)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        current_app.logger.info(f"Successfully retrieved tournament data for ID: {tournament_id}")
-        return jsonify(tournament_data), 200
+    try:
+        # Teams and their players are loaded with one SELECT ... IN each
+        tournament = Tournament.query.options(*tournament_loader_options(include)).get_or_404(tournament_id)
+        return jsonify(serialize_tournament(tournament, include)), 200
 
     except Exception as e:
         current_app.logger.error(f"Error fetching tournament {tournament_id}: {str(e)}")
@@ -119,6 +73,7 @@ def get_tournament(tournament_id):
         }), 500
 
 @tournament_bp.route('/standings/<int:tournament_id>')
+@single_flight()
 def show_standings(tournament_id):
     print("\n=== Starting show_standings endpoint ===")
     print(f"Getting standings for tournament_id={tournament_id}")
@@ -454,33 +409,10 @@ def show_overall_standings(tournament_id):
 @tournament_bp.route('/tournament-meta/<int:tournament_id>', methods=['GET'])
 def get_tournament_metadata(tournament_id):
     try:
-        # Query tournament with eager loading of relationships
-        tournament = Tournament.query.get_or_404(tournament_id)
-        
-        # Get associated season
-        season = tournament.season
-        
-        # Get associated super tournament
-        super_tournament = season.super_tournament
-        
-        # Build response data
-        tournament_meta = {
-            'tournament': {
-                'id': tournament.id,
-                'name': tournament.tournament_name,
-                'type': tournament.type,
-                'num_courts': tournament.num_courts
-            },
-            'season': {
-                'id': season.id,
-                'name': season.name
-            },
-            'super_tournament': {
-                'id': super_tournament.id,
-                'name': super_tournament.name,
-                'description': super_tournament.description
-            }
-        }
+        # Tournament, season and super tournament from the hierarchy cache
+        tournament_meta = get_tournament_hierarchy(tournament_id)
+        if not tournament_meta:
+            return jsonify({'error': 'Tournament not found'}), 404
         
         return jsonify(tournament_meta), 200
         
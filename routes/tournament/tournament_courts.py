@@ -2,6 +2,7 @@ from flask import request, jsonify, current_app
 from models import Tournament, Match, Team, Player, db
 from sqlalchemy import or_
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from hierarchy import get_num_courts, invalidate_hierarchy
 from . import tournament_bp
 import time
 import json
@@ -10,10 +11,12 @@ import json
 def manage_tournament_courts(tournament_id):
     """Manage number of courts for a tournament"""
     if request.method == 'GET':
-        tournament = Tournament.query.get_or_404(tournament_id)
+        num_courts = get_num_courts(tournament_id)
+        if num_courts is None:
+            return jsonify({'error': 'Tournament not found'}), 404
         return jsonify({
             'tournament_id': tournament_id,
-            'num_courts': tournament.num_courts
+            'num_courts': num_courts
         })
         
     else:  # PUT method
@@ -40,6 +43,7 @@ def manage_tournament_courts(tournament_id):
             tournament = Tournament.query.get_or_404(tournament_id)
             tournament.num_courts = num_courts
             db.session.commit()
+            invalidate_hierarchy()
             
             return jsonify({
                 'message': 'Number of courts updated successfully',
@@ -91,7 +95,7 @@ def handle_court_assignments(tournament_id):
         
         # Format response
         assignments = {}
-        for i in range(1, Tournament.query.get(tournament_id).num_courts + 1):
+        for i in range(1, get_num_courts(tournament_id) + 1):
             assignments[f"court_{i}"] = []
             
         for match in matches:
@@ -407,8 +411,8 @@ def assign_match_to_court():
             return jsonify({'error': 'Match not found'}), 404
             
         # Verify tournament has enough courts
-        tournament = Tournament.query.get(tournament_id)
-        if not tournament or data['court_number'] > tournament.num_courts:
+        num_courts = get_num_courts(tournament_id)
+        if num_courts is None or data['court_number'] > num_courts:
             return jsonify({'error': 'Invalid court number for this tournament'}), 400
             
         # Verify players are checked in
@@ -4,6 +4,7 @@ from sqlalchemy import text
 from datetime import datetime
 import csv
 import io
+from serializers import team_loader_options
 from . import tournament_bp
 
 @tournament_bp.route('/export-tournament-csv', methods=['GET'])
@@ -24,6 +25,18 @@ def export_tournament_csv():
         if not matches:
             return jsonify({'error': 'No matches found for this tournament'}), 404
 
+        # Load the teams (with players) and scores of the finalized matches up front
+        final_matches = [match for match in matches if match.is_final]
+        team_ids = {team_id for match in final_matches for team_id in (match.team1_id, match.team2_id) if team_id}
+        teams = {
+            team.team_id: team
+            for team in Team.query.options(*team_loader_options({'players'})).filter(Team.team_id.in_(team_ids)).all()
+        } if team_ids else {}
+        match_scores = {}
+        if final_matches:
+            for score in Score.query.filter(Score.match_id.in_([match.id for match in final_matches])).order_by(Score.id).all():
+                match_scores.setdefault(score.match_id, []).append(score)
+
         # Create an in-memory CSV file
         output = io.StringIO()
         writer = csv.writer(output)
@@ -40,13 +53,9 @@ def export_tournament_csv():
         current_date = datetime.now().strftime('%Y-%m-%d')
 
         # Populate rows with match data only if the match is finalized
-        for match in matches:
-            if not match.is_final:
-                continue  # Skip matches that are not finalized
-
-            # Fetch teams for each match
-            team1 = Team.query.filter_by(team_id=match.team1_id).first()
-            team2 = Team.query.filter_by(team_id=match.team2_id).first()
+        for match in final_matches:
+            team1 = teams.get(match.team1_id)
+            team2 = teams.get(match.team2_id)
 
             if not team1 or not team2:
                 continue  # Skip if team data is missing
@@ -55,7 +64,7 @@ def export_tournament_csv():
             match_type = "D" if (team1.player2 or team2.player2) else "S"
 
             # Prepare scores for each game (assuming up to 5 games)
-            scores = Score.query.filter_by(match_id=match.id).all()
+            scores = match_scores.get(match.id, [])
             team_a_scores = [score.score for score in scores if score.team_id == team1.team_id]
             team_b_scores = [score.score for score in scores if score.team_id == team2.team_id]
 
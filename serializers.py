@@ -0,0 +1,126 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import selectinload
+
+from models import Player, Team, Tournament
+
+# Expansions a tournament detail response can ask for with include=...
+#   players:  the players of each team (names, skill, DUPR ID, check-in)
+#   personal: player gender, age, phone number and email (needs players)
+TOURNAMENT_INCLUDES = ('players', 'personal')
+# What a response holds when no include is given (the original full payload)
+DEFAULT_TOURNAMENT_INCLUDES = frozenset(TOURNAMENT_INCLUDES)
+
+def parse_include(value: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> Set[str]:
+    """
+    Parse an include=a,b query parameter.
+
+    Args:
+        value: Raw parameter value; None means the parameter was not given
+        allowed: Expansions the endpoint supports
+        default: Expansions used when the parameter is missing
+
+    Returns:
+        Set[str]: Requested expansions (empty for include=)
+
+    Raises:
+        ValueError: If an unknown expansion is requested
+    """
+    if value is None:
+        return set(default)
+    include = {item.strip() for item in value.split(',') if item.strip()}
+    unknown = include - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return include
+
+def team_loader_options(include: Set[str]) -> List[Any]:
+    """
+    Loader options for the Team rows serialized with the given expansions.
+
+    Players are loaded with one SELECT ... IN per team slot instead of one lazy
+    load per team, and not at all when they aren't included.
+    """
+    if 'players' not in include:
+        return []
+    return [selectinload(Team.player1), selectinload(Team.player2)]
+
+def tournament_loader_options(include: Set[str]) -> List[Any]:
+    """Loader options for a Tournament serialized with serialize_tournament"""
+    return [selectinload(Tournament.teams).options(*team_loader_options(include))]
+
+def serialize_player(player: Player, include: Set[str]) -> Dict[str, Any]:
+    """
+    Shape a player for a response.
+
+    Args:
+        player: Player row
+        include: Requested expansions; personal adds gender, age, phone and email
+
+    Returns:
+        Dict[str, Any]: Player fields
+    """
+    player_data = {
+        'player_id': player.id,
+        'uuid': player.uuid,
+        'first_name': player.first_name,
+        'last_name': player.last_name,
+        'skill_type': player.skill_type,
+        'dupr_id': player.dupr_id,
+        'checked_in': player.checked_in
+    }
+    if 'personal' in include:
+        player_data.update({
+            'gender': player.gender,
+            'age': player.age,
+            'phone_number': player.phone_number,
+            'email': player.email
+        })
+    return player_data
+
+def serialize_team(team: Team, include: Set[str]) -> Dict[str, Any]:
+    """
+    Shape a team for a response.
+
+    Args:
+        team: Team row, with players loaded when they are included
+        include: Requested expansions; players adds players and all_players_checked_in
+
+    Returns:
+        Dict[str, Any]: Team fields
+    """
+    team_data = {
+        'team_id': team.team_id,
+        'name': team.name,
+        'points': team.points,
+        'checked_in': team.checked_in
+    }
+    if 'players' in include:
+        team_data['players'] = [
+            serialize_player(player, include)
+            for player in (team.player1, team.player2)
+            if player
+        ]
+        team_data['all_players_checked_in'] = all(p.get('checked_in', False) for p in team_data['players'])
+    return team_data
+
+def serialize_tournament(tournament: Tournament, include: Set[str]) -> Dict[str, Any]:
+    """
+    Shape a tournament and its teams for a response.
+
+    Load the tournament with tournament_loader_options(include) so its teams and
+    players don't lazy load one by one.
+
+    Args:
+        tournament: Tournament row
+        include: Requested expansions (see TOURNAMENT_INCLUDES)
+
+    Returns:
+        Dict[str, Any]: Tournament fields with its teams
+    """
+    return {
+        'tournament_id': tournament.id,
+        'name': tournament.tournament_name,
+        'type': tournament.type,
+        'teams': [serialize_team(team, include) for team in tournament.teams]
+    }
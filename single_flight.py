@@ -0,0 +1,111 @@
+import functools
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable
+
+from flask import current_app, request
+from gevent.event import AsyncResult
+from gevent import Timeout
+
+from cache import get_tournament_version
+
+# Seconds a request waits on someone else's computation before doing its own
+WAIT_TIMEOUT = 30
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one.
+
+    The first caller of a key runs the function; callers arriving while it runs
+    wait on a gevent AsyncResult and get the same result (or exception). Once it
+    finishes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> AsyncResult of the call in flight
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: float = WAIT_TIMEOUT) -> Any:
+        """
+        Run fn, or wait for the call already running for key.
+
+        Args:
+            key: What makes two calls identical
+            fn: The computation
+            timeout: Seconds to wait on another caller before running fn anyway
+
+        Returns:
+            Any: fn's result, possibly computed for another caller
+        """
+        with self._lock:
+            result = self._calls.get(key)
+            leader = result is None
+            if leader:
+                result = self._calls[key] = AsyncResult()
+            self.counts['leader' if leader else 'shared'] += 1
+
+        if not leader:
+            try:
+                return result.get(timeout=timeout)
+            except Timeout:
+                with self._lock:
+                    self.counts['timeout'] += 1
+                return fn()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            result.set_exception(e)
+            raise
+        else:
+            result.set(value)
+            return value
+        finally:
+            with self._lock:
+                if self._calls.get(key) is result:
+                    del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'in_flight': len(self._calls), **self.counts}
+
+flights = SingleFlight()
+
+def request_tournament_id(name: str = 'tournament_id') -> Any:
+    """Tournament ID of the current request, from the URL or the query string"""
+    return request.view_args.get(name) if name in (request.view_args or {}) else request.args.get(name)
+
+def single_flight(tournament_arg: str = 'tournament_id'):
+    """
+    Decorator for read-only GET views whose result depends only on one tournament's data.
+
+    Identical concurrent requests (same endpoint, URL arguments, query string and
+    Accept header, at the same tournament version) share one run of the view: the
+    first builds the response and every request waiting on it gets a copy of the
+    serialized body, status and headers. After-request hooks (compression, CORS)
+    still run per request.
+
+    Args:
+        tournament_arg: Name of the URL or query argument holding the tournament ID
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            tournament_id = request_tournament_id(tournament_arg)
+            key = (
+                request.endpoint,
+                tuple(sorted((request.view_args or {}).items())),
+                tuple(sorted(request.args.items(multi=True))),
+                request.headers.get('Accept', ''),
+                get_tournament_version(tournament_id)
+            )
+
+            def render():
+                response = current_app.make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers.items())
+
+            body, status, headers = flights.do(key, render)
+            return current_app.response_class(body, status=status, headers=headers)
+        return wrapper
+    return decorator
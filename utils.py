@@ -1,5 +1,7 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from itertools import chain
+import re
+import unicodedata
 
 def get_pool_pairs(num_pools: int, pairing_type: str) -> List[Tuple[str, str]]:
     """
@@ -70,10 +72,10 @@ def get_pool_pairs(num_pools: int, pairing_type: str) -> List[Tuple[str, str]]:
 
 def assign_teams_to_pools(teams: List[str], num_pools: int) -> Dict[str, List[str]]:
     """
-    Assign teams to pools evenly.
+    Assign teams to pools evenly, snake seeded.
     
     Args:
-        teams (List[str]): List of team names
+        teams (List[str]): List of team names in seeding order (strongest first)
         num_pools (int): Number of pools (2, 4, or 8)
     
     Returns:
@@ -91,14 +93,148 @@ def assign_teams_to_pools(teams: List[str], num_pools: int) -> Dict[str, List[st
     if len(teams) < num_pools * 2:
         raise ValueError(f"Need at least {num_pools * 2} teams for {num_pools} pools")
     
-    teams_per_pool = len(teams) // num_pools
-    pool_names = [chr(65 + i) for i in range(num_pools)]
+    return snake_seed_pools(teams, num_pools)
+
+def snake_seed_pools(
+    teams: List[str],
+    num_pools: int,
+    clubs: Optional[Dict[str, str]] = None,
+    max_pool_size: Optional[int] = None,
+    pool_names: Optional[List[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Snake-seed teams into pools so every pool gets a similar mix of strengths.
+    
+    Teams are dealt in tiers of num_pools: seeds 1..n go A, B, C, then the next
+    tier goes back C, B, A, and so on. Every pool takes one team per tier, so pool
+    sizes differ by at most one. With clubs, each team of a tier takes the tier's
+    pool holding the fewest teams of its club, preferring its snake position on a
+    tie, which keeps clubs apart without unbalancing strengths.
+    
+    Args:
+        teams (List[str]): Team IDs in seeding order (strongest first)
+        num_pools (int): Number of pools
+        clubs (Optional[Dict[str, str]]): Club per team ID, for club separation
+        max_pool_size (Optional[int]): Largest allowed pool
+        pool_names (Optional[List[str]]): Pool names (defaults to A, B, C, ...)
+    
+    Returns:
+        Dict[str, List[str]]: Dictionary mapping pool names to lists of teams
+    
+    Raises:
+        ValueError: If the teams do not fit into the pools
+    """
+    if num_pools < 1:
+        raise ValueError("Number of pools must be at least 1")
+    
+    if max_pool_size and len(teams) > num_pools * max_pool_size:
+        raise ValueError(
+            f"{len(teams)} teams do not fit into {num_pools} pools of at most {max_pool_size} teams"
+        )
+    
+    pool_names = pool_names or [chr(65 + i) for i in range(num_pools)]
+    clubs = clubs or {}
+    
+    pools = [[] for _ in range(num_pools)]
+    club_counts = [{} for _ in range(num_pools)]
+    
+    for tier_index, tier_start in enumerate(range(0, len(teams), num_pools)):
+        tier = teams[tier_start:tier_start + num_pools]
+        snake = list(range(num_pools)) if tier_index % 2 == 0 else list(range(num_pools - 1, -1, -1))
+        open_pools = snake[:len(tier)]
+        
+        for team in tier:
+            club = clubs.get(team)
+            pool_idx = min(
+                open_pools,
+                key=lambda idx: (club_counts[idx].get(club, 0) if club else 0, open_pools.index(idx))
+            )
+            open_pools.remove(pool_idx)
+            pools[pool_idx].append(team)
+            if club:
+                club_counts[pool_idx][club] = club_counts[pool_idx].get(club, 0) + 1
+    
+    return {pool_names[idx]: pool for idx, pool in enumerate(pools)}
+
+def round_robin_schedule(team_ids: List[str]) -> List[List[Tuple[str, str]]]:
+    """
+    Build a balanced round-robin schedule using the circle (Berger) method.
     
-    pools = {}
-    team_idx = 0
+    Every team plays every other team exactly once and at most once per round
+    slot. For an odd number of teams a bye is added, so one team sits out each
+    round. The first team alternates sides each round so home/away is balanced.
     
-    for pool_name in pool_names:
-        pools[pool_name] = teams[team_idx:team_idx + teams_per_pool]
-        team_idx += teams_per_pool
+    Args:
+        team_ids (List[str]): Team IDs in seeding order (duplicates are ignored)
     
-    return pools
+    Returns:
+        List[List[Tuple[str, str]]]: One list of (team1_id, team2_id) pairs per round
+    """
+    teams = list(dict.fromkeys(team_ids))
+    if len(teams) < 2:
+        return []
+
+    if len(teams) % 2 != 0:
+        teams.append(None)  # Bye
+
+    num_teams = len(teams)
+    half = num_teams // 2
+    rounds = []
+
+    for round_idx in range(num_teams - 1):
+        pairs = []
+        for i in range(half):
+            team1, team2 = teams[i], teams[num_teams - 1 - i]
+            if team1 is None or team2 is None:
+                continue
+            # Alternate the fixed team's side every round
+            if i == 0 and round_idx % 2 == 1:
+                team1, team2 = team2, team1
+            pairs.append((team1, team2))
+        rounds.append(pairs)
+
+        # Rotate every team except the first one
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+
+    return rounds
+
+def normalize_name(*parts: Optional[str]) -> str:
+    """
+    Normalize a person's name for searching and matching.
+
+    Accents are stripped, case is folded, punctuation becomes a space and runs of
+    whitespace collapse, so "José  O'Neil" and "jose o neil" give the same key.
+
+    Args:
+        *parts: Name parts (e.g. first and last name); None and empty parts are skipped
+
+    Returns:
+        str: The normalized name
+    """
+    text = ' '.join(part for part in parts if part)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = text.casefold()
+    text = re.sub(r'[\W_]+', ' ', text)
+    return ' '.join(text.split())
+
+def normalize_phone(phone: Optional[str], digits: int = 10) -> Optional[str]:
+    """
+    Normalize a phone number for matching.
+
+    Keeps the last `digits` digits, so "+91 98765-43210" and "9876543210" match.
+    Numbers that are too short or a single repeated digit (the generated
+    "<tournament>_<n>" and "0000000000" placeholders) give None.
+
+    Args:
+        phone: Phone number as entered
+        digits: Number of trailing digits compared
+
+    Returns:
+        Optional[str]: The normalized number, or None if it cannot identify anyone
+    """
+    number = re.sub(r'\D', '', phone or '')[-digits:]
+    if len(number) < 7 or len(set(number)) == 1:
+        return None
+    return number